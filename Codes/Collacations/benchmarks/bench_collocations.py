@@ -0,0 +1,152 @@
+"""Bigram collocations: NLTK's BigramCollocationFinder vs collocation_engine.
+
+Uses NLTK's Reuters corpus (10,788 articles, 1.7M words) when it has been
+downloaded, otherwise a synthetic corpus of the same size: Zipf-like
+made-up words, punctuation and a few hundred planted two-word phrases.
+
+- check: nbest for PMI, likelihood ratio and Student's t after
+  apply_freq_filter(--min-freq), NLTK against the engine (exact and
+  count-min sketch) on the corpus as is
+- timing: the corpus replicated --replicate times (streamed, never held
+  in memory), each approach in a child process that reports its peak RSS
+  and how far it rose above the RSS of the loaded corpus; the top --top
+  of each measure are compared again
+
+    python benchmarks/bench_collocations.py
+    python benchmarks/bench_collocations.py --replicate 10 --processes 4
+"""
+import sys
+import os
+import argparse
+import json
+import resource
+import subprocess
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collocation_engine import MEASURES, find_collocations
+
+DOCUMENTS = 10788
+MEAN_LENGTH = 160
+VOCAB = 40000
+PHRASES = 300
+SKETCH_WIDTH = 1 << 20
+SYLLABLES = ['ba', 'ro', 'mi', 'ka', 'te', 'lo', 'sa', 'ne', 'po', 'ri', 'da', 'vi', 'lu', 'mo', 'ta',
+             'ge', 'an', 'el', 'or', 'is', 'ber', 'lin', 'ton', 'mar', 'sol', 'val', 'ex', 'qu']
+PUNCTUATION = ['.', ',', '-', "'", '(', ')', '"', 'lt', ';']
+
+
+def synthetic_corpus(rng):
+    words = set()
+    while len(words) < VOCAB:
+        words.add(''.join(rng.choice(SYLLABLES, size=rng.integers(2, 5))))
+    words = np.array(PUNCTUATION + sorted(words), dtype=object)[:VOCAB]
+    weights = 1.0 / np.arange(1, VOCAB + 1)
+    weights /= weights.sum()
+    phrases = words[rng.integers(200, VOCAB, (PHRASES, 2))]
+    phrase_weights = 1.0 / np.arange(1, PHRASES + 1) ** 0.7
+    phrase_weights /= phrase_weights.sum()
+    documents = []
+    for _ in range(DOCUMENTS):
+        document = words[rng.choice(VOCAB, size=max(5, int(rng.exponential(MEAN_LENGTH))), p=weights)].tolist()
+        for position in rng.integers(0, len(document), len(document) // 30):
+            document[position:position + 2] = phrases[rng.choice(PHRASES, p=phrase_weights)].tolist()
+        documents.append(document)
+    return documents
+
+
+def load_corpus():
+    """Reuters articles as word lists, or the synthetic stand-in if the corpus is not installed"""
+    try:
+        from nltk.corpus import reuters
+        return 'reuters', [list(reuters.words(fileid)) for fileid in reuters.fileids()]
+    except LookupError:
+        return 'synthetic', synthetic_corpus(np.random.default_rng(0))
+
+
+def replicated(documents, times):
+    for _ in range(times):
+        yield from documents
+
+
+def nltk_nbest(documents, min_freq, top):
+    from nltk.collocations import BigramAssocMeasures, BigramCollocationFinder
+    finder = BigramCollocationFinder.from_documents(documents)
+    finder.apply_freq_filter(min_freq)
+    measures = BigramAssocMeasures()
+    return {measure: finder.nbest(getattr(measures, measure), top) for measure in MEASURES}, finder.N
+
+
+def engine_nbest(documents, min_freq, top, processes, sketch_width=None):
+    table = find_collocations(documents, min_freq, processes, sketch_width=sketch_width)
+    return {measure: table.nbest(measure, top) for measure in MEASURES}, table.total
+
+
+def measure(args):
+    """Runs one approach over the replicated corpus in this (child) process and prints JSON"""
+    _, documents = load_corpus()
+    loaded = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    if args.measure == 'nltk':
+        best, words = nltk_nbest(replicated(documents, args.replicate), args.min_freq, args.top)
+    else:
+        sketch_width = SKETCH_WIDTH if args.measure == 'sketch' else None
+        best, words = engine_nbest(lambda: replicated(documents, args.replicate), args.min_freq, args.top,
+                                   args.processes, sketch_width)
+    seconds = time.perf_counter() - start
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(json.dumps({'seconds': seconds, 'words': words, 'rss_mb': own, 'corpus_mb': loaded,
+                      'worker_rss_mb': workers,
+                      'best': {name: [list(bigram) for bigram in bigrams] for name, bigrams in best.items()}}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replicate', type=int, default=100)
+    parser.add_argument('--min-freq', type=int, default=5)
+    parser.add_argument('--top', type=int, default=100)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--measure', choices=['nltk', 'engine', 'sketch'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args)
+        return
+
+    name, documents = load_corpus()
+    print(f"{name} corpus: {len(documents)} documents, {sum(map(len, documents))} words, "
+          f"min_freq {args.min_freq}, top {args.top}, {args.processes} processes\n")
+    expected, _ = nltk_nbest(documents, args.min_freq, args.top)
+    for label, sketch_width in [('engine', None), (f'sketch ({SKETCH_WIDTH} wide)', SKETCH_WIDTH)]:
+        actual, _ = engine_nbest(lambda: documents, args.min_freq, args.top, args.processes, sketch_width)
+        same = ', '.join(f"{measure} {'same' if actual[measure] == expected[measure] else 'DIFFERENT'}"
+                         for measure in MEASURES)
+        print(f"{label:>24} vs nltk nbest: {same}")
+
+    print(f"\n{args.replicate}x replicated corpus")
+    print(f"{'approach':>8} {'seconds':>9} {'words/s':>11} {'speedup':>8} {'peak RSS MB':>12} {'over corpus':>12} "
+          f"{'worker MB':>10} {'top-k as nltk':>14}")
+    results = {}
+    for approach in ['nltk', 'engine', 'sketch']:
+        command = [sys.executable, os.path.abspath(__file__), '--measure', approach, '--replicate',
+                   str(args.replicate), '--min-freq', str(args.min_freq), '--top', str(args.top),
+                   '--processes', str(args.processes)]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"{approach:>8} failed: {result.stderr.strip().splitlines()[-1:]}")
+            continue
+        numbers = results[approach] = json.loads(result.stdout)
+        speedup = results['nltk']['seconds'] / numbers['seconds'] if 'nltk' in results else float('nan')
+        same = (sum(numbers['best'][measure] == results['nltk']['best'][measure] for measure in MEASURES)
+                if 'nltk' in results else 0)
+        print(f"{approach:>8} {numbers['seconds']:>9.1f} {numbers['words'] / numbers['seconds']:>11.0f} "
+              f"{speedup:>7.1f}x {numbers['rss_mb']:>12.0f} {numbers['rss_mb'] - numbers['corpus_mb']:>12.0f} "
+              f"{numbers['worker_rss_mb']:>10.0f} "
+              f"{same:>10}/{len(MEASURES)}")
+
+
+if __name__ == '__main__':
+    main()
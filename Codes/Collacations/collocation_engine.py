@@ -0,0 +1,319 @@
+"""Streaming, sharded bigram collocations for the Collocations notebook.
+
+The notebook joins every Reuters word into one string, tokenizes it again
+and builds NLTK's BigramCollocationFinder, whose FreqDists hold a Python
+tuple per distinct bigram. Here documents are streamed in shards; each
+shard maps its tokens to integer ids and counts unigrams with bincount and
+bigrams (two 32-bit ids packed into a uint64 key) with np.unique, in a
+process pool. The parent maps shard ids onto one vocabulary and merges
+the counts. After the frequency filter, PMI, likelihood ratio and
+Student's t are computed for every bigram at once over NumPy arrays, with
+the same formulas and tie-breaking as nltk's BigramAssocMeasures and
+nbest, so the rankings match.
+
+With sketch_width set, bigram counts first go into a count-min sketch, so
+memory no longer grows with the number of distinct bigrams. A second
+pass over the documents then counts exactly the bigrams whose estimate
+reaches min_freq. An estimate never undercounts, so no bigram that passes
+the filter is lost.
+
+    python collocation_engine.py --reuters --min-freq 5 --top 10
+    python collocation_engine.py docs.txt --measure likelihood_ratio --sketch-width 4194304
+"""
+import argparse
+import os
+import re
+from collections import defaultdict, deque
+from itertools import chain, count, islice
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MEASURES = ('pmi', 'likelihood_ratio', 'student_t')
+SHARD_DOCUMENTS = 500
+# Shards handed to the pool per worker before waiting for the oldest one
+SHARDS_IN_FLIGHT = 2
+# Partial bigram counts are merged once they hold more keys than this and than the merged counts
+MERGE_MIN_KEYS = 1 << 20
+WORD_BITS = 32
+WORD_MASK = np.uint64((1 << WORD_BITS) - 1)
+SKETCH_DEPTH = 4
+# nltk.metrics.association._SMALL
+SMALL = 1e-20
+TOKEN = re.compile(r"\w+(?:[-']\w+)*|[^\w\s]")
+
+def tokenize(text: str) -> List[str]:
+    """Words and single punctuation marks, close to nltk.word_tokenize without its models"""
+    return TOKEN.findall(text)
+
+def count_shard(documents: List[Sequence[str]]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Words of a shard in first-seen order, their counts, and the shard's distinct bigram keys and counts.
+
+    Bigrams do not cross documents, as with
+    BigramCollocationFinder.from_documents. Keys use the shard's own word
+    ids (positions in the returned list).
+    """
+    # None ends each document; it takes id 0, so the lookup of every token runs in C through the defaultdict
+    local = defaultdict(count(1).__next__, {None: 0})
+    stream = chain.from_iterable(chain(document, (None,)) for document in documents)
+    ids = np.fromiter(map(local.__getitem__, stream), dtype=np.int64)
+    words = list(islice(local, 1, None))
+    unigrams = np.bincount(ids, minlength=len(words) + 1)[1:]
+    pairs = (ids[:-1] != 0) & (ids[1:] != 0)
+    keys = ((ids[:-1][pairs] - 1).astype(np.uint64) << np.uint64(WORD_BITS)) | (ids[1:][pairs] - 1).astype(np.uint64)
+    bigrams, counts = np.unique(keys, return_counts=True)
+    return words, unigrams, bigrams, counts
+
+def _count_shard(documents):
+    return count_shard(documents)
+
+def shards(documents: Iterable[Sequence[str]], size: int = SHARD_DOCUMENTS) -> Iterator[List[Sequence[str]]]:
+    documents = iter(documents)
+    while True:
+        shard = list(islice(documents, size))
+        if not shard:
+            return
+        yield shard
+
+def map_shards(documents: Iterable[Sequence[str]], processes: int, shard_size: int = SHARD_DOCUMENTS):
+    """count_shard results in input order, from a pool with a bounded number of shards in flight"""
+    if processes == 1:
+        for shard in shards(documents, shard_size):
+            yield count_shard(shard)
+        return
+    with Pool(processes) as pool:
+        # apply_async with a window rather than imap, which would read every shard ahead
+        in_flight = deque()
+        for shard in shards(documents, shard_size):
+            in_flight.append(pool.apply_async(_count_shard, (shard,)))
+            if len(in_flight) >= SHARDS_IN_FLIGHT * processes:
+                yield in_flight.popleft().get()
+        while in_flight:
+            yield in_flight.popleft().get()
+
+def split_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """First and second word ids of bigram keys"""
+    return (keys >> np.uint64(WORD_BITS)).astype(np.int64), (keys & WORD_MASK).astype(np.int64)
+
+def join_keys(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    return (first.astype(np.uint64) << np.uint64(WORD_BITS)) | second.astype(np.uint64)
+
+def merge_counts(parts: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct keys of parts and their summed counts"""
+    keys = np.concatenate([part[0] for part in parts])
+    counts = np.concatenate([part[1] for part in parts])
+    order = np.argsort(keys)
+    keys, counts = keys[order], counts[order]
+    starts = np.flatnonzero(np.concatenate((keys[:1] == keys[:1], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(counts, starts) if len(keys) else counts
+
+class CountMinSketch:
+    """Approximate counts of uint64 keys in SKETCH_DEPTH rows of width counters.
+
+    Rows use multiply-shift hashing; an estimate is the smallest of a key's
+    counters, never below its true count.
+    """
+
+    def __init__(self, width: int, depth: int = SKETCH_DEPTH, seed: int = 0):
+        if width < 2 or width & (width - 1):
+            raise ValueError(f"sketch width must be a power of two, got {width}")
+        self.width = width
+        self.shift = np.uint64(64 - (width.bit_length() - 1))
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(0, 2 ** 63, depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def _columns(self, keys: np.ndarray) -> np.ndarray:
+        # uint64 products wrap around, which is the multiply-shift hash
+        return (keys[None, :] * self.multipliers[:, None]) >> self.shift
+
+    def add(self, keys: np.ndarray, counts: np.ndarray):
+        for row, columns in zip(self.table, self._columns(keys)):
+            np.add.at(row, columns.astype(np.int64), counts)
+
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        columns = self._columns(keys).astype(np.int64)
+        return np.min(np.take_along_axis(self.table, columns, axis=1), axis=0)
+
+class BigramCounter:
+    """Merges count_shard results into counts over one vocabulary"""
+
+    def __init__(self, sketch: Optional[CountMinSketch] = None):
+        self.ids: Dict[str, int] = defaultdict(count().__next__)
+        self.words: List[str] = []
+        self.unigrams = np.zeros(0, dtype=np.int64)
+        self.sketch = sketch
+        self._merged = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64))
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending_keys = 0
+
+    def remap(self, words: List[str]) -> np.ndarray:
+        """Ids of a shard's words, adding the ones not seen before"""
+        known = len(self.words)
+        ids = np.fromiter(map(self.ids.__getitem__, words), dtype=np.int64, count=len(words))
+        self.words.extend(words[i] for i in np.flatnonzero(ids >= known).tolist())
+        if len(self.words) > 1 << WORD_BITS:
+            raise ValueError(f"{len(self.words)} distinct words do not fit {WORD_BITS}-bit ids")
+        return ids
+
+    def add(self, words: List[str], unigrams: np.ndarray, keys: np.ndarray, counts: np.ndarray):
+        ids = self.remap(words)
+        if len(self.words) > len(self.unigrams):
+            self.unigrams = np.concatenate([self.unigrams, np.zeros(len(self.words) - len(self.unigrams), np.int64)])
+        self.unigrams[ids] += unigrams
+        first, second = split_keys(keys)
+        keys = join_keys(ids[first], ids[second])
+        if self.sketch is not None:
+            self.sketch.add(keys, counts)
+        else:
+            self.add_bigrams(keys, counts)
+
+    def add_bigrams(self, keys: np.ndarray, counts: np.ndarray):
+        """Adds exact counts of distinct bigram keys over this counter's vocabulary"""
+        self._pending.append((keys, counts))
+        self._pending_keys += len(keys)
+        if self._pending_keys > max(MERGE_MIN_KEYS, len(self._merged[0])):
+            self._merge()
+
+    def _merge(self):
+        parts, self._pending, self._pending_keys = [self._merged] + self._pending, [], 0
+        self._merged = merge_counts(parts)
+
+    def bigrams(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted bigram keys counted exactly and their counts"""
+        if self._pending:
+            self._merge()
+        return self._merged
+
+class CollocationTable:
+    """Bigrams with their counts and the unigram counts of their words, scored like BigramAssocMeasures.
+
+    As in BigramCollocationFinder, n_ix and n_xi are the unigram counts of
+    the two words and the total is the number of words.
+    """
+
+    def __init__(self, words: List[str], unigrams: np.ndarray, keys: np.ndarray, counts: np.ndarray):
+        self.words = words
+        self.unigrams = unigrams
+        self.keys = keys
+        self.counts = counts
+        self.total = int(unigrams.sum())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def apply_freq_filter(self, min_freq: int) -> 'CollocationTable':
+        """The bigrams occurring at least min_freq times"""
+        keep = self.counts >= min_freq
+        return CollocationTable(self.words, self.unigrams, self.keys[keep], self.counts[keep])
+
+    def marginals(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        first, second = split_keys(self.keys)
+        return self.counts.astype(np.float64), self.unigrams[first], self.unigrams[second]
+
+    def score(self, measure: str) -> np.ndarray:
+        """Scores of every bigram, evaluated in the same order as nltk so that ties come out equal"""
+        n_ii, n_ix, n_xi = self.marginals()
+        n_xx = self.total
+        if measure == 'pmi':
+            return np.log2(n_ii * n_xx) - np.log2((n_ix * n_xi).astype(np.float64))
+        if measure == 'student_t':
+            return (n_ii - (n_ix * n_xi) / n_xx) / (n_ii + SMALL) ** 0.5
+        if measure == 'likelihood_ratio':
+            n_oi = n_xi - n_ii
+            n_io = n_ix - n_ii
+            cells = (n_ii, n_oi, n_io, n_xx - n_ii - n_oi - n_io)
+            total = 0 + cells[0] + cells[1] + cells[2] + cells[3]
+            result = 0
+            for i in range(4):
+                expected = (cells[i] + cells[i ^ 1]) * (cells[i] + cells[i ^ 2]) / total
+                result = result + cells[i] * np.log(cells[i] / (expected + SMALL) + SMALL)
+            return 2 * result
+        raise ValueError(f"unknown measure {measure!r}, expected one of {', '.join(MEASURES)}")
+
+    def score_ngrams(self, measure: str, k: Optional[int] = None) -> List[Tuple[Tuple[str, str], float]]:
+        """(bigram, score) pairs from highest to lowest score, ties by the words, like nltk's score_ngrams"""
+        if k is not None and k <= 0:
+            return []
+        scores = self.score(measure)
+        if k is not None and k < len(scores):
+            # Every bigram scoring at least the k-th best, so ties at the boundary are ordered by their words
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            rows = np.flatnonzero(scores >= threshold)
+        else:
+            rows = np.arange(len(scores))
+        first, second = split_keys(self.keys[rows])
+        words = self.words
+        ranked = sorted(((words[a], words[b]), score) for a, b, score in
+                        zip(first.tolist(), second.tolist(), scores[rows].tolist()))
+        ranked.sort(key=lambda pair: -pair[1])
+        return ranked[:k]
+
+    def nbest(self, measure: str, k: int) -> List[Tuple[str, str]]:
+        """The top k bigrams, as nltk's nbest"""
+        return [bigram for bigram, _ in self.score_ngrams(measure, k)]
+
+def find_collocations(documents: Callable[[], Iterable[Sequence[str]]], min_freq: int = 1,
+                      processes: Optional[int] = None, shard_size: int = SHARD_DOCUMENTS,
+                      sketch_width: Optional[int] = None) -> CollocationTable:
+    """Bigram counts of tokenized documents, pruned to those occurring at least min_freq times.
+
+    documents returns a fresh iterable of token sequences on each call; it
+    is called twice when sketch_width is set.
+    """
+    processes = processes or os.cpu_count() or 1
+    counter = BigramCounter(CountMinSketch(sketch_width) if sketch_width else None)
+    for result in map_shards(documents(), processes, shard_size):
+        counter.add(*result)
+
+    if counter.sketch is not None:
+        # Second pass: exact counts of the bigrams the sketch lets through
+        for words, _, keys, counts in map_shards(documents(), processes, shard_size):
+            ids = counter.remap(words)
+            first, second = split_keys(keys)
+            keys = join_keys(ids[first], ids[second])
+            candidates = counter.sketch.estimate(keys) >= min_freq
+            counter.add_bigrams(keys[candidates], counts[candidates])
+
+    keys, counts = counter.bigrams()
+    return CollocationTable(counter.words, counter.unigrams, keys, counts).apply_freq_filter(min_freq)
+
+def reuters_documents() -> Iterator[List[str]]:
+    """Each Reuters article as its list of words (needs nltk.download('reuters'))"""
+    from nltk.corpus import reuters
+    for fileid in reuters.fileids():
+        yield list(reuters.words(fileid))
+
+def text_documents(path: str) -> Iterator[List[str]]:
+    """One document per line of a text file, tokenized with tokenize"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            yield tokenize(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank bigram collocations of a corpus")
+    parser.add_argument('path', nargs='?', help="text file with one document per line")
+    parser.add_argument('--reuters', action='store_true', help="use NLTK's Reuters corpus instead")
+    parser.add_argument('--measure', choices=MEASURES, default='pmi')
+    parser.add_argument('--min-freq', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--sketch-width', type=int, default=None,
+                        help="count-min sketch counters per row (a power of two) for bounded memory")
+    args = parser.parse_args()
+    if not args.reuters and not args.path:
+        parser.error("give a path or --reuters")
+
+    documents = reuters_documents if args.reuters else lambda: text_documents(args.path)
+    table = find_collocations(documents, args.min_freq, args.processes, sketch_width=args.sketch_width)
+    print(f"{table.total} words, {len(table)} bigrams occurring at least {args.min_freq} times")
+    for bigram, score in table.score_ngrams(args.measure, args.top):
+        print(f"{score:>12.4f}  {' '.join(bigram)}")
+
+if __name__ == '__main__':
+    main()
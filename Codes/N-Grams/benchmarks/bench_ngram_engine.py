@@ -0,0 +1,164 @@
+"""N-gram counting: the notebook's list of tuples vs ngram_engine, on a synthetic corpus.
+
+Writes a CSV of 10M texts (by default) of about 200 characters each, words
+drawn with Zipf-like frequencies from --vocab made-up words mixed with
+stopwords and punctuation, then counts bigrams (-n) in a child process per
+approach, which reports its own peak RSS:
+
+- notebook: read every text, process_texts into one list of tuples and
+  write a CSV row per occurrence, as the notebook does. Its memory grows
+  with the corpus, so it runs on the first --baseline-texts texts only
+- engine: count_file with --processes workers, then write_csv of the
+  distinct n-grams and their counts
+
+Before timing, the engine's counts are checked against a Counter over
+process_texts on the first 20k texts.
+
+    python benchmarks/bench_ngram_engine.py
+    python benchmarks/bench_ngram_engine.py --texts 1000000 --baseline-texts 200000 --processes 4
+"""
+import sys
+import os
+import argparse
+import csv
+import json
+import resource
+import subprocess
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ngram_engine import STOPWORDS, count_file, generate_ngrams, preprocess_text, read_texts
+
+CHECK_TEXTS = 20000
+BLOCK_TEXTS = 100000
+TEXT_CHARS = 200
+LETTERS = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+PUNCTUATION = [',', '.', '!', '?', ';']
+
+
+def make_words(count, rng):
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(LETTERS, size=rng.integers(3, 10))))
+    return sorted(words)
+
+
+def write_corpus(path, texts, vocab, rng):
+    # Content words follow a Zipf-like curve; about a third of all words are stopwords
+    words = np.array(list(rng.permutation(make_words(vocab, rng))) + sorted(STOPWORDS) + PUNCTUATION, dtype=object)
+    weights = np.concatenate([1.0 / np.arange(1, vocab + 1) ** 1.1,
+                              np.full(len(STOPWORDS), 0.5 / len(STOPWORDS) * sum(1.0 / np.arange(1, vocab + 1) ** 1.1)),
+                              np.full(len(PUNCTUATION), 0.02)])
+    weights /= weights.sum()
+    # ~40 words of ~6 letters fill 200 characters
+    per_text = 40
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([" Generated Text"])
+        for start in range(0, texts, BLOCK_TEXTS):
+            block = min(BLOCK_TEXTS, texts - start)
+            drawn = words[rng.choice(len(words), size=(block, per_text), p=weights)]
+            writer.writerows([' '.join(row)[:TEXT_CHARS]] for row in drawn.tolist())
+
+
+def process_texts(texts, n):
+    """The notebook's process_texts"""
+    all_ngrams = []
+    for text in texts:
+        words = preprocess_text(text)
+        ngrams = generate_ngrams(words, n)
+        all_ngrams.extend(ngrams)
+    return all_ngrams
+
+
+def run_notebook(path, n, texts, output):
+    df = [text for chunk in read_texts(path, limit=texts) for text in chunk]
+    ngrams_result = process_texts(df, n)
+    with open(output, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["N-gram"])
+        for ngram in ngrams_result:
+            writer.writerow([" ".join(ngram)])
+    return len(ngrams_result), None
+
+
+def run_engine(path, n, texts, output, processes):
+    counts = count_file(path, (n,), processes=processes, limit=texts)[n]
+    counts.write_csv(output)
+    return counts.total, len(counts)
+
+
+def peak_rss_mb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, workers / 1024
+
+
+def measure(args):
+    """Runs one approach in this (child) process and prints its numbers as JSON"""
+    output = os.path.join(os.path.dirname(args.corpus), f'{args.measure}.csv')
+    start = time.perf_counter()
+    if args.measure == 'notebook':
+        total, distinct = run_notebook(args.corpus, args.n, args.baseline_texts, output)
+    else:
+        total, distinct = run_engine(args.corpus, args.n, None, output, args.processes)
+    seconds = time.perf_counter() - start
+    own, workers = peak_rss_mb()
+    print(json.dumps({'seconds': seconds, 'ngrams': total, 'distinct': distinct, 'rss_mb': own,
+                      'worker_rss_mb': workers, 'output_mb': os.path.getsize(output) / 2 ** 20}))
+
+
+def check(corpus, n, processes):
+    texts = [text for chunk in read_texts(corpus, limit=CHECK_TEXTS) for text in chunk]
+    expected = Counter(process_texts(texts, n))
+    actual = count_file(corpus, (n,), chunk_size=3000, processes=processes, limit=CHECK_TEXTS)[n].to_dict()
+    return expected == actual
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--texts', type=int, default=10000000)
+    parser.add_argument('--baseline-texts', type=int, default=1000000)
+    parser.add_argument('--vocab', type=int, default=50000)
+    parser.add_argument('-n', type=int, default=2)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--measure', choices=['notebook', 'engine'], help=argparse.SUPPRESS)
+    parser.add_argument('--corpus', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, 'generated_texts.csv')
+        start = time.perf_counter()
+        write_corpus(corpus, args.texts, args.vocab, np.random.default_rng(0))
+        print(f"{args.texts} texts, {os.path.getsize(corpus) / 2 ** 20:.0f} MB CSV, "
+              f"written in {time.perf_counter() - start:.0f} s; {args.processes} processes, n={args.n}")
+        print(f"engine counts match Counter(process_texts) on {CHECK_TEXTS} texts: "
+              f"{check(corpus, args.n, args.processes)}\n")
+
+        print(f"{'approach':>9} {'texts':>9} {'seconds':>8} {'texts/s':>9} {'n-grams':>11} {'distinct':>10} "
+              f"{'peak RSS MB':>12} {'worker MB':>10} {'output MB':>10}")
+        for name in ['notebook', 'engine']:
+            texts = min(args.texts, args.baseline_texts) if name == 'notebook' else args.texts
+            command = [sys.executable, os.path.abspath(__file__), '--measure', name, '--corpus', corpus,
+                       '-n', str(args.n), '--processes', str(args.processes), '--baseline-texts', str(texts)]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{name:>9} {texts:>9} failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            numbers = json.loads(result.stdout)
+            distinct = numbers['distinct'] if numbers['distinct'] is not None else '-'
+            print(f"{name:>9} {texts:>9} {numbers['seconds']:>8.1f} {texts / numbers['seconds']:>9.0f} "
+                  f"{numbers['ngrams']:>11} {distinct:>10} {numbers['rss_mb']:>12.0f} "
+                  f"{numbers['worker_rss_mb']:>10.0f} {numbers['output_mb']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
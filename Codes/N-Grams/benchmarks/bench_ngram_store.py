@@ -0,0 +1,153 @@
+"""Bigram lookups: the notebook's one-row-per-occurrence CSV vs the memory-mapped NgramStore.
+
+Writes a synthetic corpus of 1M texts (by default, made as in
+bench_ngram_engine), the notebook's ngrams_output.csv for it (one row per
+bigram occurrence) and an NgramStore of orders 1..3, then answers "count
+of (w1, w2)" queries, half of them for bigrams that occur:
+
+- csv scan: reading the whole CSV per query, all the flat file allows
+- csv dict: loading the CSV into a Counter once (load time reported)
+- store: NgramStore.count per query, count_ids for a batch, and
+  continuations for "most likely next words"
+
+Counts from every method are checked against each other.
+
+    python benchmarks/bench_ngram_store.py
+    python benchmarks/bench_ngram_store.py --texts 200000 --queries 50000
+"""
+import sys
+import os
+import argparse
+import csv
+import random
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ngram_engine import count_file, generate_ngrams, preprocess_text, read_texts
+from ngram_store import NgramStore, generate_text
+from bench_ngram_engine import write_corpus
+
+SCAN_QUERIES = 3
+BATCH_QUERIES = 1000000
+
+
+def write_occurrences(corpus, path):
+    """The notebook's ngrams_output.csv: a header and one row per bigram occurrence"""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["N-gram"])
+        for chunk in read_texts(corpus):
+            for text in chunk:
+                writer.writerows([" ".join(ngram)] for ngram in generate_ngrams(preprocess_text(text), 2))
+
+
+def scan_count(path, ngram):
+    target = ' '.join(ngram)
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        return sum(row[0] == target for row in reader)
+
+
+def generate_random_text(min_chars=200):
+    """The notebook's generator"""
+    words = ["Hello", "this", "is", "Roshan", "Babu", ",", "pursuing", "my", "mtech", "in", "Mahindra", "University",
+             ".", "I", "am", "Indian", "Men's", "Throwball", "Player", "!"] * 50
+    random.shuffle(words)
+    return " ".join(words)[:min_chars]
+
+
+def rate(function, items):
+    start = time.perf_counter()
+    results = [function(item) for item in items]
+    return len(items) / (time.perf_counter() - start), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--texts', type=int, default=1000000)
+    parser.add_argument('--vocab', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, 'generated_texts.csv')
+        occurrences = os.path.join(directory, 'ngrams_output.csv')
+        store_path = os.path.join(directory, 'ngrams.store')
+        write_corpus(corpus, args.texts, args.vocab, rng)
+        write_occurrences(corpus, occurrences)
+
+        start = time.perf_counter()
+        counts = count_file(corpus, (1, 2, 3), processes=args.processes)
+        count_time = time.perf_counter() - start
+        start = time.perf_counter()
+        NgramStore.build(store_path, counts)
+        build_time = time.perf_counter() - start
+        distinct_sizes = []
+        for n in (1, 2, 3):
+            path = os.path.join(directory, f'ngram_counts_{n}.csv')
+            counts[n].write_csv(path)
+            distinct_sizes.append(os.path.getsize(path))
+        start = time.perf_counter()
+        store = NgramStore(store_path)
+        open_time = time.perf_counter() - start
+
+        # Half the queries are bigrams of the corpus, half random pairs of its words (mostly unseen)
+        bigrams = counts[2]
+        seen = bigrams.ngrams(rng.integers(0, len(bigrams), args.queries // 2))
+        words = np.array(counts[1].vocabulary.words, dtype=object)
+        unseen = [tuple(pair) for pair in words[rng.integers(0, len(words), (args.queries - len(seen), 2))].tolist()]
+        queries = seen + unseen
+        random.Random(0).shuffle(queries)
+
+        start = time.perf_counter()
+        with open(occurrences, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            loaded = Counter(tuple(row[0].split(' ')) for row in reader)
+        load_time = time.perf_counter() - start
+
+        scan_rate, scanned = rate(lambda ngram: scan_count(occurrences, ngram), queries[:SCAN_QUERIES])
+        dict_rate, expected = rate(lambda ngram: loaded.get(ngram, 0), queries)
+        store_rate, actual = rate(store.count, queries)
+        ids = store.encode_array(np.array(queries * (BATCH_QUERIES // len(queries) + 1), dtype=object)
+                                 [:BATCH_QUERIES].astype(str))
+        start = time.perf_counter()
+        batch = store.count_ids(ids)
+        batch_rate = len(ids) / (time.perf_counter() - start)
+        prefixes = [query[:1] for query in queries[:5000]]
+        continuation_rate, _ = rate(lambda prefix: store.continuations(prefix, 10), prefixes)
+        store_generate_rate, _ = rate(lambda _: generate_text(store, rng=rng), range(2000))
+        shuffle_generate_rate, _ = rate(lambda _: generate_random_text(), range(2000))
+
+        mismatches = sum(a != b for a, b in zip(expected, actual))
+        mismatches += sum(a != b for a, b in zip(scanned, expected))
+        mismatches += int((batch[:len(queries)] != np.array(expected)).sum())
+
+        print(f"{args.texts} texts: {bigrams.total} bigram occurrences, {len(bigrams)} distinct; "
+              f"counted (orders 1-3) in {count_time:.1f} s, store built in {build_time:.1f} s\n")
+        print(f"{'file':>30} {'MB':>9}")
+        print(f"{'ngrams_output.csv (bigrams)':>30} {os.path.getsize(occurrences) / 2 ** 20:>9.1f}")
+        for n, size in zip((1, 2, 3), distinct_sizes):
+            print(f"{f'ngram_counts_{n}.csv':>30} {size / 2 ** 20:>9.1f}")
+        print(f"{'ngrams.store (orders 1-3)':>30} {os.path.getsize(store_path) / 2 ** 20:>9.1f}\n")
+        print(f"{'method':>24} {'open s':>8} {'lookups/s':>12}")
+        print(f"{'csv scan per query':>24} {'-':>8} {scan_rate:>12.2f}")
+        print(f"{'csv into a Counter':>24} {load_time:>8.2f} {dict_rate:>12.0f}")
+        print(f"{'store.count':>24} {open_time:>8.4f} {store_rate:>12.0f}")
+        print(f"{'store.count_ids batch':>24} {'':>8} {batch_rate:>12.0f}")
+        print(f"{'store.continuations':>24} {'':>8} {continuation_rate:>12.0f}")
+        print(f"\nmismatched counts: {mismatches}")
+        print(f"texts generated per second: store {store_generate_rate:.0f}, shuffled word list {shuffle_generate_rate:.0f}")
+        print(f"sample: {generate_text(store, rng=rng)!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""Streaming n-gram counts for the N-Grams notebook.
+
+The notebook cleans every text with preprocess_text, turns it into a list
+of word tuples with generate_ngrams and keeps one list entry per n-gram
+occurrence. Here texts are read from the CSV in chunks, words are mapped
+to integer ids, and each n-gram becomes one uint64 key (64 // n bits per
+word id), so a chunk's n-grams are counted with a single np.unique. Chunks
+are counted in a process pool and the partial counts merged as they
+arrive, which leaves one (key, count) pair per distinct n-gram in memory.
+
+    python ngram_engine.py generated_texts.csv -n 2 3
+    python ngram_engine.py corpus.csv -n 2 --processes 4 --output bigrams.csv
+"""
+import argparse
+import csv
+import os
+import string
+from collections import defaultdict, deque
+from itertools import count, islice
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+STOPWORDS = frozenset({
+    "i", "me", "my", "we", "our", "ours", "you", "your", "yours", "he", "him", "his", "she", "her", "hers",
+    "it", "its", "itself", "they", "them", "their", "theirs", "what", "which", "who", "whom", "this", "that",
+    "these", "those", "am", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "having",
+    "do", "does", "did", "doing", "a", "an", "the", "and", "but", "if", "or", "because", "as", "until", "while",
+    "of", "at", "by", "for", "with", "before", "after", "above", "below", "to", "from", "up", "down", "in",
+    "out", "on", "off", "over", "under", "then", "once", "here", "there", "when", "where", "why", "how", "all",
+    "any", "both", "each", "few", "more", "most", "other", "some", "such", "no", "nor", "not", "only", "own",
+    "same", "so", "than", "too", "very", "can", "will", "just", "now"
+})
+PUNCTUATION = str.maketrans('', '', string.punctuation)
+# Separates texts within a chunk; no punctuation, so translate keeps it
+TEXT_BREAK = '\x00'
+# Stopwords take the ids right after the text separator's, so dropping them is one comparison
+RESERVED_WORDS = tuple(sorted(STOPWORDS))
+CHUNK_TEXTS = 20000
+# Partial counts are merged once they hold more keys than this and than the merged counts
+MERGE_MIN_KEYS = 1 << 20
+# Chunks handed to the pool per worker before waiting for the oldest one
+CHUNKS_IN_FLIGHT = 2
+
+def preprocess_text(text: str) -> List[str]:
+    """Lowercased words of text without punctuation or stopwords"""
+    return [word for word in text.lower().translate(PUNCTUATION).split() if word not in STOPWORDS]
+
+def generate_ngrams(words: Sequence[str], n: int) -> List[tuple]:
+    """Every run of n consecutive words, as the notebook builds them"""
+    return [tuple(words[i:i + n]) for i in range(len(words) - n + 1)]
+
+def key_bits(n: int) -> int:
+    """Bits each word id gets in the uint64 key of an n-gram"""
+    if not 1 <= n <= 64:
+        raise ValueError(f"n-gram order must be between 1 and 64, got {n}")
+    return 64 // n
+
+def pack_ngrams(ids: np.ndarray, lengths: np.ndarray, n: int) -> np.ndarray:
+    """uint64 keys of the n-grams in texts whose word ids are concatenated in ids, lengths[i] per text"""
+    bits = np.uint64(key_bits(n))
+    per_text = np.maximum(lengths - n + 1, 0)
+    total = int(per_text.sum())
+    # Position of each n-gram's first word: its text's start plus its offset within the text
+    starts = np.cumsum(lengths) - lengths
+    first = np.repeat(starts - (np.cumsum(per_text) - per_text), per_text) + np.arange(total)
+    keys = ids[first]
+    for j in range(1, n):
+        keys = (keys << bits) | ids[first + j]
+    return keys
+
+def unpack_ngrams(keys: np.ndarray, n: int) -> np.ndarray:
+    """(len(keys), n) word ids of packed n-gram keys"""
+    bits = key_bits(n)
+    mask = np.uint64((1 << bits) - 1)
+    columns = [(keys >> np.uint64(bits * (n - 1 - j))) & mask for j in range(n)]
+    return np.stack(columns, axis=1)
+
+def repack_ngrams(columns: np.ndarray) -> np.ndarray:
+    """uint64 keys of (rows, n) word ids"""
+    n = columns.shape[1]
+    bits = np.uint64(key_bits(n))
+    keys = columns[:, 0].astype(np.uint64)
+    for j in range(1, n):
+        keys = (keys << bits) | columns[:, j].astype(np.uint64)
+    return keys
+
+def read_texts(path: str, chunk_size: int = CHUNK_TEXTS, column: int = 0,
+               limit: Optional[int] = None) -> Iterator[List[str]]:
+    """Lists of up to chunk_size texts from one column of a CSV file with a header row"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        rows = (row[column] for row in reader if len(row) > column)
+        if limit is not None:
+            rows = islice(rows, limit)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+def count_chunk(texts: List[str], orders: Sequence[int]) -> Tuple[List[str], Dict[int, Tuple[np.ndarray, np.ndarray]]]:
+    """Words of a chunk in first-seen order and, per order, its distinct n-gram keys and their counts.
+
+    Keys use the chunk's own word ids (positions in the returned list);
+    NgramCounter maps them onto the shared vocabulary.
+    """
+    # One lower/translate/split over the whole chunk, texts separated by a marker word: translating
+    # many short strings costs far more than one long one
+    joined = f' {TEXT_BREAK} '.join(texts)
+    marker = TEXT_BREAK
+    if joined.count(TEXT_BREAK) == len(texts) - 1:
+        tokens = joined.lower().translate(PUNCTUATION).split()
+    else:
+        # A text contains the marker itself: split the texts one at a time and separate them
+        # with a space, which split() never returns as a word
+        marker = ' '
+        tokens = []
+        for position, text in enumerate(texts):
+            if position:
+                tokens.append(marker)
+            tokens.extend(text.lower().translate(PUNCTUATION).split())
+
+    # Ids come from a defaultdict in first-seen order, so the lookup runs in C; the marker
+    # and the stopwords take the first ids and are dropped by comparing ids
+    reserved_words = (marker,) + RESERVED_WORDS
+    reserved = len(reserved_words)
+    local = defaultdict(count(reserved).__next__, zip(reserved_words, range(reserved)))
+    ids = np.fromiter(map(local.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    keep = ids >= reserved
+    text_of = np.cumsum(ids == 0)
+    lengths = np.bincount(text_of[keep], minlength=len(texts))
+    ids = (ids[keep] - reserved).astype(np.uint64)
+    words = list(islice(local, reserved, None))
+    counts = {}
+    for n in orders:
+        if len(words) > 1 << key_bits(n):
+            raise ValueError(f"{len(words)} distinct words do not fit the {key_bits(n)}-bit ids of {n}-gram keys")
+        counts[n] = np.unique(pack_ngrams(ids, lengths, n), return_counts=True)
+    return words, counts
+
+def _count_chunk(args):
+    return count_chunk(*args)
+
+class Vocabulary:
+    """Word <-> integer id, ids given in first-seen order"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = defaultdict(count().__next__)
+        self.words: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, words: List[str]) -> np.ndarray:
+        """Ids of words, adding the ones not seen before"""
+        known = len(self.words)
+        result = np.fromiter(map(self.ids.__getitem__, words), dtype=np.uint64, count=len(words))
+        self.words.extend(words[i] for i in np.flatnonzero(result >= known).tolist())
+        return result
+
+    def get(self, word: str) -> Optional[int]:
+        """Id of word, None if it was never added"""
+        return self.ids.get(word)
+
+    def decode(self, ids: np.ndarray) -> np.ndarray:
+        """Words of an array of ids, as an object array of the same shape"""
+        return np.array(self.words, dtype=object)[ids.astype(np.int64)]
+
+class NgramCounts:
+    """Distinct n-grams of one order as sorted uint64 keys, with their counts"""
+
+    def __init__(self, n: int, keys: np.ndarray, counts: np.ndarray, vocabulary: Vocabulary):
+        self.n = n
+        self.keys = keys
+        self.counts = counts
+        self.vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def total(self) -> int:
+        """Occurrences counted, what len(process_texts(texts, n)) would be"""
+        return int(self.counts.sum())
+
+    def ids(self) -> np.ndarray:
+        """(len(self), n) word ids of every n-gram"""
+        return unpack_ngrams(self.keys, self.n)
+
+    def ngrams(self, rows: Optional[np.ndarray] = None) -> List[tuple]:
+        """Word tuples of the n-grams at rows (all of them by default)"""
+        keys = self.keys if rows is None else self.keys[rows]
+        return [tuple(words) for words in self.vocabulary.decode(unpack_ngrams(keys, self.n)).tolist()]
+
+    def most_common(self, k: Optional[int] = None) -> List[Tuple[tuple, int]]:
+        """(n-gram, count) pairs, most frequent first like Counter.most_common"""
+        order = np.argsort(-self.counts, kind='stable')[:k]
+        return list(zip(self.ngrams(order), self.counts[order].tolist()))
+
+    def to_dict(self) -> Dict[tuple, int]:
+        return dict(zip(self.ngrams(), self.counts.tolist()))
+
+    def write_csv(self, path: str, block: int = 1 << 18):
+        """One "N-gram,Count" row per distinct n-gram, most frequent first"""
+        order = np.argsort(-self.counts, kind='stable')
+        words = np.array(self.vocabulary.words, dtype=object)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            f.write("N-gram,Count\r\n")
+            for start in range(0, len(order), block):
+                rows = order[start:start + block]
+                grams = words[unpack_ngrams(self.keys[rows], self.n).astype(np.int64)]
+                # Words have no punctuation or whitespace left, so rows need no csv quoting and are
+                # joined with elementwise object-array adds rather than a csv.writer call per row
+                lines = grams[:, 0]
+                for j in range(1, self.n):
+                    lines = lines + ' ' + grams[:, j]
+                f.write(''.join((lines + ',' + self.counts[rows].astype(str).astype(object) + '\r\n').tolist()))
+
+class NgramCounter:
+    """Merges the per-chunk counts of count_chunk into counts over the shared vocabulary"""
+
+    def __init__(self, orders: Sequence[int] = (2,)):
+        self.orders = tuple(orders)
+        self.vocabulary = Vocabulary()
+        self.texts = 0
+        self._merged = {n: (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)) for n in self.orders}
+        self._pending = {n: [] for n in self.orders}
+        self._pending_keys = dict.fromkeys(self.orders, 0)
+        self._max_words = 1 << key_bits(max(self.orders))
+
+    def add(self, words: List[str], counts: Dict[int, Tuple[np.ndarray, np.ndarray]], texts: int = 0):
+        """Adds the result of count_chunk"""
+        remap = self.vocabulary.add(words)
+        if len(self.vocabulary) > self._max_words:
+            raise ValueError(f"{len(self.vocabulary)} distinct words do not fit the "
+                             f"{key_bits(max(self.orders))}-bit ids of {max(self.orders)}-gram keys")
+        self.texts += texts
+        for n in self.orders:
+            keys, chunk_counts = counts[n]
+            # Local ids are distinct, so the remapped keys stay distinct within the chunk
+            self._pending[n].append((repack_ngrams(remap[unpack_ngrams(keys, n).astype(np.int64)]), chunk_counts))
+            self._pending_keys[n] += len(keys)
+            if self._pending_keys[n] > max(MERGE_MIN_KEYS, len(self._merged[n][0])):
+                self._merge(n)
+
+    def _merge(self, n: int):
+        parts = [self._merged[n]] + self._pending[n]
+        self._pending[n], self._merged[n] = [], None
+        keys = np.concatenate([part[0] for part in parts])
+        counts = np.concatenate([part[1] for part in parts])
+        del parts
+        # argsort and reduceat rather than np.unique(return_inverse=True): fewer full-size temporaries
+        order = np.argsort(keys)
+        keys, counts = keys[order], counts[order]
+        del order
+        starts = np.flatnonzero(np.concatenate((keys[:1] == keys[:1], keys[1:] != keys[:-1])))
+        self._merged[n] = (keys[starts], np.add.reduceat(counts, starts) if len(keys) else counts)
+        self._pending_keys[n] = 0
+
+    def result(self) -> Dict[int, NgramCounts]:
+        """NgramCounts per order for everything added so far"""
+        for n in self.orders:
+            if self._pending[n]:
+                self._merge(n)
+        return {n: NgramCounts(n, *self._merged[n], self.vocabulary) for n in self.orders}
+
+def count_ngrams(chunks: Iterable[List[str]], orders: Sequence[int] = (2,),
+                 processes: Optional[int] = None) -> Dict[int, NgramCounts]:
+    """Counts of every n-gram order in orders over chunks of texts, counted in a pool of processes.
+
+    Chunks are merged in the order they come in, so word ids (and the
+    result) do not depend on the number of processes.
+    """
+    counter = NgramCounter(orders)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for chunk in chunks:
+            counter.add(*count_chunk(chunk, counter.orders), texts=len(chunk))
+        return counter.result()
+
+    with Pool(processes) as pool:
+        # apply_async with a bounded window rather than imap, which would read every chunk ahead
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append((len(chunk), pool.apply_async(_count_chunk, ((chunk, counter.orders),))))
+            if len(in_flight) >= CHUNKS_IN_FLIGHT * processes:
+                texts, pending = in_flight.popleft()
+                counter.add(*pending.get(), texts=texts)
+        while in_flight:
+            texts, pending = in_flight.popleft()
+            counter.add(*pending.get(), texts=texts)
+    return counter.result()
+
+def count_file(path: str, orders: Sequence[int] = (2,), chunk_size: int = CHUNK_TEXTS,
+               processes: Optional[int] = None, column: int = 0, limit: Optional[int] = None) -> Dict[int, NgramCounts]:
+    """count_ngrams over the texts in one column of a CSV file, like generated_texts.csv"""
+    return count_ngrams(read_texts(path, chunk_size, column, limit), orders, processes)
+
+def main():
+    parser = argparse.ArgumentParser(description="Count distinct n-grams in a CSV of texts")
+    parser.add_argument('path', help="CSV file with a header row, e.g. generated_texts.csv")
+    parser.add_argument('-n', type=int, nargs='+', default=[2], help="n-gram orders to count")
+    parser.add_argument('--output', default='ngram_counts_{n}.csv',
+                        help="output CSV per order; {n} is replaced by the order")
+    parser.add_argument('--column', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_TEXTS)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    results = count_file(args.path, args.n, args.chunk_size, args.processes, args.column)
+    for n, counts in results.items():
+        path = args.output.format(n=n)
+        counts.write_csv(path)
+        print(f"{n}-grams: {counts.total} occurrences, {len(counts)} distinct -> {path}")
+
+if __name__ == '__main__':
+    main()
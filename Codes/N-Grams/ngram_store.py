@@ -0,0 +1,333 @@
+"""A memory-mapped n-gram language model built from ngram_engine counts.
+
+Each order n is a sorted array of uint64 n-gram keys (word ids packed as
+in ngram_engine, first word in the high bits) with a parallel array of
+counts, and the vocabulary is a sorted fixed-width bytes array whose
+positions are the word ids. Everything sits in one file that is opened
+with mmap, so opening costs nothing and pages are read as lookups touch
+them:
+
+- count(('roshan', 'babu')): a binary search of the bigram keys
+- continuations(('roshan',)): the n-grams starting with a prefix are one
+  contiguous key range, found with two binary searches
+- score / generate_text: stupid backoff (Brants et al., 2007) over the
+  stored orders, replacing the notebook's shuffled word list
+
+    python ngram_store.py build generated_texts.csv ngrams.store -n 3
+    python ngram_store.py query ngrams.store roshan babu
+    python ngram_store.py generate ngrams.store --texts 5
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ngram_engine import NgramCounts, count_file, key_bits, repack_ngrams, unpack_ngrams
+
+STORE_MAGIC = b'NGRAMS01'
+STORE_VERSION = 1
+ALIGNMENT = 64
+# Stupid backoff multiplies the score of a shorter context by this for every order it backs off
+BACKOFF = 0.4
+MIN_CHARS = 200
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def _count_dtype(counts: np.ndarray) -> np.dtype:
+    top = int(counts.max()) if len(counts) else 0
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if top <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+def write_store(counts: Dict[int, NgramCounts], path: str):
+    """Write the counts of orders 1..N (all sharing one vocabulary) to path atomically"""
+    orders = sorted(counts)
+    if orders != list(range(1, len(orders) + 1)):
+        raise ValueError(f"the store needs every order from 1 up, got {orders}")
+    vocabulary = counts[1].vocabulary
+
+    # Word ids become positions in the sorted vocabulary, so words are found by binary search
+    encoded = np.array([word.encode('utf-8') for word in vocabulary.words], dtype=bytes)
+    order = np.argsort(encoded, kind='stable')
+    rank = np.empty(len(order), dtype=np.uint64)
+    rank[order] = np.arange(len(order), dtype=np.uint64)
+    arrays = {'words': encoded[order]}
+    for n in orders:
+        keys = repack_ngrams(rank[counts[n].ids().astype(np.int64)])
+        by_key = np.argsort(keys)
+        arrays[f'keys{n}'] = keys[by_key]
+        arrays[f'counts{n}'] = counts[n].counts[by_key].astype(_count_dtype(counts[n].counts))
+    meta = {'version': STORE_VERSION, 'orders': len(orders), 'tokens': counts[1].total}
+
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        specs[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    header = json.dumps({'meta': meta, 'arrays': specs}).encode('utf-8')
+    data_start = _aligned(len(STORE_MAGIC) + 8 + len(header))
+
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(STORE_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + specs[name]['offset'])
+                f.write(np.ascontiguousarray(array).data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def open_store(path: str) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """Memory-map a store; the arrays are read-only views of the file"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(STORE_MAGIC)] != STORE_MAGIC:
+        raise ValueError(f"{path} is not an n-gram store")
+    start = len(STORE_MAGIC)
+    (header_length,) = struct.unpack('<Q', mapped[start:start + 8])
+    header = json.loads(mapped[start + 8:start + 8 + header_length])
+    if header['meta'].get('version') != STORE_VERSION:
+        raise ValueError(f"{path} is an n-gram store of version {header['meta'].get('version')}, "
+                         f"expected {STORE_VERSION}")
+    data_start = _aligned(start + 8 + header_length)
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        count = int(np.prod(spec['shape']))
+        if count == 0:
+            arrays[name] = np.empty(spec['shape'], dtype=spec['dtype'])
+        else:
+            arrays[name] = np.frombuffer(
+                mapped, dtype=spec['dtype'], count=count, offset=data_start + spec['offset']
+            ).reshape(spec['shape'])
+    return header['meta'], arrays
+
+class NgramStore:
+    """Counts, continuations and stupid-backoff scores of the n-grams in a store file"""
+
+    def __init__(self, path: str):
+        meta, arrays = open_store(path)
+        self.path = path
+        self.max_order = meta['orders']
+        self.tokens = meta['tokens']
+        self.words = arrays['words']
+        self.keys = [None] + [arrays[f'keys{n}'] for n in range(1, self.max_order + 1)]
+        self.counts = [None] + [arrays[f'counts{n}'] for n in range(1, self.max_order + 1)]
+        # Cumulative unigram counts, computed on the first sample that needs them
+        self._unigrams = None
+
+    @classmethod
+    def build(cls, path: str, counts: Dict[int, NgramCounts]) -> 'NgramStore':
+        write_store(counts, path)
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def word_id(self, word: str) -> Optional[int]:
+        encoded = word.encode('utf-8')
+        i = int(self.words.searchsorted(encoded))
+        if i < len(self.words) and self.words[i] == encoded:
+            return i
+        return None
+
+    def word(self, word_id: int) -> str:
+        return self.words[word_id].decode('utf-8')
+
+    def encode(self, words: Sequence[str]) -> Optional[List[int]]:
+        """Word ids, None if any word is not in the vocabulary"""
+        ids = []
+        for word in words:
+            word_id = self.word_id(word)
+            if word_id is None:
+                return None
+            ids.append(word_id)
+        return ids
+
+    def encode_array(self, words: np.ndarray) -> np.ndarray:
+        """Ids of an array of words (str or UTF-8 bytes) of any shape, -1 for unknown words"""
+        encoded = np.char.encode(words, 'utf-8') if words.dtype.kind == 'U' else words.astype(bytes)
+        ids = np.searchsorted(self.words, encoded)
+        found = ids < len(self.words)
+        found[found] = self.words[ids[found]] == encoded[found]
+        return np.where(found, ids, -1)
+
+    def _count_ids(self, ids: Sequence[int]) -> int:
+        n = len(ids)
+        bits = key_bits(n)
+        key = 0
+        for word_id in ids:
+            key = (key << bits) | word_id
+        keys = self.keys[n]
+        # A Python int would make searchsorted convert the whole array
+        i = int(keys.searchsorted(np.uint64(key)))
+        return int(self.counts[n][i]) if i < len(keys) and int(keys[i]) == key else 0
+
+    def count(self, ngram: Sequence[str]) -> int:
+        """Occurrences of a 1..max_order word n-gram, 0 if unseen"""
+        if not 1 <= len(ngram) <= self.max_order:
+            raise ValueError(f"the store holds 1- to {self.max_order}-grams, got {len(ngram)} words")
+        ids = self.encode(ngram)
+        return 0 if ids is None else self._count_ids(ids)
+
+    def count_ids(self, ids: np.ndarray) -> np.ndarray:
+        """Counts of (rows, n) word ids, one binary search per row; rows with -1 ids count 0"""
+        ids = np.asarray(ids)
+        n = ids.shape[1]
+        known = (ids >= 0).all(axis=1)
+        keys = repack_ngrams(np.where(known[:, None], ids, 0))
+        stored = self.keys[n]
+        positions = np.searchsorted(stored, keys).clip(max=max(len(stored) - 1, 0))
+        hit = known & (stored[positions] == keys) if len(stored) else np.zeros(len(keys), dtype=bool)
+        return np.where(hit, self.counts[n][positions], 0).astype(np.int64)
+
+    def _range(self, prefix: Sequence[int]) -> Tuple[int, int, int]:
+        """Order and [start, stop) of the stored n-grams that extend prefix by one word"""
+        n = len(prefix) + 1
+        if n == 1:
+            return n, 0, len(self.keys[1])
+        bits = key_bits(n)
+        low = 0
+        for word_id in prefix:
+            low = (low << bits) | word_id
+        low <<= bits
+        high = low + (1 << bits)
+        keys = self.keys[n]
+        start = int(keys.searchsorted(np.uint64(low)))
+        stop = int(keys.searchsorted(np.uint64(high))) if high < 1 << 64 else len(keys)
+        return n, start, stop
+
+    def continuations(self, prefix: Sequence[str], limit: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """(next word, count) after prefix, most frequent first"""
+        if len(prefix) >= self.max_order:
+            raise ValueError(f"prefixes can have at most {self.max_order - 1} words, got {len(prefix)}")
+        ids = self.encode(prefix)
+        if ids is None:
+            return []
+        n, start, stop = self._range(ids)
+        counts = self.counts[n][start:stop]
+        top = np.argsort(-counts.astype(np.int64), kind='stable')[:limit]
+        next_ids = unpack_ngrams(self.keys[n][start:stop][top], n)[:, -1]
+        return [(self.word(int(word_id)), int(count)) for word_id, count in zip(next_ids, counts[top])]
+
+    def score(self, word: str, context: Sequence[str] = ()) -> float:
+        """Stupid-backoff score of word after context (not a normalized probability)"""
+        word_id = self.word_id(word)
+        if word_id is None:
+            return 0.0
+        return self._score_ids(word_id, [self.word_id(token) for token in self._context(context)])
+
+    def _context(self, context: Sequence) -> list:
+        """The last max_order - 1 items of context, the most a next word is conditioned on"""
+        return list(context)[len(context) - self.max_order + 1:] if self.max_order > 1 else []
+
+    def _score_ids(self, word_id: int, context: List[Optional[int]]) -> float:
+        penalty = 1.0
+        # Unknown context words cut the context short: nothing before them can match
+        while None in context:
+            context = context[context.index(None) + 1:]
+        while context:
+            numerator = self._count_ids(context + [word_id])
+            if numerator:
+                return penalty * numerator / self._count_ids(context)
+            context = context[1:]
+            penalty *= BACKOFF
+        return penalty * self._count_ids([word_id]) / self.tokens
+
+    def next_word(self, context: Sequence[int], rng: np.random.Generator) -> int:
+        """A word id drawn after context (ids), in proportion to the counts of its continuations.
+
+        Like stupid backoff, the context is shortened only when no word
+        followed it; the unigram distribution is the last resort.
+        """
+        context = self._context(context)
+        while context:
+            n, start, stop = self._range(context)
+            if stop > start:
+                cumulative = np.cumsum(self.counts[n][start:stop], dtype=np.float64)
+                pick = min(int(cumulative.searchsorted(rng.random() * cumulative[-1], side='right')), stop - start - 1)
+                return int(self.keys[n][start + pick]) & ((1 << key_bits(n)) - 1)
+            context = context[1:]
+        if self._unigrams is None:
+            self._unigrams = np.cumsum(self.counts[1], dtype=np.float64)
+        if not len(self._unigrams):
+            raise ValueError("the store has no words to sample")
+        return min(int(self._unigrams.searchsorted(rng.random() * self._unigrams[-1], side='right')),
+                   len(self._unigrams) - 1)
+
+    def generate(self, min_chars: int = MIN_CHARS, seed: Sequence[str] = (),
+                 rng: Optional[np.random.Generator] = None) -> str:
+        """Words sampled from the model until the text has at least min_chars characters"""
+        rng = rng or np.random.default_rng()
+        words = list(seed)
+        context = []
+        for word in words:
+            word_id = self.word_id(word)
+            # An unknown word breaks the context: the model has seen nothing after it
+            context = [] if word_id is None else context + [word_id]
+        length = len(' '.join(words))
+        while length < min_chars:
+            word_id = self.next_word(context, rng)
+            context.append(word_id)
+            words.append(self.word(word_id))
+            length += len(words[-1]) + (len(words) > 1)
+        return ' '.join(words)
+
+def generate_text(store: NgramStore, min_chars: int = MIN_CHARS, rng: Optional[np.random.Generator] = None) -> str:
+    """Drop-in for the notebook's generate_random_text: one text sampled from the model"""
+    return store.generate(min_chars, rng=rng)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query a memory-mapped n-gram store")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="count a CSV of texts and write the store")
+    build.add_argument('path', help="CSV file with a header row, e.g. generated_texts.csv")
+    build.add_argument('store')
+    build.add_argument('-n', type=int, default=3, help="highest order stored")
+    build.add_argument('--column', type=int, default=0)
+    build.add_argument('--processes', type=int, default=None)
+    query = commands.add_parser('query', help="count of the words and their most likely continuations")
+    query.add_argument('store')
+    query.add_argument('words', nargs='+')
+    query.add_argument('--limit', type=int, default=10)
+    generate = commands.add_parser('generate', help="sample texts from the model")
+    generate.add_argument('store')
+    generate.add_argument('--texts', type=int, default=1)
+    generate.add_argument('--min-chars', type=int, default=MIN_CHARS)
+    generate.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        counts = count_file(args.path, range(1, args.n + 1), processes=args.processes, column=args.column)
+        store = NgramStore.build(args.store, counts)
+        sizes = ', '.join(f'{len(store.keys[n])} {n}-grams' for n in range(1, store.max_order + 1))
+        print(f"{args.store}: {sizes}, {os.path.getsize(args.store) / 2 ** 20:.1f} MB")
+    elif args.command == 'query':
+        store = NgramStore(args.store)
+        words = [word.lower() for word in args.words]
+        if len(words) <= store.max_order:
+            print(f"count {' '.join(words)!r}: {store.count(words)}")
+        if len(words) < store.max_order:
+            for word, count in store.continuations(words, args.limit):
+                print(f"  {word:<20} {count:>10}  score {store.score(word, words):.4f}")
+    else:
+        store = NgramStore(args.store)
+        rng = np.random.default_rng(args.seed)
+        for _ in range(args.texts):
+            print(generate_text(store, args.min_chars, rng))
+
+if __name__ == '__main__':
+    main()
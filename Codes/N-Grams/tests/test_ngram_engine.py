@@ -0,0 +1,24 @@
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ngram_engine import TEXT_BREAK, count_ngrams, generate_ngrams, preprocess_text
+
+
+def expected_counts(texts, n):
+    return Counter(ngram for text in texts for ngram in generate_ngrams(preprocess_text(text), n))
+
+
+@pytest.mark.parametrize('texts', [
+    ["The quick brown fox", "jumps over the lazy dog", "quick brown fox again!"],
+    [f"x{TEXT_BREAK}y fox den", "fox den", f"a {TEXT_BREAK} b fox"],
+    [TEXT_BREAK, f"{TEXT_BREAK}{TEXT_BREAK} fox", "fox den"],
+])
+@pytest.mark.parametrize('n', [1, 2, 3])
+def test_counts_match_counter_of_preprocessed_texts(texts, n):
+    counts = count_ngrams([texts], orders=(n,), processes=1)[n]
+    assert counts.to_dict() == dict(expected_counts(texts, n))
@@ -0,0 +1,233 @@
+"""Batch extractive summarization for the PageRank & MultiDoc notebook.
+
+The notebook's extractive_summarization summarizes one string: it runs
+nltk.word_tokenize over the whole text, then again over every sentence,
+and loads the stopword list on every call. Here:
+
+- each sentence is tokenized once and the same tokens feed both the word
+  frequencies and the sentence scores
+- the punkt model, word tokenizer and stopwords are loaded once per
+  process (in the pool initializer for workers)
+- documents are read as a stream from JSONL, CSV or TSV, summarized in batches
+  by a process pool and written out in input order as they complete
+
+Two methods: 'frequency' (the notebook's extractive_summarization) and
+'textrank' (text_rank_summarization, on the sparse graph of
+textrank_engine).
+
+    python batch_summarizer.py tickets.jsonl summaries.jsonl --processes 4
+    python batch_summarizer.py tickets.csv - --text-field body --id-field ticket_id --method textrank
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+from collections import deque
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from textrank_engine import SENTENCE_END, TOP_K, TextRank
+
+METHODS = ('frequency', 'textrank')
+# Documents sent to a worker at once, and batches per worker queued ahead of the output
+BATCH_DOCUMENTS = 64
+BATCHES_IN_FLIGHT = 4
+FORMATS = ('jsonl', 'csv', 'tsv')
+DELIMITERS = {'csv': ',', 'tsv': '\t'}
+
+def load_sentence_splitter() -> Callable[[str], List[str]]:
+    """punkt's sentence tokenizer (what nltk.sent_tokenize uses), or split after . ! and ? without the model"""
+    try:
+        from nltk.tokenize import PunktTokenizer
+        return PunktTokenizer('english').tokenize
+    except LookupError:
+        return lambda text: [sentence for sentence in SENTENCE_END.split(text.strip()) if sentence]
+
+def load_stopwords() -> frozenset:
+    """NLTK's English stopwords, or scikit-learn's list when the NLTK corpus is not installed"""
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words('english'))
+    except LookupError:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        return frozenset(ENGLISH_STOP_WORDS)
+
+class Summarizer:
+    """Summarizes one document at a time with resources loaded once"""
+
+    def __init__(self, method: str = 'frequency', num_sentences: int = 2, top_k: Optional[int] = TOP_K):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, not {method!r}")
+        from nltk.tokenize import NLTKWordTokenizer
+        self.method = method
+        self.num_sentences = num_sentences
+        self.top_k = top_k
+        self.split_sentences = load_sentence_splitter()
+        # nltk.word_tokenize is this tokenizer applied to each punkt sentence
+        self.tokenize = NLTKWordTokenizer().tokenize
+        self.stopwords = load_stopwords()
+
+    def __call__(self, text: str) -> str:
+        if self.method == 'frequency':
+            return self.frequency_summary(text)
+        return self.text_rank_summary(text)
+
+    def frequency_summary(self, text: str) -> str:
+        """The notebook's extractive_summarization, tokenizing each sentence once"""
+        sentences = self.split_sentences(text)
+        tokens = [[word.lower() for word in self.tokenize(sentence)] for sentence in sentences]
+        word_frequencies: Dict[str, float] = {}
+        for words in tokens:
+            for word in words:
+                if word not in self.stopwords and word.isalnum():
+                    word_frequencies[word] = word_frequencies.get(word, 0) + 1
+        if not word_frequencies:
+            return ''
+        max_freq = max(word_frequencies.values())
+        for word in word_frequencies:
+            word_frequencies[word] /= max_freq
+
+        sentence_scores: Dict[str, float] = {}
+        for sentence, words in zip(sentences, tokens):
+            for word in words:
+                if word in word_frequencies:
+                    sentence_scores[sentence] = sentence_scores.get(sentence, 0) + word_frequencies[word]
+        return ' '.join(heapq.nlargest(self.num_sentences, sentence_scores, key=sentence_scores.get))
+
+    def text_rank_summary(self, text: str) -> str:
+        """text_rank_summarization on the sparse TextRank graph"""
+        sentences = self.split_sentences(text)
+        if len(sentences) <= self.num_sentences:
+            return ' '.join(sentences)
+        try:
+            return TextRank(sentences, self.top_k).summary(self.num_sentences)
+        except ValueError as error:
+            # TfidfVectorizer found no word it keeps in any sentence
+            if 'empty vocabulary' not in str(error):
+                raise
+            return ' '.join(sentences[:self.num_sentences])
+
+_summarizer: Optional[Summarizer] = None
+
+def _load_summarizer(method: str, num_sentences: int, top_k: Optional[int]):
+    global _summarizer
+    _summarizer = Summarizer(method, num_sentences, top_k)
+
+def _summarize_batch(batch: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    return [(document_id, _summarizer(text)) for document_id, text in batch]
+
+def extractive_summarization(text: str, num_sentences: int = 2) -> str:
+    """The notebook's function, reusing the resources of earlier calls"""
+    global _summarizer
+    if _summarizer is None or _summarizer.method != 'frequency':
+        _summarizer = Summarizer('frequency', num_sentences)
+    _summarizer.num_sentences = num_sentences
+    return _summarizer(text)
+
+def batches(documents: Iterable[Tuple[str, str]], batch_size: int) -> Iterator[List[Tuple[str, str]]]:
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def summarize_documents(documents: Iterable[Tuple[str, str]], method: str = 'frequency', num_sentences: int = 2,
+                        processes: int = 1, top_k: Optional[int] = TOP_K,
+                        batch_size: int = BATCH_DOCUMENTS) -> Iterator[Tuple[str, str]]:
+    """(id, summary) of each (id, text) document, in input order, as soon as it and those before it are done"""
+    if processes == 1:
+        summarizer = Summarizer(method, num_sentences, top_k)
+        for document_id, text in documents:
+            yield document_id, summarizer(text)
+        return
+    with Pool(processes, initializer=_load_summarizer, initargs=(method, num_sentences, top_k)) as pool:
+        # apply_async with a window rather than imap, which would read every document ahead
+        in_flight = deque()
+        for batch in batches(documents, batch_size):
+            in_flight.append(pool.apply_async(_summarize_batch, (batch,)))
+            if len(in_flight) >= BATCHES_IN_FLIGHT * processes:
+                yield from in_flight.popleft().get()
+        while in_flight:
+            yield from in_flight.popleft().get()
+
+def detect_format(path: str, format: Optional[str]) -> str:
+    if format:
+        return format
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.json', '.ndjson'):
+        return 'jsonl'
+    if extension in ('.csv', '.tsv'):
+        return extension[1:]
+    raise ValueError(f"cannot tell the format of {path!r}; pass --format")
+
+def read_documents(file, format: str, text_field: str = 'text',
+                   id_field: str = 'id') -> Iterator[Tuple[str, str]]:
+    """(id, text) of each record of an open JSONL, CSV or TSV file.
+
+    The id is the record's position when it has none; a record without
+    text_field raises ValueError.
+    """
+    if format == 'jsonl':
+        records = (json.loads(line) for line in file if line.strip())
+    else:
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        records = csv.DictReader(file, delimiter=DELIMITERS[format])
+    for position, record in enumerate(records):
+        if text_field not in record:
+            raise ValueError(f"record {position} has no {text_field!r} field (it has {', '.join(map(str, record))})")
+        document_id = record.get(id_field)
+        yield str(position) if document_id is None else str(document_id), record[text_field] or ''
+
+def write_summaries(summaries: Iterable[Tuple[str, str]], file, format: str) -> int:
+    """Writes (id, summary) records as JSONL, CSV or TSV and returns how many there were"""
+    written = 0
+    if format == 'jsonl':
+        for document_id, summary in summaries:
+            file.write(json.dumps({'id': document_id, 'summary': summary}, ensure_ascii=False) + '\n')
+            written += 1
+    else:
+        writer = csv.writer(file, delimiter=DELIMITERS[format])
+        writer.writerow(['id', 'summary'])
+        for written, row in enumerate(summaries, 1):
+            writer.writerow(row)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Extractive summaries of a JSONL, CSV or TSV file of documents")
+    parser.add_argument('input', help="JSONL, CSV or TSV file, - for stdin")
+    parser.add_argument('output', help="JSONL, CSV or TSV file, - for stdout")
+    parser.add_argument('--format', choices=FORMATS, help="input format when the extension does not tell")
+    parser.add_argument('--output-format', choices=FORMATS, help="default: the input format")
+    parser.add_argument('--text-field', default='text')
+    parser.add_argument('--id-field', default='id')
+    parser.add_argument('--method', choices=METHODS, default='frequency')
+    parser.add_argument('--sentences', type=int, default=2)
+    parser.add_argument('--top-k', type=int, default=TOP_K, help="TextRank neighbours per sentence (0 for all)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--batch-size', type=int, default=BATCH_DOCUMENTS)
+    args = parser.parse_args()
+
+    input_format = detect_format(args.input, args.format) if args.input != '-' else args.format or 'jsonl'
+    output_format = args.output_format or (detect_format(args.output, None) if args.output != '-' else input_format)
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        documents = read_documents(source, input_format, args.text_field, args.id_field)
+        summaries = summarize_documents(documents, args.method, args.sentences, args.processes,
+                                        args.top_k or None, args.batch_size)
+        count = write_summaries(summaries, target, output_format)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        for file in (source, target):
+            if file not in (sys.stdin, sys.stdout):
+                file.close()
+    print(f"{count} documents summarized", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
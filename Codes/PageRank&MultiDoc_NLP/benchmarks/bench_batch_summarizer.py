@@ -0,0 +1,168 @@
+"""Support-ticket summarization: the notebook's extractive_summarization vs batch_summarizer.
+
+Writes --documents synthetic support tickets (3-12 sentences from a pool
+of ticket phrasings with random products, order numbers and names) to a
+JSONL file, then:
+
+- the notebook's function called once per ticket, timed over the first
+  --baseline tickets. It needs NLTK's punkt model and stopwords; when
+  they are not installed it runs with the same fallbacks as
+  batch_summarizer, loaded on every call as the notebook does
+- batch_summarizer's Summarizer on the same tickets, with the summaries
+  compared
+- the whole file through summarize_documents (read, summarize, write)
+  with each --processes count, for both methods, in docs/sec
+
+    python benchmarks/bench_batch_summarizer.py
+    python benchmarks/bench_batch_summarizer.py --documents 50000 --processes 1 2 4 8
+"""
+import sys
+import os
+import argparse
+import heapq
+import json
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_summarizer import (METHODS, Summarizer, load_sentence_splitter, load_stopwords, read_documents,
+                              summarize_documents, write_summaries)
+
+PRODUCTS = ['router', 'laptop', 'headset', 'monitor', 'keyboard', 'smart watch', 'printer', 'phone case',
+            'charger', 'webcam', 'tablet', 'speaker']
+NAMES = ['Anita', 'Rahul', 'Maria', 'John', 'Wei', 'Fatima', 'Carlos', 'Priya', 'Olga', 'Kenji']
+PHRASES = [
+    "I ordered a {product} last week and it still has not arrived.",
+    "My order number is {order}.",
+    "The tracking page says the {product} was delivered but I never received it.",
+    "I would like a refund for the {product} because it stopped working after two days.",
+    "Can you please send a replacement {product} as soon as possible?",
+    "The {product} keeps disconnecting from the network every few minutes.",
+    "I already tried restarting the {product} and resetting it to factory settings.",
+    "Your support agent {name} promised a call back but nobody contacted me.",
+    "This is the third time I am writing about order {order}.",
+    "The invoice shows a charge of {amount} dollars which is more than the listed price.",
+    "Please cancel my subscription and confirm by email.",
+    "The battery of the {product} drains within an hour.",
+    "I was charged twice for the same {product}.",
+    "Thank you for your help.",
+    "The screen of the {product} flickers when I change the brightness.",
+    "I need the warranty details for my {product}.",
+    "Could you update the shipping address on order {order}?",
+    "The package arrived damaged and the {product} is cracked.",
+    "{name} from your team told me the issue would be fixed in a week.",
+    "I am very disappointed with the service so far.",
+]
+
+
+def synthetic_tickets(count, seed=0):
+    rng = np.random.default_rng(seed)
+    for position in range(count):
+        phrases = rng.choice(len(PHRASES), size=rng.integers(3, 13))
+        text = ' '.join(PHRASES[phrase].format(product=PRODUCTS[rng.integers(len(PRODUCTS))],
+                                                name=NAMES[rng.integers(len(NAMES))],
+                                                order=f"#{rng.integers(100000, 999999)}",
+                                                amount=rng.integers(20, 900))
+                        for phrase in phrases)
+        yield {'id': f"T{position}", 'text': text}
+
+
+def notebook_tokenizers():
+    """nltk.sent_tokenize and nltk.word_tokenize, or batch_summarizer's fallbacks without the punkt model"""
+    import nltk
+    try:
+        nltk.data.find('tokenizers/punkt_tab/english/')
+        return nltk.sent_tokenize, nltk.word_tokenize
+    except LookupError:
+        from nltk.tokenize import NLTKWordTokenizer
+        tokenize = NLTKWordTokenizer().tokenize
+        split = load_sentence_splitter()
+        return split, lambda text: [word for sentence in split(text) for word in tokenize(sentence)]
+
+
+sent_tokenize, word_tokenize = notebook_tokenizers()
+
+
+def notebook_extractive_summarization(text, num_sentences=2):
+    """The notebook's extractive_summarization"""
+    sentences = sent_tokenize(text)
+    word_frequencies = {}
+    stopwords = set(load_stopwords())
+    words = word_tokenize(text)
+
+    for word in words:
+        word = word.lower()
+        if word not in stopwords and word.isalnum():
+            word_frequencies[word] = word_frequencies.get(word, 0) + 1
+
+    max_freq = max(word_frequencies.values())
+    for word in word_frequencies:
+        word_frequencies[word] /= max_freq
+
+    sentence_scores = {}
+    for sentence in sentences:
+        for word in word_tokenize(sentence.lower()):
+            if word in word_frequencies:
+                sentence_scores[sentence] = sentence_scores.get(sentence, 0) + word_frequencies[word]
+
+    summary_sentences = heapq.nlargest(num_sentences, sentence_scores, key=sentence_scores.get)
+    return ' '.join(summary_sentences)
+
+
+def process_counts():
+    """1, 2, 4, ... up to the number of CPUs, and that number"""
+    counts = [1]
+    while counts[-1] * 2 <= os.cpu_count():
+        counts.append(counts[-1] * 2)
+    return counts + [os.cpu_count()] if counts[-1] != os.cpu_count() else counts
+
+
+def summarize_file(source, target, method, processes):
+    with open(source, encoding='utf-8') as documents, open(target, 'w', encoding='utf-8') as output:
+        return write_summaries(summarize_documents(read_documents(documents, 'jsonl'), method, processes=processes),
+                               output, 'jsonl')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--documents', type=int, default=20000)
+    parser.add_argument('--baseline', type=int, default=2000)
+    parser.add_argument('--processes', type=int, nargs='+', default=process_counts())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'tickets.jsonl')
+        with open(source, 'w', encoding='utf-8') as f:
+            for ticket in synthetic_tickets(args.documents):
+                f.write(json.dumps(ticket) + '\n')
+        with open(source, encoding='utf-8') as f:
+            texts = [text for _, text in read_documents(f, 'jsonl')][:args.baseline]
+        print(f"{args.documents} tickets, {os.cpu_count()} CPUs\n")
+
+        start = time.perf_counter()
+        expected = [notebook_extractive_summarization(text) for text in texts]
+        notebook = len(texts) / (time.perf_counter() - start)
+        summarizer = Summarizer('frequency')
+        start = time.perf_counter()
+        actual = [summarizer(text) for text in texts]
+        shared = len(texts) / (time.perf_counter() - start)
+        print(f"per document, {len(texts)} tickets: notebook {notebook:.0f} docs/s, Summarizer {shared:.0f} docs/s "
+              f"({shared / notebook:.1f}x), {sum(a != e for a, e in zip(actual, expected))} different summaries\n")
+
+        print(f"{'method':>10} {'processes':>9} {'seconds':>9} {'docs/s':>9} {'scaling':>8}")
+        for method in METHODS:
+            single = None
+            for processes in args.processes:
+                start = time.perf_counter()
+                count = summarize_file(source, os.path.join(directory, 'summaries.jsonl'), method, processes)
+                seconds = time.perf_counter() - start
+                single = single or count / seconds
+                print(f"{method:>10} {processes:>9} {seconds:>9.2f} {count / seconds:>9.0f} "
+                      f"{count / seconds / single:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
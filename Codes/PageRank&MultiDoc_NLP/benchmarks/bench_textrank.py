@@ -0,0 +1,166 @@
+"""TextRank: the notebook's dense cosine_similarity + networkx graph vs textrank_engine.
+
+Sentences are synthetic: each draws its words from a mixture of a shared
+Zipf-like vocabulary and one of a few hundred topics, so sentences on the
+same topic are similar and the rest mostly are not.
+
+- check (at --check sentences): the engine with the full graph
+  (top_k=None, self loops, as from_numpy_array builds it) against
+  nx.pagerank, and how many of the top 10 sentences the top_k graph keeps
+- scaling: each approach at each size in a child process that reports
+  seconds, peak RSS and its rise over the RSS with the sentences loaded.
+  The dense baseline runs under a --memory-limit address space cap and
+  --timeout, and is reported as failed past either
+- incremental: appending --append sentences with TextRank.add vs
+  building the whole graph again, and the power iterations each needed
+
+    python benchmarks/bench_textrank.py
+    python benchmarks/bench_textrank.py --sizes 1000 10000 --top-k 20
+"""
+import sys
+import os
+import argparse
+import json
+import resource
+import subprocess
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from textrank_engine import TextRank
+
+VOCAB = 30000
+TOPICS = 300
+TOPIC_WORDS = 40
+TOPIC_SHARE = 0.5
+SIZES = [1000, 10000, 100000]
+
+
+def synthetic_sentences(count, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f'w{i}' for i in range(VOCAB)], dtype=object)
+    weights = 1.0 / np.arange(1, VOCAB + 1)
+    weights /= weights.sum()
+    topics = rng.integers(0, VOCAB, (TOPICS, TOPIC_WORDS))
+    sentences = []
+    for topic in rng.integers(0, TOPICS, count):
+        length = rng.integers(8, 30)
+        from_topic = rng.random(length) < TOPIC_SHARE
+        ids = rng.choice(VOCAB, size=length, p=weights)
+        ids[from_topic] = rng.choice(topics[topic], size=from_topic.sum())
+        sentences.append(' '.join(words[ids]))
+    return sentences
+
+
+def dense_pagerank(sentences):
+    """The notebook's text_rank_summarization up to the PageRank scores"""
+    import networkx as nx
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    tfidf_matrix = TfidfVectorizer().fit_transform(sentences)
+    similarity_matrix = cosine_similarity(tfidf_matrix)
+    nx_graph = nx.from_numpy_array(similarity_matrix)
+    scores = nx.pagerank(nx_graph)
+    return np.array([scores[i] for i in range(len(sentences))])
+
+
+def top_ten(scores):
+    return set(np.argsort(-scores, kind='stable')[:10].tolist())
+
+
+def memory_mb(field):
+    """VmRSS or VmHWM (peak RSS) of this process; unlike ru_maxrss the peak can be reset"""
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ':')) / 1024
+
+
+def measure(args):
+    """Ranks args.size sentences with one approach in this (child) process and prints JSON"""
+    sentences = synthetic_sentences(args.size)
+    before = memory_mb('VmRSS')
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    start = time.perf_counter()
+    if args.measure == 'dense':
+        dense_pagerank(sentences)
+        edges = args.size * args.size
+    else:
+        graph = TextRank(sentences, top_k=args.top_k, threshold=args.threshold)
+        edges = graph.graph().nnz
+    seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'rss_mb': memory_mb('VmHWM'), 'sentences_mb': before, 'edges': edges}))
+
+
+def limit_memory(megabytes):
+    def apply():
+        resource.setrlimit(resource.RLIMIT_AS, (megabytes << 20, megabytes << 20))
+    return apply
+
+
+def run(approach, size, args):
+    command = [sys.executable, os.path.abspath(__file__), '--measure', approach, '--size', str(size),
+               '--top-k', str(args.top_k), '--threshold', str(args.threshold)]
+    limit = limit_memory(args.memory_limit) if approach == 'dense' else None
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, preexec_fn=limit,
+                                timeout=args.timeout if approach == 'dense' else None)
+    except subprocess.TimeoutExpired:
+        return f"over {args.timeout} s"
+    if result.returncode != 0:
+        last = (result.stderr.strip().splitlines() or ['killed'])[-1]
+        return last[:60]
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--check', type=int, default=1000)
+    parser.add_argument('--append', type=int, default=1000)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--threshold', type=float, default=0.0)
+    parser.add_argument('--memory-limit', type=int, default=4096, help="address space cap of the dense run, MB")
+    parser.add_argument('--timeout', type=int, default=1800, help="seconds before the dense run is stopped")
+    parser.add_argument('--measure', choices=['dense', 'sparse'], help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args)
+        return
+
+    sentences = synthetic_sentences(args.check)
+    expected = dense_pagerank(sentences)
+    full = TextRank(sentences, top_k=None, threshold=0.0, self_loops=True)
+    sparse = TextRank(sentences, top_k=args.top_k, threshold=args.threshold)
+    print(f"{args.check} sentences: full graph vs nx.pagerank max |difference| "
+          f"{np.abs(full.scores - expected).max():.2e} (largest score {expected.max():.2e}); "
+          f"top_k={args.top_k} graph keeps {len(top_ten(sparse.scores) & top_ten(expected))}/10 of the top 10\n")
+
+    print(f"{'sentences':>9} {'approach':>8} {'seconds':>9} {'peak RSS MB':>12} {'over input':>11} {'edges':>12}")
+    for size in args.sizes:
+        for approach in ['dense', 'sparse']:
+            numbers = run(approach, size, args)
+            if isinstance(numbers, str):
+                print(f"{size:>9} {approach:>8} failed: {numbers}")
+                continue
+            print(f"{size:>9} {approach:>8} {numbers['seconds']:>9.2f} {numbers['rss_mb']:>12.0f} "
+                  f"{numbers['rss_mb'] - numbers['sentences_mb']:>11.0f} {numbers['edges']:>12}")
+
+    size = max(args.sizes)
+    sentences = synthetic_sentences(size + args.append)
+    graph = TextRank(sentences[:size], top_k=args.top_k, threshold=args.threshold)
+    start = time.perf_counter()
+    graph.add(sentences[size:])
+    appended = time.perf_counter() - start
+    warm = graph.iterations
+    start = time.perf_counter()
+    rebuilt = TextRank(sentences, top_k=args.top_k, threshold=args.threshold)
+    rebuild = time.perf_counter() - start
+    print(f"\nappending {args.append} sentences to {size}: add {appended:.2f} s, {warm} iterations; "
+          f"rebuilding {rebuild:.2f} s, {rebuilt.iterations} iterations")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_summarizer
+from batch_summarizer import Summarizer, detect_format, read_documents
+
+
+def test_text_rank_without_any_kept_word_returns_the_first_sentences():
+    summarizer = Summarizer('textrank', num_sentences=1)
+    assert summarizer('A. I. O.') == 'A.'
+
+
+def test_text_rank_errors_other_than_an_empty_vocabulary_propagate(monkeypatch):
+    def failing_text_rank(*args, **kwargs):
+        raise ValueError("kth(=30) out of bounds")
+    monkeypatch.setattr(batch_summarizer, 'TextRank', failing_text_rank)
+    with pytest.raises(ValueError, match='out of bounds'):
+        Summarizer('textrank', num_sentences=1)('One sentence here. Another one there. And a third.')
+
+
+def test_read_documents_splits_tsv_on_tabs():
+    lines = io.StringIO('id\ttext\nT1\tMy order is late, please help.\n')
+    assert list(read_documents(lines, detect_format('tickets.tsv', None))) == [('T1', 'My order is late, please help.')]
+
+
+def test_read_documents_without_the_text_field_raises():
+    with pytest.raises(ValueError, match="no 'text' field"):
+        list(read_documents(io.StringIO('{"id": 1, "body": "Hello."}\n'), 'jsonl'))
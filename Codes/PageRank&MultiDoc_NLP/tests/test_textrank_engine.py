@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import textrank_engine
+from textrank_engine import TextRank, _block_top
+
+
+def brute_force_top(scores, top_k, threshold):
+    """Each row's top_k scores above threshold, as sorted (row, score) pairs"""
+    found = []
+    for row, values in enumerate(scores):
+        best = np.sort(values)[::-1][:top_k]
+        found.extend((row, value) for value in best if value > threshold)
+    return sorted(found)
+
+
+@pytest.mark.parametrize('top_k', [1, 10, 30, 99])
+def test_block_top_with_top_k_above_the_cut_sample(monkeypatch, top_k):
+    monkeypatch.setattr(textrank_engine, 'CUT_SAMPLE', 16)
+    scores = np.random.default_rng(0).random((20, 100)).astype(np.float32)
+    rows, _, values = _block_top(scores, top_k, 0.0)
+    assert sorted(zip(rows.tolist(), values.tolist())) == brute_force_top(scores, top_k, 0.0)
+
+
+def test_text_rank_with_top_k_above_the_cut_sample(monkeypatch):
+    monkeypatch.setattr(textrank_engine, 'CUT_SAMPLE', 16)
+    rng = np.random.default_rng(1)
+    sentences = [' '.join(f"w{word}" for word in rng.integers(0, 200, 12)) for _ in range(300)]
+    sampled = TextRank(sentences, top_k=60)
+    monkeypatch.setattr(textrank_engine, 'CUT_SAMPLE', 10 ** 9)
+    partitioned = TextRank(sentences, top_k=60)
+    assert np.allclose(sampled.scores, partitioned.scores)
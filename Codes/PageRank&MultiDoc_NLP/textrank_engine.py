@@ -0,0 +1,232 @@
+"""Sparse TextRank for the PageRank & MultiDoc notebook.
+
+text_rank_summarization in the notebook builds the dense N x N
+cosine_similarity matrix, turns it into a networkx graph and runs
+nx.pagerank, which needs O(N^2) memory. Here each sentence keeps only
+its top_k most similar sentences (and/or those above a threshold), so
+the graph has at most N * top_k edges in a scipy CSR matrix:
+
+- similarities are computed a block of rows at a time, so no more than
+  BLOCK_SCORES scores exist at once. The few very common terms go
+  through a dense BLAS product and the rest through a sparse one, and
+  the scores stay the exact TF-IDF cosines
+- PageRank is power iteration on the sparse transition matrix, with the
+  same damping, dangling-node handling and stopping rule as nx.pagerank
+- TextRank.add appends sentences: it scores only the new rows and
+  columns, merges them into the neighbour lists and restarts the power
+  iteration from the previous ranks
+
+    python textrank_engine.py article.txt --sentences 3
+    python textrank_engine.py article.txt --top-k 20 --threshold 0.1
+"""
+import argparse
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+TOP_K = 10
+DAMPING = 0.85
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+# Similarity scores computed at once (a block of rows against every column)
+BLOCK_SCORES = 1 << 24
+# Terms in more than this share of the sentences are multiplied densely; there are few of them
+DENSE_MIN_SHARE = 0.01
+DENSE_MAX_TERMS = 512
+# Columns sampled per row to find a lower bound for its top_k-th best score
+CUT_SAMPLE = 4096
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def split_sentences(text: str) -> List[str]:
+    """nltk.sent_tokenize, or a split after . ! and ? when the punkt model is not installed"""
+    try:
+        import nltk
+        return nltk.sent_tokenize(text)
+    except LookupError:
+        return [sentence for sentence in SENTENCE_END.split(text.strip()) if sentence]
+
+def _split_columns(columns: sp.csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices of the terms multiplied densely (the most frequent) and sparsely"""
+    frequency = np.bincount(columns.indices, minlength=columns.shape[1])
+    common = np.flatnonzero(frequency > DENSE_MIN_SHARE * columns.shape[0])
+    if len(common) > DENSE_MAX_TERMS:
+        common = common[np.argsort(-frequency[common], kind='stable')[:DENSE_MAX_TERMS]]
+    rare = np.setdiff1d(np.arange(columns.shape[1]), common, assume_unique=True)
+    return common, rare
+
+def top_neighbors(rows: sp.csr_matrix, columns: sp.csr_matrix, top_k: Optional[int], threshold: float,
+                  self_offset: Optional[int] = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(row, column, similarity) of each row's top_k most similar columns above threshold.
+
+    rows and columns are L2-normalized TF-IDF vectors, so dot products are
+    cosines. Row i is the same sentence as column self_offset + i, which is
+    skipped; None when the rows are not among the columns.
+    """
+    common, rare = _split_columns(columns)
+    dense_columns = columns[:, common].toarray().T
+    sparse_columns = columns[:, rare].T.tocsr()
+    found_rows, found_columns, found_scores = [], [], []
+    block_rows = max(1, BLOCK_SCORES // max(1, columns.shape[0]))
+    for start in range(0, rows.shape[0], block_rows):
+        block = rows[start:start + block_rows]
+        scores = block[:, common].toarray() @ dense_columns
+        scores += (block[:, rare] @ sparse_columns).toarray()
+        local = np.arange(block.shape[0])
+        if self_offset is not None:
+            scores[local, local + start + self_offset] = -np.inf
+        block_rows_found, block_columns, block_scores = _block_top(scores, top_k, threshold)
+        found_rows.append(block_rows_found + start)
+        found_columns.append(block_columns)
+        found_scores.append(block_scores)
+    if not found_rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32)
+    return (np.concatenate(found_rows).astype(np.int64), np.concatenate(found_columns).astype(np.int64),
+            np.concatenate(found_scores).astype(np.float32))
+
+def _block_top(scores: np.ndarray, top_k: Optional[int],
+               threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(row, column, score) of each row's top_k scores above threshold in a dense block"""
+    if top_k is None or top_k >= scores.shape[1]:
+        rows, columns = np.nonzero(scores > threshold)
+        return rows, columns, scores[rows, columns]
+    if scores.shape[1] < 4 * CUT_SAMPLE:
+        picked = np.argpartition(scores, -top_k, axis=1)[:, -top_k:]
+        picked_scores = np.take_along_axis(scores, picked, axis=1)
+        keep = picked_scores > threshold
+        return np.nonzero(keep)[0], picked[keep], picked_scores[keep]
+    # The top_k-th best score among a sample of the columns is at most the row's top_k-th
+    # best, so only the few scores above it need sorting instead of partitioning whole rows
+    # At least top_k columns, or there is no top_k-th best in the sample
+    step = max(1, scores.shape[1] // max(CUT_SAMPLE, top_k))
+    cut = np.partition(scores[:, ::step], -top_k, axis=1)[:, -top_k]
+    # flatnonzero and divmod are several times faster than nonzero on a 2-D mask
+    found = np.flatnonzero((scores >= cut[:, None]) & (scores > threshold))
+    rows, columns = np.divmod(found, scores.shape[1])
+    values = scores.ravel()[found]
+    order = np.lexsort((-values, rows))
+    rows, columns, values = rows[order], columns[order], values[order]
+    keep = np.arange(len(rows)) - np.searchsorted(rows, rows) < top_k
+    return rows[keep], columns[keep], values[keep]
+
+def pagerank(weights: sp.csr_matrix, damping: float = DAMPING, tolerance: float = TOLERANCE,
+             max_iterations: int = MAX_ITERATIONS, start: Optional[np.ndarray] = None) -> Tuple[np.ndarray, int]:
+    """PageRank of a weighted graph by power iteration, and the iterations it took.
+
+    As nx.pagerank: rows are normalized by their weight, dangling nodes
+    spread their rank evenly, and iteration stops when the L1 change is
+    below N * tolerance.
+    """
+    n = weights.shape[0]
+    if n == 0:
+        return np.empty(0), 0
+    out_weight = np.asarray(weights.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    transition = (sp.diags(np.where(dangling, 0.0, 1.0 / np.where(dangling, 1.0, out_weight))) @ weights).T.tocsr()
+    ranks = np.full(n, 1.0 / n) if start is None else start / start.sum()
+    for iteration in range(1, max_iterations + 1):
+        previous = ranks
+        ranks = damping * (transition @ previous) + (damping * previous[dangling].sum() + 1 - damping) / n
+        if np.abs(ranks - previous).sum() < n * tolerance:
+            return ranks, iteration
+    raise RuntimeError(f"pagerank did not converge within {max_iterations} iterations")
+
+class TextRank:
+    """Sentences ranked by PageRank over a sparse TF-IDF similarity graph.
+
+    The vectorizer is fitted on the first sentences; sentences added later
+    are vectorized with its vocabulary and idf, so earlier scores and
+    neighbours stay valid (words it has never seen are ignored).
+    """
+
+    def __init__(self, sentences: Sequence[str], top_k: Optional[int] = TOP_K, threshold: float = 0.0,
+                 damping: float = DAMPING, tolerance: float = TOLERANCE, self_loops: bool = False, **vectorizer):
+        self.top_k = top_k
+        self.threshold = threshold
+        self.damping = damping
+        self.tolerance = tolerance
+        self.self_loops = self_loops
+        self.sentences = list(sentences)
+        self.vectorizer = TfidfVectorizer(dtype=np.float32, **vectorizer)
+        self.vectors = self.vectorizer.fit_transform(self.sentences).tocsr()
+        self._rows, self._columns, self._scores = top_neighbors(self.vectors, self.vectors, top_k, threshold)
+        self.iterations = 0
+        self._rank()
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def add(self, sentences: Sequence[str]):
+        """Appends sentences and re-ranks, starting the power iteration from the current ranks"""
+        if not sentences:
+            return
+        old = len(self.sentences)
+        new_vectors = self.vectorizer.transform(sentences).tocsr().astype(np.float32)
+        self.sentences.extend(sentences)
+        self.vectors = sp.vstack([self.vectors, new_vectors]).tocsr()
+
+        # New sentences against all of them; old sentences only against the new ones
+        new = top_neighbors(new_vectors, self.vectors, self.top_k, self.threshold, self_offset=old)
+        old_to_new = top_neighbors(self.vectors[:old], new_vectors, self.top_k, self.threshold, self_offset=None)
+        rows = np.concatenate([self._rows, new[0] + old, old_to_new[0]])
+        columns = np.concatenate([self._columns, new[1], old_to_new[1] + old])
+        scores = np.concatenate([self._scores, new[2], old_to_new[2]])
+        if self.top_k is not None:
+            rows, columns, scores = _keep_top(rows, columns, scores, self.top_k)
+        self._rows, self._columns, self._scores = rows, columns, scores
+        start = np.concatenate([self.scores * old, np.ones(len(sentences))])
+        self._rank(start)
+
+    def graph(self) -> sp.csr_matrix:
+        """Symmetric similarity weights: an edge wherever either sentence is among the other's neighbours"""
+        n = len(self.sentences)
+        weights = sp.coo_matrix((self._scores, (self._rows, self._columns)), shape=(n, n)).tocsr()
+        weights = weights.maximum(weights.T).tocsr()
+        if self.self_loops:
+            # The diagonal of cosine_similarity: 1, or 0 for sentences with no known words
+            weights = (weights + sp.diags((self.vectors.getnnz(axis=1) > 0).astype(weights.dtype))).tocsr()
+        return weights
+
+    def _rank(self, start: Optional[np.ndarray] = None):
+        self.scores, self.iterations = pagerank(self.graph().astype(np.float64), self.damping, self.tolerance,
+                                                start=start)
+
+    def ranked(self, count: Optional[int] = None) -> List[Tuple[float, str]]:
+        """(score, sentence), best first, ties by the sentence text as in the notebook"""
+        ranked = sorted(zip(self.scores.tolist(), self.sentences), reverse=True)
+        return ranked[:count]
+
+    def summary(self, num_sentences: int = 2) -> str:
+        return " ".join(sentence for _, sentence in self.ranked(num_sentences))
+
+def _keep_top(rows: np.ndarray, columns: np.ndarray, scores: np.ndarray, top_k: int):
+    """Each row's top_k entries of a (row, column, score) list"""
+    order = np.lexsort((-scores, rows))
+    rows, columns, scores = rows[order], columns[order], scores[order]
+    starts = np.searchsorted(rows, rows, side='left')
+    keep = np.arange(len(rows)) - starts < top_k
+    return rows[keep], columns[keep], scores[keep]
+
+def text_rank_summarization(text: str, num_sentences: int = 2, top_k: Optional[int] = TOP_K,
+                            threshold: float = 0.0) -> str:
+    """The notebook's text_rank_summarization on the sparse graph"""
+    sentences = split_sentences(text)
+    if len(sentences) <= num_sentences:
+        return " ".join(sentences)
+    return TextRank(sentences, top_k, threshold).summary(num_sentences)
+
+def main():
+    parser = argparse.ArgumentParser(description="Extractive summary of a text file with sparse TextRank")
+    parser.add_argument('path')
+    parser.add_argument('--sentences', type=int, default=2)
+    parser.add_argument('--top-k', type=int, default=TOP_K, help="neighbours kept per sentence (0 for all)")
+    parser.add_argument('--threshold', type=float, default=0.0, help="smallest similarity kept as an edge")
+    args = parser.parse_args()
+    with open(args.path, encoding='utf-8') as f:
+        text = f.read()
+    print(text_rank_summarization(text, args.sentences, args.top_k or None, args.threshold))
+
+if __name__ == '__main__':
+    main()
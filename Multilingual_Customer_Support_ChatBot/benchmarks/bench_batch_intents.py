@@ -0,0 +1,56 @@
+"""Throughput of per-message predict_intent vs batched predict_intents.
+
+Run from the project root (the directory that contains app/):
+
+    python benchmarks/bench_batch_intents.py
+"""
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.intent_classifier import IntentClassifier
+
+BURST_SIZES = [1, 32, 64, 128, 256]
+REPEATS = 20
+
+
+def make_burst(classifier, size, rng):
+    patterns, _ = classifier.prepare_training_data()
+    return [rng.choice(patterns) for _ in range(size)]
+
+
+def time_per_message(classifier, burst):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for text in burst:
+            classifier.predict_intent(text)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def time_batched(classifier, burst):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        classifier.predict_intents(burst)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    rng = random.Random(0)
+    classifier = IntentClassifier()
+    classifier.train_model(save=False)
+    
+    print(f"{'burst':>6} {'per-message msg/s':>18} {'batched msg/s':>14} {'speedup':>8}")
+    for size in BURST_SIZES:
+        burst = make_burst(classifier, size, rng)
+        assert [p[0] for p in classifier.predict_intents(burst)] == \
+            [classifier.predict_intent(text)[0] for text in burst]
+        single = time_per_message(classifier, burst)
+        batched = time_batched(classifier, burst)
+        print(f"{size:>6} {size / single:>18.0f} {size / batched:>14.0f} {single / batched:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Train time, single-message predict latency and accuracy of every intent engine.
+
+Runs on intents.json and on a large synthetic set (the real intents augmented
+with filler words, plus generated intents with their own keywords). Latency is
+measured per message for the sklearn pipeline and for the flat artifact.
+
+    python benchmarks/bench_intent_engines.py
+"""
+import sys
+import os
+import random
+import string
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.intent_classifier import IntentClassifier, fit_intent_model, ENGINES
+from app.models.intent_artifact import export_intent_model, load_intent_model
+
+LATENCY_SAMPLES = 1000
+SYNTHETIC_INTENTS = 40
+SYNTHETIC_PATTERNS = 200  # per generated intent
+AUGMENTED_COPIES = 30  # per real pattern
+
+
+def synthetic_dataset(X, y, rng):
+    filler = ' '.join(X).lower().split()
+    patterns, labels = [], []
+    for text, label in zip(X, y):
+        for _ in range(AUGMENTED_COPIES):
+            words = text.split()
+            words.insert(rng.randint(0, len(words)), rng.choice(filler))
+            if len(words) > 2:
+                words.pop(rng.randrange(len(words)))
+            patterns.append(' '.join(words))
+            labels.append(label)
+    for intent in range(SYNTHETIC_INTENTS):
+        keywords = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+                    for _ in range(12)]
+        for _ in range(SYNTHETIC_PATTERNS):
+            words = rng.sample(keywords, rng.randint(1, 3)) + rng.sample(filler, rng.randint(2, 6))
+            rng.shuffle(words)
+            patterns.append(' '.join(words))
+            labels.append(f'synthetic_{intent}')
+    return patterns, labels
+
+
+def percentiles(model, texts):
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        model.predict_proba([text])
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1e6, np.percentile(timings, 99) * 1e6
+
+
+def run(name, X, y, rng, directory):
+    print(f"\n{name}: {len(X)} patterns, {len(set(y))} intents")
+    print(f"{'engine':>11} {'train s':>8} {'accuracy':>9} {'conf>0.5':>9} "
+          f"{'sklearn p50/p99 us':>19} {'artifact p50/p99 us':>20}")
+    texts = [rng.choice(X) for _ in range(LATENCY_SAMPLES)]
+    for engine in ENGINES:
+        start = time.perf_counter()
+        model, accuracy = fit_intent_model(X, y, engine)
+        train_time = time.perf_counter() - start
+        
+        path = os.path.join(directory, f'{engine}.bin')
+        export_intent_model(model, path)
+        artifact = load_intent_model(path)
+        confident = np.mean(artifact.predict_proba(texts).max(axis=1) >= 0.5)
+        
+        sk_p50, sk_p99 = percentiles(model, texts)
+        fast_p50, fast_p99 = percentiles(artifact, texts)
+        print(f"{engine:>11} {train_time:>8.2f} {accuracy:>9.3f} {confident:>9.2f} "
+              f"{sk_p50:>9.0f}/{sk_p99:<9.0f} {fast_p50:>10.0f}/{fast_p99:<9.0f}")
+
+
+def main():
+    # SVC(probability=True) is deprecated in recent sklearn releases
+    warnings.simplefilter('ignore', FutureWarning)
+    rng = random.Random(0)
+    X, y = IntentClassifier().prepare_training_data()
+    # Import sklearn up front so the first engine's train time does not include it
+    fit_intent_model(X, y, 'logreg')
+    
+    with tempfile.TemporaryDirectory() as directory:
+        run('intents.json', X, y, rng, directory)
+        run('synthetic', *synthetic_dataset(X, y, rng), rng, directory)
+
+
+if __name__ == '__main__':
+    main()
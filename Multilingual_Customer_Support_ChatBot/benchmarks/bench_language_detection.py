@@ -0,0 +1,115 @@
+"""Detections/sec and agreement: plain langdetect vs the tiered LanguageDetector.
+
+The corpus mixes support messages in every supported language, long and short,
+drawn with a skewed distribution so common messages repeat as they do in a
+real chat stream.
+
+    python benchmarks/bench_language_detection.py
+"""
+import sys
+import os
+import random
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langdetect import detect
+from langdetect.lang_detect_exception import LangDetectException
+
+from app.utils.language_detector import LanguageDetector
+
+STREAM_SIZE = 5000
+
+SAMPLES = {
+    'en': ["Hello", "thanks", "Where is my order?", "I want to return these shoes",
+           "My package arrived damaged, what should I do?", "Can I change my delivery address?",
+           "How long does shipping take to Canada?", "Please cancel my subscription"],
+    'es': ["Hola", "gracias", "¿Dónde está mi pedido?", "Quiero devolver estos zapatos",
+           "Mi paquete llegó dañado, ¿qué debo hacer?", "¿Puedo cambiar mi dirección de entrega?",
+           "¿Cuánto tarda el envío a México?", "Por favor cancelen mi suscripción"],
+    'fr': ["Bonjour", "merci beaucoup", "Où est ma commande ?", "Je veux retourner ces chaussures",
+           "Mon colis est arrivé endommagé, que dois-je faire ?",
+           "Puis-je changer mon adresse de livraison ?", "Combien de temps prend la livraison ?",
+           "Veuillez annuler mon abonnement"],
+    'de': ["Hallo", "danke schön", "Wo ist meine Bestellung?", "Ich möchte diese Schuhe zurückgeben",
+           "Mein Paket ist beschädigt angekommen, was soll ich tun?",
+           "Kann ich meine Lieferadresse ändern?", "Wie lange dauert der Versand nach Österreich?",
+           "Bitte kündigen Sie mein Abonnement"],
+    'hi': ["नमस्ते", "धन्यवाद", "मेरा ऑर्डर कहाँ है?", "मैं ये जूते वापस करना चाहता हूँ",
+           "मेरा पैकेज खराब हालत में आया, मुझे क्या करना चाहिए?",
+           "क्या मैं अपना डिलीवरी पता बदल सकता हूँ?"],
+    'zh': ["你好", "谢谢", "我的订单在哪里？", "我想退回这双鞋", "我的包裹到达时已损坏，我该怎么办？",
+           "我可以更改送货地址吗？"],
+    'ja': ["こんにちは", "ありがとう", "注文はどこですか？", "この靴を返品したいです",
+           "荷物が破損して届きました。どうすればいいですか？", "配送先住所を変更できますか？"],
+    'ar': ["مرحبا", "شكرا", "أين طلبي؟", "أريد إرجاع هذا الحذاء", "وصلت الطرد تالفة، ماذا أفعل؟",
+           "هل يمكنني تغيير عنوان التسليم؟"],
+}
+
+
+def baseline_detect(text, supported):
+    """LanguageDetector.detect_language before the tiered fast path"""
+    try:
+        detected_lang = detect(text)
+        if detected_lang in supported:
+            return detected_lang
+        return 'en'
+    except LangDetectException:
+        return 'en'
+
+
+def make_stream(rng):
+    corpus = [(text, language) for language, texts in SAMPLES.items() for text in texts]
+    rng.shuffle(corpus)
+    # Zipf-like weights: a few messages are very common, most are rare
+    weights = [1.0 / (rank + 1) for rank in range(len(corpus))]
+    return rng.choices(corpus, weights=weights, k=STREAM_SIZE)
+
+
+def main():
+    rng = random.Random(0)
+    stream = make_stream(rng)
+    texts = [text for text, _ in stream]
+    supported = LanguageDetector().supported_languages
+    
+    start = time.perf_counter()
+    baseline = [baseline_detect(text, supported) for text in texts]
+    baseline_time = time.perf_counter() - start
+    
+    detector = LanguageDetector()
+    start = time.perf_counter()
+    single = [detector.detect_language(text) for text in texts]
+    single_time = time.perf_counter() - start
+    
+    batch_detector = LanguageDetector()
+    start = time.perf_counter()
+    batched = []
+    for offset in range(0, len(texts), 64):
+        batched.extend(batch_detector.detect_languages(texts[offset:offset + 64]))
+    batch_time = time.perf_counter() - start
+    assert batched == single
+    
+    print(f"{len(texts)} messages, {len(set(texts))} distinct\n")
+    print(f"{'detector':>22} {'detections/s':>13} {'speedup':>8}")
+    for name, elapsed in [('langdetect (before)', baseline_time),
+                          ('tiered', single_time),
+                          ('tiered, batches of 64', batch_time)]:
+        print(f"{name:>22} {len(texts) / elapsed:>13.0f} {baseline_time / elapsed:>7.1f}x")
+    print(f"\ntiers used: {detector.get_stats()}")
+    
+    agreement = sum(a == b for a, b in zip(baseline, single)) / len(texts)
+    print(f"\nagreement with langdetect: {agreement:.1%}")
+    expected = [language for _, language in stream]
+    for name, result in [('langdetect (before)', baseline), ('tiered', single)]:
+        correct = sum(a == b for a, b in zip(result, expected)) / len(texts)
+        print(f"accuracy vs labels, {name}: {correct:.1%}")
+    disagreements = Counter(
+        (language, old, new) for (_, language), old, new in zip(stream, baseline, single) if old != new
+    )
+    for (language, old, new), count in disagreements.most_common(10):
+        print(f"  {language}: {old} -> {new} ({count}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Cost of per-stage timing: ChatBot.process_message with metrics on and off.
+
+Runs the full pipeline in-process with the offline translation backend and the
+translation and response caches disabled, alternating enabled and disabled
+rounds so both see the same machine state. The timer calls alone are measured
+too, since they are the only work metrics add to a request.
+
+    python benchmarks/bench_metrics_overhead.py
+"""
+import sys
+import os
+import random
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.update(
+    TRANSLATION_BACKEND='local',
+    TRANSLATION_RATE_LIMIT='1000000',
+    TRANSLATION_BURST='1000000',
+    TRANSLATION_CACHE_SIZE='0',
+    TRANSLATION_CACHE_PATH='',
+    RESPONSE_CACHE_SIZE='0',
+)
+
+from app.main import chatbot, pipeline_metrics
+from app.utils.metrics import PIPELINE_STAGES
+
+ROUNDS = 10
+MESSAGES_PER_ROUND = 200
+TIMER_SAMPLES = 100000
+
+MESSAGES = [
+    "Where is my order?", "I want to return these shoes", "Can I change my delivery address?",
+    "¿Dónde está mi pedido?", "Quiero devolver estos zapatos", "Où est ma commande ?",
+    "Wo ist meine Bestellung?", "मेरा ऑर्डर कहाँ है?", "我的订单在哪里？", "注文はどこですか？", "أين طلبي؟",
+]
+
+
+def run_round(messages):
+    start = time.perf_counter()
+    for message in messages:
+        chatbot.process_message(message, session_id='bench-metrics')
+    return (time.perf_counter() - start) / len(messages)
+
+
+def timer_cost(enabled):
+    """Seconds per request spent in timer calls alone"""
+    pipeline_metrics.enabled = enabled
+    start = time.perf_counter()
+    for _ in range(TIMER_SAMPLES):
+        timer = pipeline_metrics.timer()
+        for stage in PIPELINE_STAGES:
+            timer.lap(stage)
+        timer.skip()
+        timer.finish()
+    return (time.perf_counter() - start) / TIMER_SAMPLES
+
+
+def main():
+    rng = random.Random(0)
+    messages = [rng.choice(MESSAGES) for _ in range(MESSAGES_PER_ROUND)]
+    run_round(messages[:20])  # warm up spaCy, the model and the detector
+    
+    rounds = {True: [], False: []}
+    for _ in range(ROUNDS):
+        for enabled in (False, True):
+            pipeline_metrics.enabled = enabled
+            rounds[enabled].append(run_round(messages))
+    
+    disabled = np.median(rounds[False])
+    enabled = np.median(rounds[True])
+    print(f"{MESSAGES_PER_ROUND} messages x {ROUNDS} rounds, median per message\n")
+    print(f"{'metrics':>9} {'request us':>11} {'timer us':>9} {'timer share':>12}")
+    for name, request_time, flag in [('disabled', disabled, False), ('enabled', enabled, True)]:
+        cost = timer_cost(flag)
+        print(f"{name:>9} {request_time * 1e6:>11.0f} {cost * 1e6:>9.2f} {cost / request_time:>12.3%}")
+    print(f"\nenabled vs disabled, end to end: {enabled / disabled - 1:+.2%} (includes run-to-run noise)")
+
+
+if __name__ == '__main__':
+    main()
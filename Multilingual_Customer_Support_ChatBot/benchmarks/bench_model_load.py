@@ -0,0 +1,97 @@
+"""Import-plus-load time of the intent model: sklearn pickle vs memory-mapped flat artifact.
+
+Both formats are written to a temporary directory from one freshly trained
+model. Each load runs in a fresh interpreter so import costs are not shared,
+and the two formats are checked for identical predictions.
+
+    python benchmarks/bench_model_load.py
+"""
+import sys
+import os
+import json
+import pickle
+import random
+import statistics
+import subprocess
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from app.models.intent_classifier import IntentClassifier, fit_intent_model
+from app.models.intent_artifact import export_intent_model, load_intent_model
+
+RUNS = 5
+
+CHILD = r'''
+import sys, json, time
+sys.path.append(%(root)r)
+start = time.perf_counter()
+if %(mode)r == 'pickle':
+    import pickle
+    with open(%(path)r, 'rb') as f:
+        model = pickle.load(f)
+else:
+    from app.models.intent_artifact import load_intent_model
+    model = load_intent_model(%(path)r)
+loaded = time.perf_counter() - start
+model.predict_proba(["Where is my order?"])
+first_prediction = time.perf_counter() - start
+print(json.dumps({
+    'load': loaded,
+    'first_prediction': first_prediction,
+    'sklearn_imported': 'sklearn' in sys.modules,
+}))
+'''
+
+
+def run(mode, path):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD % {'root': ROOT, 'mode': mode, 'path': path}],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def make_texts(patterns, count, rng):
+    words = ' '.join(patterns).split()
+    return patterns + [
+        ' '.join(rng.choice(words) for _ in range(rng.randint(0, 10))) for _ in range(count)
+    ]
+
+
+def main():
+    classifier = IntentClassifier()
+    X, y = classifier.prepare_training_data()
+    model, _ = fit_intent_model(X, y)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {
+            'pickle': os.path.join(directory, 'intent_model.pkl'),
+            'fast': os.path.join(directory, 'intent_model.bin')
+        }
+        with open(paths['pickle'], 'wb') as f:
+            pickle.dump(model, f)
+        export_intent_model(model, paths['fast'])
+        
+        texts = make_texts(X, 5000, random.Random(0))
+        expected = model.predict_proba(texts)
+        actual = load_intent_model(paths['fast']).predict_proba(texts)
+        assert (expected.argmax(axis=1) == actual.argmax(axis=1)).all()
+        print(f"{len(texts)} texts: identical predictions, "
+              f"max probability difference {np.abs(expected - actual).max():.1e}\n")
+        
+        print(f"{'format':>7} {'size KB':>8} {'import+load ms':>15} {'first predict ms':>17}  "
+              f"sklearn imported")
+        for mode, path in paths.items():
+            results = [run(mode, path) for _ in range(RUNS)]
+            print(f"{mode:>7} {os.path.getsize(path) / 1024:>8.0f} "
+                  f"{statistics.median(r['load'] for r in results) * 1000:>15.1f} "
+                  f"{statistics.median(r['first_prediction'] for r in results) * 1000:>17.1f}  "
+                  f"{results[0]['sklearn_imported']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Per-message latency of NLPProcessor.analyze vs the three separate calls it replaces.
+
+    python benchmarks/bench_nlp_analyze.py
+"""
+import sys
+import os
+import json
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.nlp_processor import NLPProcessor
+
+REPEATS = 20
+
+
+def load_messages():
+    with open('app/data/intents.json', 'r', encoding='utf-8') as f:
+        intents = json.load(f)
+    messages = []
+    for intent_data in intents.values():
+        messages.extend(intent_data.get('patterns', []))
+        messages.extend(intent_data.get('responses', []))
+    return messages
+
+
+def three_calls(processor, text):
+    return {
+        'lemmas': processor.tokenize_and_lemmatize(text),
+        'entities': processor.extract_entities(text),
+        'sentiment': processor.get_sentiment(text)
+    }
+
+
+def time_path(path, processor, messages):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for text in messages:
+            path(processor, text)
+    return (time.perf_counter() - start) / (REPEATS * len(messages))
+
+
+def main():
+    processor = NLPProcessor()
+    messages = load_messages()
+
+    # Warm both paths (model load, lemmatizer, stopwords) and check they agree
+    for text in messages:
+        assert processor.analyze(text) == three_calls(processor, text), text
+
+    separate = time_path(three_calls, processor, messages)
+    fused = time_path(NLPProcessor.analyze, processor, messages)
+    print(f"messages: {len(messages)}  spaCy NER: {'en' in processor.nlp_models}")
+    print(f"three calls: {separate * 1e6:9.1f} us/message")
+    print(f"analyze:     {fused * 1e6:9.1f} us/message  ({separate / fused:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Cold-start time and peak RSS of NLPProcessor: eager full models vs lazy pruned models.
+
+Each mode runs in a fresh interpreter so imports and RSS are not shared.
+
+    python benchmarks/bench_nlp_startup.py
+"""
+import sys
+import os
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import sys, json, time, resource
+sys.path.append(%(root)r)
+start = time.perf_counter()
+import spacy
+from app.models.nlp_processor import NLPProcessor
+if %(mode)r == 'eager':
+    # What NLPProcessor.__init__ used to do: four full pipelines up front
+    processor = NLPProcessor(max_models=4)
+    for lang, name in processor.spacy_models.items():
+        try:
+            processor.nlp_models[lang] = spacy.load(name)
+        except OSError:
+            pass
+else:
+    processor = NLPProcessor()
+ready = time.perf_counter() - start
+processor.extract_entities("I ordered a laptop from Berlin on Monday", 'en')
+first_call = time.perf_counter() - start
+print(json.dumps({
+    'startup': ready,
+    'first_entities': first_call,
+    'models': list(processor.nlp_models),
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+'''
+
+
+def run(mode):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD % {'root': ROOT, 'mode': mode}],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    print(f"{'mode':>6} {'startup s':>10} {'first NER s':>12} {'peak RSS MB':>12}  models")
+    for mode in ['eager', 'lazy']:
+        result = run(mode)
+        print(f"{mode:>6} {result['startup']:>10.2f} {result['first_entities']:>12.2f} "
+              f"{result['max_rss_mb']:>12.0f}  {', '.join(result['models']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Round-trip translation throughput: sequential blocking calls vs concurrent async dispatch.
+
+Uses LocalTranslationBackend, so no network is needed. Every simulated request
+needs an inbound (xx -> en) and an outbound (en -> xx) translation.
+
+    python benchmarks/bench_translation_dispatch.py --latency 0.1 --requests 64
+"""
+import sys
+import os
+import argparse
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.translator import TextTranslator, TokenBucket, LocalTranslationBackend
+
+
+def make_translator(latency, rate):
+    return TextTranslator(
+        backend=LocalTranslationBackend(latency=latency),
+        rate_limiter=TokenBucket(rate=rate, capacity=rate)
+    )
+
+
+def run_sequential(translator, requests):
+    for text, language in requests:
+        english = translator.translate_to_english(text, language)
+        translator.translate_from_english(english, language)
+
+
+def run_concurrent(translator, requests):
+    inbound = translator.translate_many((text, 'en', language) for text, language in requests)
+    translator.translate_many(
+        (english, language, 'en') for english, (_, language) in zip(inbound, requests)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.1, help='simulated seconds per translation')
+    parser.add_argument('--requests', type=int, default=64, help='in-flight chat requests')
+    parser.add_argument('--rate', type=float, default=1000.0, help='token bucket rate (translations/sec)')
+    args = parser.parse_args()
+
+    languages = ['es', 'fr', 'de', 'hi', 'zh', 'ja', 'ar']
+    requests = [(f"message {i}", languages[i % len(languages)]) for i in range(args.requests)]
+
+    for name, runner in [('sequential', run_sequential), ('concurrent', run_concurrent)]:
+        translator = make_translator(args.latency, args.rate)
+        start = time.perf_counter()
+        runner(translator, requests)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {elapsed:7.2f}s  {args.requests / elapsed:8.1f} requests/s")
+
+
+if __name__ == '__main__':
+    main()
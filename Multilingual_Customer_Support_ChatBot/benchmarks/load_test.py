@@ -0,0 +1,131 @@
+"""Load test: requests/sec and latency of the dev server vs the gunicorn entry point.
+
+Every server runs with the offline translation backend (simulated latency) and
+the translation and response caches disabled, so each request pays for
+detection, two translations, analysis and classification.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --clients 64 --duration 20 --latency 0.1
+"""
+import sys
+import os
+import argparse
+import http.client
+import json
+import random
+import signal
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MESSAGES = [
+    "Where is my order?", "I want to return these shoes", "Can I change my delivery address?",
+    "¿Dónde está mi pedido?", "Quiero devolver estos zapatos", "Où est ma commande ?",
+    "Wo ist meine Bestellung?", "मेरा ऑर्डर कहाँ है?", "我的订单在哪里？", "注文はどこですか？", "أين طلبي؟",
+]
+
+SERVERS = {
+    'dev': lambda port: [sys.executable, 'app/main.py'],
+    'gunicorn': lambda port: [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                              '--bind', f'127.0.0.1:{port}', 'wsgi:app'],
+}
+
+
+def start_server(kind, port, latency, workers):
+    env = dict(
+        os.environ,
+        TRANSLATION_BACKEND='local',
+        LOCAL_TRANSLATION_LATENCY=str(latency),
+        TRANSLATION_RATE_LIMIT='1000000',
+        TRANSLATION_BURST='1000000',
+        TRANSLATION_CACHE_SIZE='0',
+        TRANSLATION_CACHE_PATH='',
+        RESPONSE_CACHE_SIZE='0',
+        WEB_CONCURRENCY=str(workers),
+    )
+    process = subprocess.Popen(
+        SERVERS[kind](port), cwd=ROOT, env=env, start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.5)
+    stop_server(process)
+    raise RuntimeError(f"{kind} server did not start")
+
+
+def stop_server(process):
+    # The dev server's reloader and gunicorn's workers share the process group
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait()
+
+
+def client(port, path, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while time.monotonic() < deadline:
+        body = json.dumps({'message': rng.choice(MESSAGES), 'session_id': f'load-{seed}'})
+        start = time.perf_counter()
+        try:
+            connection.request('POST', path, body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run(port, path, clients, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=client, args=(port, path, deadline, latencies, errors, seed))
+        for seed in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated seconds per translation')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    
+    print(f"{args.clients} clients, {args.duration:.0f}s per run, {args.latency * 1000:.0f} ms per translation\n")
+    print(f"{'server':>9} {'endpoint':>12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for kind, path in [('dev', '/chat'), ('gunicorn', '/chat')]:
+        port = 5000 if kind == 'dev' else 5001
+        process = start_server(kind, port, args.latency, args.workers)
+        try:
+            run(port, path, 2, 1.0)  # warm up
+            latencies, errors = run(port, path, args.clients, args.duration)
+        finally:
+            stop_server(process)
+        p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if latencies else (0.0, 0.0)
+        print(f"{kind:>9} {path:>12} {len(latencies) / args.duration:>8.0f} {p50:>8.1f} {p99:>8.1f} "
+              f"{len(errors):>7}")
+
+
+if __name__ == '__main__':
+    main()
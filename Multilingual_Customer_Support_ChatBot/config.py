@@ -0,0 +1,47 @@
+import os
+
+
+class Config:
+    """Application configuration (override any value with an environment variable)"""
+    
+    # Observability
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    DEBUG_TIMINGS_HEADER = os.getenv('DEBUG_TIMINGS_HEADER', 'X-Debug-Timings')
+    
+    # Chat
+    MAX_MESSAGE_LENGTH = int(os.getenv('MAX_MESSAGE_LENGTH', 500))
+    MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 256))
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))  # seconds
+    
+    # Conversation history
+    CONVERSATION_STORE = os.getenv('CONVERSATION_STORE', 'memory')  # 'memory' or 'sqlite'
+    CONVERSATION_DB_PATH = os.getenv('CONVERSATION_DB_PATH', 'app/data/conversations.db')
+    CONVERSATION_MAX_MESSAGES = int(os.getenv('CONVERSATION_MAX_MESSAGES', 50))  # per session
+    CONVERSATION_FLUSH_INTERVAL = float(os.getenv('CONVERSATION_FLUSH_INTERVAL', 1.0))  # seconds
+    SESSION_IDLE_TIMEOUT = int(os.getenv('SESSION_IDLE_TIMEOUT', 1800))  # seconds
+    MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', 10000))
+    
+    # Intent model
+    INTENT_MODEL_FORMAT = os.getenv('INTENT_MODEL_FORMAT', 'fast')  # 'fast' (memory-mapped) or 'pickle'
+    INTENT_MODEL_ENGINE = os.getenv('INTENT_MODEL_ENGINE', 'logreg')  # 'logreg', 'linear_svc', 'sgd' or 'svc'
+    INTENT_MODEL_CHECK_INTERVAL = float(os.getenv('INTENT_MODEL_CHECK_INTERVAL', 5.0))  # seconds between model file checks
+    TRAINING_JOBS_PATH = os.getenv('TRAINING_JOBS_PATH', 'app/data/training_jobs.db')
+    
+    # Language detection
+    LANGUAGE_CACHE_SIZE = int(os.getenv('LANGUAGE_CACHE_SIZE', 4096))  # memoized short messages
+    
+    # NLP
+    SPACY_MAX_MODELS = int(os.getenv('SPACY_MAX_MODELS', 2))
+    
+    # Translation
+    TRANSLATION_BACKEND = os.getenv('TRANSLATION_BACKEND', 'google')  # 'google' or 'local'
+    LOCAL_TRANSLATION_LATENCY = float(os.getenv('LOCAL_TRANSLATION_LATENCY', 0.0))
+    TRANSLATION_MAX_WORKERS = int(os.getenv('TRANSLATION_MAX_WORKERS', 16))
+    TRANSLATION_RATE_LIMIT = float(os.getenv('TRANSLATION_RATE_LIMIT', 10))  # requests per second
+    TRANSLATION_BURST = int(os.getenv('TRANSLATION_BURST', 10))
+    
+    # Translation cache
+    TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE', 2048))
+    TRANSLATION_CACHE_PATH = os.getenv('TRANSLATION_CACHE_PATH', 'app/data/translation_cache.db')
+    TRANSLATION_CACHE_PREWARM = os.getenv('TRANSLATION_CACHE_PREWARM', 'false').lower() == 'true'
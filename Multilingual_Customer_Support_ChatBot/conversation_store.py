@@ -0,0 +1,303 @@
+from collections import OrderedDict, deque
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+# Times a batch is written before its operations are dropped
+WRITE_ATTEMPTS = 3
+
+class ConversationRecord:
+    """One exchange between a user and the bot"""
+    __slots__ = ('timestamp', 'user_message', 'response', 'language', 'intent', 'confidence', 'sentiment')
+    
+    def __init__(self, user_message, response, language, intent, confidence, sentiment, timestamp=None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.user_message = user_message
+        self.response = response
+        self.language = language
+        self.intent = intent
+        self.confidence = float(confidence)
+        self.sentiment = sentiment
+    
+    def to_tuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+    
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class _Session:
+    __slots__ = ('messages', 'total', 'last_seen', 'complete')
+    
+    def __init__(self, max_messages, messages=(), total=0, complete=True):
+        self.messages = deque(messages, maxlen=max_messages)
+        self.total = total
+        self.last_seen = time.monotonic()
+        # False when the session was recreated in memory without reading its older history
+        self.complete = complete
+
+class InMemoryConversationStore:
+    """Per-session ring buffers of recent messages; idle sessions are evicted"""
+    
+    def __init__(self, max_messages=50, idle_timeout=1800, max_sessions=10000):
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # least recently active first
+        self.lock = threading.Lock()
+    
+    def append(self, session_id, record):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = self._new_session()
+            session.messages.append(record)
+            session.total += 1
+            self._touch(session_id, session)
+            self._evict()
+    
+    def get_history(self, session_id, limit=10):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None and session.complete:
+                return self._snapshot(session_id, session, limit)
+        
+        # Not fully in memory: fall back to the backing store (outside the lock)
+        loaded = self._load_session(session_id)
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if loaded is not None:
+                session = self.sessions[session_id] = loaded
+            elif session is None:
+                return [], 0
+            else:
+                session.complete = True
+            return self._snapshot(session_id, session, limit)
+    
+    def clear(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+    
+    def session_count(self):
+        with self.lock:
+            return len(self.sessions)
+    
+    def close(self):
+        pass
+    
+    def after_fork(self):
+        self.lock = threading.Lock()
+    
+    def _new_session(self):
+        return _Session(self.max_messages)
+    
+    def _load_session(self, session_id):
+        return None
+    
+    def _snapshot(self, session_id, session, limit):
+        self._touch(session_id, session)
+        records = list(session.messages)[-limit:] if limit else []
+        return [record.to_dict() for record in records], session.total
+    
+    def _touch(self, session_id, session):
+        session.last_seen = time.monotonic()
+        self.sessions.move_to_end(session_id)
+    
+    def _evict(self):
+        # Sessions are ordered by activity, so expired ones are always at the front
+        cutoff = time.monotonic() - self.idle_timeout
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_seen >= cutoff and len(self.sessions) <= self.max_sessions:
+                break
+            self.sessions.popitem(last=False)
+
+class SQLiteConversationStore(InMemoryConversationStore):
+    """In-memory store backed by a SQLite file with write-behind batching.
+
+    Appends only touch memory; a background thread flushes queued writes in
+    batches. Only the newest max_messages rows per session are kept on disk, and
+    sessions evicted from memory are read back when their history is requested.
+    A batch that fails to write is retried before newer ones, and dropped (and
+    counted in `dropped`) after WRITE_ATTEMPTS tries.
+    """
+    
+    def __init__(self, db_path, max_messages=50, idle_timeout=1800, max_sessions=10000,
+                 flush_interval=1.0, batch_size=500):
+        super().__init__(max_messages, idle_timeout, max_sessions)
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._open()
+        with self.db_lock:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS messages ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, '
+                'timestamp REAL, user_message TEXT, response TEXT, language TEXT, '
+                'intent TEXT, confidence REAL, sentiment TEXT)'
+            )
+            self.db.execute('CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, total INTEGER NOT NULL)'
+            )
+            self.db.commit()
+        self._start_writer()
+        atexit.register(self.close)
+    
+    def _open(self):
+        self.pending = queue.Queue()
+        self.failed = deque()  # [attempts, batch] of batches that did not reach the database
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+    
+    def _start_writer(self):
+        self.stopped = threading.Event()
+        self.writer = threading.Thread(target=self._write_loop, name='conversation-writer', daemon=True)
+        self.writer.start()
+    
+    def after_fork(self):
+        """Reconnect and restart the writer thread in a forked child (the parent flushes its own queue)"""
+        super().after_fork()
+        self._open()
+        self._start_writer()
+    
+    def append(self, session_id, record):
+        super().append(session_id, record)
+        self.pending.put(('append', session_id, record))
+    
+    def clear(self, session_id):
+        super().clear(session_id)
+        self.pending.put(('clear', session_id, None))
+    
+    def close(self):
+        self.stopped.set()
+        self.flush()
+    
+    def flush(self):
+        """Write every queued operation to disk in batches; stops at the first batch that fails"""
+        # One flusher at a time so batches reach the database in queue order
+        with self.flush_lock:
+            while True:
+                # Taking a batch and writing it is atomic under db_lock, so
+                # _load_session sees each operation either queued or on disk
+                with self.db_lock:
+                    if self.failed:
+                        entry = self.failed.popleft()
+                    else:
+                        entry = [0, self._take_batch()]
+                        if not entry[1]:
+                            return
+                    try:
+                        self._write_batch(entry[1])
+                        continue
+                    except Exception as e:
+                        self.db.rollback()
+                        entry[0] += 1
+                        if entry[0] < WRITE_ATTEMPTS:
+                            self.failed.appendleft(entry)
+                            print(f"Conversation store write error (will retry): {e}")
+                        else:
+                            self.dropped += len(entry[1])
+                            print(f"Conversation store write error, dropped {len(entry[1])} operations: {e}")
+                # Leave the rest for the next flush rather than spinning on a failing database
+                return
+    
+    def _take_batch(self):
+        batch = []
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(self.pending.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+    
+    def _unwritten(self, session_id):
+        """Operations on session_id not yet on disk, oldest first (call with db_lock held)"""
+        with self.pending.mutex:
+            queued = list(self.pending.queue)
+        batches = [batch for _, batch in self.failed] + [queued]
+        return [(operation, record) for batch in batches
+                for operation, queued_id, record in batch if queued_id == session_id]
+    
+    def _new_session(self):
+        # The session may have older history on disk; get_history reads it lazily
+        return _Session(self.max_messages, complete=False)
+    
+    def _load_session(self, session_id):
+        # Read what is on disk and replay the session's queued writes over it,
+        # rather than flushing on the request thread
+        with self.db_lock:
+            row = self.db.execute(
+                'SELECT total FROM sessions WHERE session_id = ?', (session_id,)
+            ).fetchone()
+            rows = [] if row is None else self.db.execute(
+                'SELECT timestamp, user_message, response, language, intent, confidence, sentiment '
+                'FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?',
+                (session_id, self.max_messages)
+            ).fetchall()
+            unwritten = self._unwritten(session_id)
+        records = [
+            ConversationRecord(user_message, response, language, intent, confidence, sentiment, timestamp)
+            for timestamp, user_message, response, language, intent, confidence, sentiment in reversed(rows)
+        ]
+        session = None if row is None else _Session(self.max_messages, records, total=row[0])
+        for operation, record in unwritten:
+            if operation == 'clear':
+                session = None
+                continue
+            if session is None:
+                session = _Session(self.max_messages)
+            session.messages.append(record)
+            session.total += 1
+        return session
+    
+    def _write_loop(self):
+        while not self.stopped.is_set():
+            self.stopped.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the writer alive; whatever was not written stays queued
+                print(f"Conversation store writer error: {e}")
+    
+    def _write_batch(self, batch):
+        # Called with db_lock held
+        rows = []
+        for operation, session_id, record in batch:
+            if operation == 'append':
+                rows.append((session_id,) + record.to_tuple())
+                continue
+            # Keep operations ordered: write appends queued before the clear first
+            self._insert(rows)
+            rows = []
+            self.db.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+            self.db.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+        self._insert(rows)
+        self.db.commit()
+    
+    def _insert(self, rows):
+        if not rows:
+            return
+        self.db.executemany(
+            'INSERT INTO messages (session_id, timestamp, user_message, response, language, '
+            'intent, confidence, sentiment) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            rows
+        )
+        appended = {}
+        for row in rows:
+            appended[row[0]] = appended.get(row[0], 0) + 1
+        for session_id, count in appended.items():
+            self.db.execute(
+                'INSERT INTO sessions (session_id, total) VALUES (?, ?) '
+                'ON CONFLICT(session_id) DO UPDATE SET total = total + excluded.total',
+                (session_id, count)
+            )
+            # Keep only the newest max_messages rows of the session
+            self.db.execute(
+                'DELETE FROM messages WHERE session_id = ? AND id <= ('
+                'SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)',
+                (session_id, session_id, self.max_messages)
+            )
\ No newline at end of file
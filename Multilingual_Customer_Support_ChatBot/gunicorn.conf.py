@@ -0,0 +1,22 @@
+"""gunicorn settings for the chatbot (override with environment variables)"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+
+# Import wsgi (and load every model) once in the master, then fork the workers
+preload_app = True
+
+def pre_fork(server, worker):
+    # Move the preloaded objects out of the collector's reach so that garbage
+    # collection in a worker does not write to (and un-share) their pages
+    gc.freeze()
+
+def post_fork(server, worker):
+    from app.main import after_fork
+    after_fork()
@@ -0,0 +1,309 @@
+"""Flat, memory-mapped export of the intent model.
+
+The fitted TF-IDF + linear classifier pipeline is stored as a handful of NumPy
+arrays in one file: a JSON header followed by 64-byte aligned raw arrays.
+Loading maps the file read-only, so workers forked from one master share its
+pages, and inference needs only NumPy (no sklearn import, no unpickling).
+
+Three scorers are supported, one per kind of classifier step:
+
+- 'svc_ovo': linear SVC with probability=True (one-vs-one decision values,
+  Platt scaling and libsvm's pairwise coupling)
+- 'ovr_sigmoid': a linear model wrapped in CalibratedClassifierCV(method='sigmoid',
+  ensemble=False) (one-vs-rest sigmoids, normalized)
+- 'softmax': logistic regression
+"""
+import json
+import mmap
+import os
+import re
+import uuid
+
+import numpy as np
+
+MAGIC = b'INTENTM1'
+ALIGNMENT = 64
+MIN_PROBABILITY = 1e-7  # libsvm clips pairwise probabilities to [1e-7, 1 - 1e-7]
+
+def export_intent_model(model, path):
+    """Write a fitted Pipeline(tfidf, classifier) to path as a flat artifact"""
+    vectorizer = model.steps[0][1]
+    classifier = model.steps[-1][1]
+    _check_vectorizer(vectorizer)
+    if hasattr(classifier, 'calibrated_classifiers_'):
+        scorer, extract = 'ovr_sigmoid', _calibrated_arrays
+    elif hasattr(classifier, 'support_vectors_'):
+        scorer, extract = 'svc_ovo', _svc_arrays
+    elif hasattr(classifier, 'coef_') and hasattr(classifier, 'predict_proba'):
+        scorer, extract = 'softmax', _logistic_arrays
+    else:
+        raise ValueError(f"Cannot export a {type(classifier).__name__} classifier")
+    coef, arrays = extract(classifier)
+    
+    # Store terms sorted so a lookup is a binary search and the term index is the column
+    vocabulary = vectorizer.vocabulary_
+    terms = np.array(sorted(vocabulary))
+    columns = np.array([vocabulary[term] for term in terms])
+    coef = coef.toarray() if hasattr(coef, 'toarray') else np.asarray(coef)
+    
+    arrays = dict(
+        terms=terms,
+        idf=vectorizer.idf_[columns].astype(np.float64),
+        weights=np.ascontiguousarray(coef[:, columns].T, dtype=np.float64),
+        classes=np.array([str(label) for label in classifier.classes_]),
+        **arrays
+    )
+    meta = {
+        'scorer': scorer,
+        'lowercase': vectorizer.lowercase,
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'norm': vectorizer.norm,
+        'sublinear_tf': vectorizer.sublinear_tf
+    }
+    write_arrays(path, arrays, meta)
+
+def _svc_arrays(svm):
+    if svm.kernel != 'linear' or not getattr(svm, 'probability', False):
+        raise ValueError("Only linear SVC models fitted with probability=True can be exported")
+    # Raw libsvm decision values for every one-vs-one pair; sklearn flips the sign in the binary case
+    coef, intercept = svm.coef_, np.asarray(svm.intercept_, dtype=np.float64)
+    if len(svm.classes_) == 2:
+        coef, intercept = -coef, -intercept
+    return coef, {
+        'intercepts': intercept,
+        'prob_a': np.asarray(svm.probA_, dtype=np.float64),
+        'prob_b': np.asarray(svm.probB_, dtype=np.float64)
+    }
+
+def _calibrated_arrays(classifier):
+    if len(classifier.calibrated_classifiers_) != 1:
+        raise ValueError("Only CalibratedClassifierCV(ensemble=False) can be exported")
+    calibrated = classifier.calibrated_classifiers_[0]
+    estimator = calibrated.estimator
+    if calibrated.method != 'sigmoid' or list(estimator.classes_) != list(classifier.classes_):
+        raise ValueError("Only sigmoid calibration over every class can be exported")
+    # One calibrator per decision column: p = 1 / (1 + exp(a * d + b))
+    return estimator.coef_, {
+        'intercepts': np.asarray(estimator.intercept_, dtype=np.float64),
+        'prob_a': np.array([calibrator.a_ for calibrator in calibrated.calibrators], dtype=np.float64),
+        'prob_b': np.array([calibrator.b_ for calibrator in calibrated.calibrators], dtype=np.float64)
+    }
+
+def _logistic_arrays(classifier):
+    coef = np.asarray(classifier.coef_, dtype=np.float64)
+    intercept = np.asarray(classifier.intercept_, dtype=np.float64)
+    if len(classifier.classes_) == 2:
+        # Binary logistic regression is a two-class softmax with the first logit fixed at zero
+        coef = np.vstack([np.zeros_like(coef), coef])
+        intercept = np.concatenate([[0.0], intercept])
+    return coef, {'intercepts': intercept}
+
+def _check_vectorizer(vectorizer):
+    unsupported = (
+        vectorizer.analyzer != 'word' or vectorizer.tokenizer is not None or
+        vectorizer.preprocessor is not None or vectorizer.strip_accents is not None or
+        vectorizer.stop_words is not None or vectorizer.binary or not vectorizer.use_idf or
+        vectorizer.norm not in ('l1', 'l2', None)
+    )
+    if unsupported:
+        raise ValueError("The vectorizer uses options the flat artifact cannot reproduce")
+
+def write_arrays(path, arrays, meta):
+    """Write named arrays and a metadata dict to path (atomically, via a temporary file)"""
+    header = {'meta': meta, 'arrays': {}}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        header['arrays'][name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset
+        }
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+    
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b'\0' * (data_start + header['arrays'][name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+def read_arrays(path):
+    """Map path read-only and return (arrays, meta); arrays are views into the mapping"""
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not an intent model artifact")
+    header_size = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], 'little')
+    header_end = len(MAGIC) + 8 + header_size
+    header = json.loads(buffer[len(MAGIC) + 8:header_end].decode('utf-8'))
+    data_start = _align(header_end)
+    
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + spec['offset'])
+        arrays[name] = array.reshape(spec['shape'])
+    return arrays, header['meta']
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def load_intent_model(path):
+    arrays, meta = read_arrays(path)
+    if meta.get('scorer') not in ('svc_ovo', 'ovr_sigmoid', 'softmax'):
+        raise ValueError(f"Unsupported scorer in {path}: {meta.get('scorer')}")
+    return LinearIntentModel(arrays, meta)
+
+class LinearIntentModel:
+    """NumPy-only stand-in for the sklearn pipeline (predict_proba and classes_)"""
+    
+    def __init__(self, arrays, meta):
+        self.terms = arrays['terms']
+        self.idf = arrays['idf']
+        self.weights = arrays['weights']
+        self.intercepts = arrays['intercepts']
+        self.prob_a = arrays.get('prob_a')
+        self.prob_b = arrays.get('prob_b')
+        self.classes_ = arrays['classes']
+        self.scorer = meta['scorer']
+        self.lowercase = meta['lowercase']
+        self.token_pattern = re.compile(meta['token_pattern'])
+        self.min_n, self.max_n = meta['ngram_range']
+        self.norm = meta['norm']
+        self.sublinear_tf = meta['sublinear_tf']
+    
+    def analyze(self, text):
+        """Word n-grams exactly as TfidfVectorizer's default analyzer produces them"""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_pattern.findall(text)
+        ngrams = list(tokens) if self.min_n == 1 else []
+        for n in range(max(self.min_n, 2), min(self.max_n, len(tokens)) + 1):
+            ngrams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngrams
+    
+    def transform(self, texts):
+        """TF-IDF rows as sorted (rows, columns, values) triples"""
+        rows = []
+        ngrams = []
+        for row, text in enumerate(texts):
+            grams = self.analyze(text)
+            ngrams.extend(grams)
+            rows.extend([row] * len(grams))
+        if not ngrams:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, np.zeros(0)
+        
+        # One binary search over the sorted vocabulary for the whole batch
+        ngrams = np.array(ngrams)
+        columns = np.searchsorted(self.terms, ngrams)
+        columns[columns == len(self.terms)] = 0
+        known = self.terms[columns] == ngrams
+        
+        n_features = len(self.terms)
+        keys = np.asarray(rows, dtype=np.int64)[known] * n_features + columns[known]
+        keys, counts = np.unique(keys, return_counts=True)
+        rows, columns = np.divmod(keys, n_features)
+        
+        values = counts.astype(np.float64)
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf[columns]
+        if self.norm == 'l2':
+            norms = np.sqrt(np.bincount(rows, values * values, minlength=len(texts)))
+            values /= norms[rows]
+        elif self.norm == 'l1':
+            values /= np.bincount(rows, np.abs(values), minlength=len(texts))[rows]
+        return rows, columns, values
+    
+    def decision_values(self, texts):
+        """Raw decision values, one sparse-dense product for the whole batch"""
+        texts = list(texts)
+        scores = np.tile(self.intercepts, (len(texts), 1))
+        rows, columns, values = self.transform(texts)
+        if len(rows):
+            contributions = values[:, None] * self.weights[columns]
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            scores[rows[starts]] += np.add.reduceat(contributions, starts, axis=0)
+        return scores
+    
+    def predict_proba(self, texts):
+        decision = self.decision_values(texts)
+        if self.scorer == 'softmax':
+            logits = decision - decision.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            return probabilities / probabilities.sum(axis=1, keepdims=True)
+        
+        sigmoids = platt_sigmoid(decision * self.prob_a + self.prob_b)
+        if self.scorer == 'svc_ovo':
+            return self._couple(sigmoids)
+        
+        # One-vs-rest: a single column means a binary model scoring the second class
+        if sigmoids.shape[1] == 1:
+            return np.column_stack([1 - sigmoids[:, 0], sigmoids[:, 0]])
+        total = sigmoids.sum(axis=1, keepdims=True)
+        uniform = np.full_like(sigmoids, 1.0 / sigmoids.shape[1])
+        return np.divide(sigmoids, total, out=uniform, where=total != 0)
+    
+    def _couple(self, pairwise):
+        """Pairwise Platt probabilities coupled the way libsvm does it"""
+        pairwise = np.clip(pairwise, MIN_PROBABILITY, 1 - MIN_PROBABILITY)
+        
+        # sklearn's libsvm couples the pairwise estimates even for two classes
+        k = len(self.classes_)
+        r = np.zeros((len(pairwise), k, k))
+        first, second = np.triu_indices(k, 1)
+        r[:, first, second] = pairwise
+        r[:, second, first] = 1 - pairwise
+        return multiclass_probability(r)
+
+def platt_sigmoid(f_ap_b):
+    """1 / (1 + exp(f_ap_b)), computed stably as libsvm's sigmoid_predict does"""
+    negative = np.exp(-np.abs(f_ap_b))
+    return np.where(f_ap_b >= 0, negative / (1.0 + negative), 1.0 / (1.0 + negative))
+
+def multiclass_probability(r):
+    """Vectorized libsvm multiclass_probability (Wu, Lin and Weng, method 2).
+
+    r has shape (n_samples, k, k) with r[:, i, j] the pairwise probability of
+    class i over class j. Every sample runs the same Gauss-Seidel updates and
+    stops on its own tolerance, as libsvm does one sample at a time.
+    """
+    n, k = r.shape[0], r.shape[1]
+    # Q[t][t] = sum_{j != t} r[j][t]^2 and Q[t][j] = -r[j][t] * r[t][j]
+    rt = np.swapaxes(r, 1, 2)
+    Q = -rt * r
+    diagonal = np.sum(rt * rt, axis=2) - np.einsum('ntt->nt', rt * rt)
+    Q[:, np.arange(k), np.arange(k)] = diagonal
+    
+    p = np.full((n, k), 1.0 / k)
+    eps = 0.005 / k
+    active = np.arange(n)
+    for _ in range(max(100, k)):
+        Qa = Q[active]
+        pa = p[active]
+        Qp = np.einsum('ntj,nj->nt', Qa, pa)
+        pQp = np.sum(pa * Qp, axis=1)
+        converged = np.max(np.abs(Qp - pQp[:, None]), axis=1) < eps
+        if converged.all():
+            break
+        active, Qa, pa, Qp, pQp = (
+            active[~converged], Qa[~converged], pa[~converged], Qp[~converged], pQp[~converged]
+        )
+        for t in range(k):
+            qtt = Qa[:, t, t]
+            diff = (-Qp[:, t] + pQp) / qtt
+            pa[:, t] += diff
+            pQp = (pQp + diff * (diff * qtt + 2 * Qp[:, t])) / (1 + diff) / (1 + diff)
+            Qp = (Qp + diff[:, None] * Qa[:, t, :]) / (1 + diff)[:, None]
+            pa /= (1 + diff)[:, None]
+        p[active] = pa
+    return p
@@ -1,98 +1,406 @@
-import json
-import pickle
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.svm import SVC
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
-import numpy as np
-
-class IntentClassifier:
-    def __init__(self):
-        self.model = None
-        self.vectorizer = None
-        self.intents = {}
-        self.load_intents()
-    
-    def load_intents(self):
-        try:
-            with open('app/data/intents.json', 'r', encoding='utf-8') as f:
-                self.intents = json.load(f)
-        except FileNotFoundError:
-            print("intents.json not found. Please create the file with training data.")
-    
-    def prepare_training_data(self):
-        X = []
-        y = []
-        
-        for intent_name, intent_data in self.intents.items():
-            for pattern in intent_data.get('patterns', []):
-                X.append(pattern)
-                y.append(intent_name)
-        
-        return X, y
-    
-    def train_model(self):
-        X, y = self.prepare_training_data()
-        
-        if not X:
-            print("No training data available.")
-            return
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
-        # Create pipeline
-        self.model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=1000, ngram_range=(1, 2))),
-            ('svm', SVC(kernel='linear', probability=True))
-        ])
-        
-        # Train model
-        self.model.fit(X_train, y_train)
-        
-        # Evaluate
-        y_pred = self.model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        print(f"Model accuracy: {accuracy:.2f}")
-        
-        # Save model
-        self.save_model()
-    
-    def predict_intent(self, text, threshold=0.5):
-        if not self.model:
-            self.load_model()
-        
-        if not self.model:
-            return 'unknown', 0.0
-        
-        # Get prediction probabilities
-        probabilities = self.model.predict_proba([text])[0]
-        max_prob = np.max(probabilities)
-        
-        if max_prob < threshold:
-            return 'unknown', max_prob
-        
-        predicted_intent = self.model.predict([text])[0]
-        return predicted_intent, max_prob
-    
-    def save_model(self):
-        if self.model:
-            with open('app/models/intent_model.pkl', 'wb') as f:
-                pickle.dump(self.model, f)
-    
-    def load_model(self):
-        try:
-            with open('app/models/intent_model.pkl', 'rb') as f:
-                self.model = pickle.load(f)
-        except FileNotFoundError:
-            print("Model not found. Training new model...")
-            self.train_model()
-    
-    def get_response(self, intent):
-        if intent in self.intents:
-            responses = self.intents[intent].get('responses', ['I apologize, but I don\'t have a response for that.'])
-            return np.random.choice(responses)
-        return "I'm sorry, I don't understand that request."
\ No newline at end of file
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from app.models.intent_artifact import export_intent_model, load_intent_model
+
+MODEL_PATH = 'app/models/intent_model.pkl'
+ARTIFACT_PATH = 'app/models/intent_model.bin'
+
+ENGINES = ('svc', 'linear_svc', 'sgd', 'logreg')
+
+# A shared job still 'running' after this many seconds belongs to a worker that died
+JOB_TIMEOUT = 3600
+JOB_FIELDS = ('job_id', 'status', 'submitted_at', 'finished_at', 'model_version', 'accuracy', 'error')
+
+def make_intent_estimator(engine='logreg'):
+    """Classifier step of the intent pipeline for an engine name.
+
+    'svc' is the original kernel SVC with libsvm's internal Platt scaling.
+    The other engines are primal linear models whose probabilities are a
+    single matrix multiply: 'linear_svc' and 'sgd' with one-vs-rest sigmoid
+    calibration, and 'logreg' (multinomial logistic regression).
+    """
+    from sklearn.svm import SVC, LinearSVC
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+    from sklearn.calibration import CalibratedClassifierCV
+    
+    if engine == 'svc':
+        return SVC(kernel='linear', probability=True)
+    if engine == 'linear_svc':
+        return CalibratedClassifierCV(LinearSVC(), method='sigmoid', cv=3, ensemble=False)
+    if engine == 'sgd':
+        return CalibratedClassifierCV(
+            SGDClassifier(loss='hinge', alpha=1e-4, random_state=42),
+            method='sigmoid', cv=3, ensemble=False
+        )
+    if engine == 'logreg':
+        return LogisticRegression(C=10.0, max_iter=1000)
+    raise ValueError(f"Unknown intent engine: {engine}")
+
+def fit_intent_model(X, y, engine='logreg'):
+    """Fit a fresh pipeline and return it with its held-out accuracy (runs in a worker process)"""
+    # sklearn is only needed to train; serving from the flat artifact never imports it
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.pipeline import Pipeline
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score
+    
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+    
+    # Create pipeline
+    model = Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=1000, ngram_range=(1, 2))),
+        ('classifier', make_intent_estimator(engine))
+    ])
+    
+    # Train model
+    model.fit(X_train, y_train)
+    
+    # Evaluate
+    y_pred = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    return model, accuracy
+
+class IntentClassifier:
+    def __init__(self, trainer=None, model_format='fast', engine='logreg', check_interval=5.0):
+        self.model = None
+        self.model_format = model_format  # 'fast' (memory-mapped artifact) or 'pickle'
+        self.engine = engine  # one of ENGINES, used for the next training run
+        self.model_version = 0
+        # Seconds between checks for a model file saved by another process (None: never check)
+        self.check_interval = check_interval
+        self.model_mtime = None  # of the file the serving model was read from or saved to
+        self.next_check = 0.0
+        self.vectorizer = None
+        self.intents = {}
+        self.trainer = trainer
+        self.swap_lock = threading.Lock()
+        self.load_lock = threading.Lock()
+        self.swap_listeners = []
+        self.load_intents()
+    
+    def load_intents(self):
+        try:
+            with open('app/data/intents.json', 'r', encoding='utf-8') as f:
+                self.intents = json.load(f)
+        except FileNotFoundError:
+            print("intents.json not found. Please create the file with training data.")
+    
+    def prepare_training_data(self):
+        X = []
+        y = []
+        
+        for intent_name, intent_data in self.intents.items():
+            for pattern in intent_data.get('patterns', []):
+                X.append(pattern)
+                y.append(intent_name)
+        
+        return X, y
+    
+    def train_model(self, save=True):
+        """Train synchronously; the new model is only swapped in once fully fitted"""
+        X, y = self.prepare_training_data()
+        
+        if not X:
+            print("No training data available.")
+            return
+        
+        model, accuracy = fit_intent_model(X, y, self.engine)
+        print(f"Model accuracy: {accuracy:.2f}")
+        self.swap_model(model)
+        
+        # Save model
+        if save:
+            self.save_model()
+    
+    def swap_model(self, model, expected_version=None):
+        """Atomically replace the serving model and bump its version.
+
+        With expected_version the swap only happens if no other model was
+        swapped in since that version was read; otherwise None is returned.
+        """
+        with self.swap_lock:
+            if expected_version is not None and self.model_version != expected_version:
+                return None
+            self.model = model
+            self.model_version += 1
+            version = self.model_version
+        for listener in self.swap_listeners:
+            listener(version)
+        return version
+    
+    def predict_intent(self, text, threshold=0.5):
+        return self.predict_intents([text], threshold)[0]
+    
+    def predict_intents(self, texts, threshold=0.5):
+        """Predict (intent, confidence) for a batch of texts in one predict_proba pass"""
+        texts = list(texts)
+        if not self.model:
+            self.load_model()
+        else:
+            self.reload_if_changed()
+        
+        # Read the reference once so a concurrent swap cannot change it mid-batch
+        model = self.model
+        if not model:
+            return [('unknown', 0.0) for _ in texts]
+        
+        if not texts:
+            return []
+        
+        # The argmax column of the probabilities is the predicted intent,
+        # so there is no need for a second predict() call
+        probabilities = model.predict_proba(texts)
+        best = np.argmax(probabilities, axis=1)
+        max_probs = probabilities[np.arange(len(texts)), best]
+        classes = model.classes_
+        
+        results = []
+        for class_index, max_prob in zip(best, max_probs):
+            if max_prob < threshold:
+                results.append(('unknown', float(max_prob)))
+            else:
+                results.append((str(classes[class_index]), float(max_prob)))
+        return results
+    
+    def save_model(self):
+        model = self.model
+        # Only a freshly trained sklearn pipeline is saved; a loaded artifact is already on disk
+        if model and hasattr(model, 'named_steps'):
+            # Write to a temporary file first so readers never see a partial pickle
+            # (unique per writer, as a training job and a first load can save concurrently)
+            tmp_path = f'{MODEL_PATH}.{uuid.uuid4().hex}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(model, f)
+            os.replace(tmp_path, MODEL_PATH)
+            export_intent_model(model, ARTIFACT_PATH)
+            # This process already serves the model it just saved
+            self.model_mtime = self._model_mtime()
+    
+    def load_model(self, background=True):
+        with self.load_lock:
+            # Another thread may have loaded or trained a model while we waited
+            if self.model:
+                return
+            version = self.model_version
+            try:
+                model, mtime = self._read_model()
+                # A training job may have swapped its model in while the file was read
+                if self.swap_model(model, expected_version=version) is not None:
+                    self.model_mtime = mtime
+            except FileNotFoundError:
+                if background and self.trainer is not None:
+                    # Serve 'unknown' until the background job swaps a model in.
+                    # A job clears active_job only after its swap, so check in this order.
+                    if self.trainer.active_job is None and self.model_version == version:
+                        print("Model not found. Training new model in the background...")
+                        self.trainer.submit(self)
+                else:
+                    print("Model not found. Training new model...")
+                    self.train_model()
+    
+    def reload_if_changed(self):
+        """Swap in the model file when another process (e.g. the gunicorn worker that ran /train) replaced it"""
+        now = time.monotonic()
+        if self.check_interval is None or now < self.next_check:
+            return
+        self.next_check = now + self.check_interval
+        mtime = self._model_mtime()
+        if mtime is None or mtime == self.model_mtime:
+            return
+        with self.load_lock:
+            version = self.model_version
+            try:
+                model, mtime = self._read_model()
+            except (OSError, ValueError) as e:
+                print(f"Model reload error: {e}")
+                return
+            if self.swap_model(model, expected_version=version) is not None:
+                self.model_mtime = mtime
+                print(f"Reloaded intent model saved by another process (v{self.model_version})")
+    
+    def _model_path(self):
+        return ARTIFACT_PATH if self.model_format == 'fast' else MODEL_PATH
+    
+    def _model_mtime(self):
+        try:
+            return os.stat(self._model_path()).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _read_model(self):
+        """(model, mtime of its file) from disk in the configured format"""
+        # Taken before reading, so a file replaced meanwhile is picked up by the next check
+        mtime = self._model_mtime()
+        if self.model_format == 'fast':
+            model = self._load_artifact()
+        else:
+            with open(MODEL_PATH, 'rb') as f:
+                model = pickle.load(f)
+        return model, mtime if mtime is not None else self._model_mtime()
+    
+    def _load_artifact(self):
+        try:
+            return load_intent_model(ARTIFACT_PATH)
+        except FileNotFoundError:
+            # One-time migration: export the artifact from an existing pickle
+            with open(MODEL_PATH, 'rb') as f:
+                model = pickle.load(f)
+            print("Exporting intent model artifact from pickle...")
+            export_intent_model(model, ARTIFACT_PATH)
+            return load_intent_model(ARTIFACT_PATH)
+    
+    def get_response(self, intent):
+        if intent in self.intents:
+            responses = self.intents[intent].get('responses', ['I apologize, but I don\'t have a response for that.'])
+            return np.random.choice(responses)
+        return "I'm sorry, I don't understand that request."
+
+class IntentTrainer:
+    """Runs IntentClassifier training in a worker process and hot-swaps the result.
+
+    With db_path the job table is kept in a SQLite file, so every gunicorn
+    worker can report on a job and a worker reuses a job another one is
+    already running; without it jobs are only known to this process.
+    """
+    
+    def __init__(self, max_jobs=50, db_path=None):
+        self.executor = ProcessPoolExecutor(max_workers=1)
+        self.jobs = OrderedDict()
+        self.max_jobs = max_jobs
+        self.lock = threading.Lock()
+        self.active_job = None
+        self.db_path = db_path
+        self._open()
+    
+    def _open(self):
+        self.db = None
+        if self.db_path is None:
+            return
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=10)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS training_jobs ('
+            'job_id TEXT PRIMARY KEY, status TEXT, submitted_at REAL, finished_at REAL, '
+            'model_version INTEGER, accuracy REAL, error TEXT)'
+        )
+    
+    def submit(self, classifier):
+        """Queue a training job and return its id (an unfinished job is reused)"""
+        with self.lock:
+            if self.active_job is not None:
+                return self.active_job
+            if self.db is None:
+                job, future = self._submit(classifier)
+            else:
+                # Hold the database's write lock from the check to the insert so
+                # two workers cannot both start a job
+                self.db.execute('BEGIN IMMEDIATE')
+                try:
+                    job, future = self._submit(classifier)
+                finally:
+                    self.db.execute('COMMIT')
+        
+        if future is not None:
+            future.add_done_callback(lambda done: self._finish(classifier, job, done))
+        return job['job_id']
+    
+    def _submit(self, classifier):
+        """(job, future of its fit or None) of a new or already running job, called with self.lock held"""
+        if self.db is not None:
+            row = self.db.execute(
+                "SELECT job_id FROM training_jobs WHERE status = 'running' AND submitted_at > ? "
+                'ORDER BY submitted_at DESC LIMIT 1', (time.time() - JOB_TIMEOUT,)
+            ).fetchone()
+            if row is not None:
+                return {'job_id': row[0]}, None
+        
+        X, y = classifier.prepare_training_data()
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'status': 'running',
+            'submitted_at': time.time(),
+            'finished_at': None,
+            'model_version': None,
+            'accuracy': None,
+            'error': None
+        }
+        if not X:
+            job.update(status='failed', finished_at=time.time(), error='No training data available.')
+            self._remember(job)
+            return job, None
+        
+        self._remember(job)
+        self.active_job = job_id
+        return job, self.executor.submit(fit_intent_model, X, y, classifier.engine)
+    
+    def get_job(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None and self.db is not None:
+                # Submitted through another worker
+                row = self.db.execute(
+                    f"SELECT {', '.join(JOB_FIELDS)} FROM training_jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                job = dict(zip(JOB_FIELDS, row)) if row else None
+            return dict(job) if job else None
+    
+    def _finish(self, classifier, job, future):
+        try:
+            model, accuracy = future.result()
+            version = classifier.swap_model(model)
+            classifier.save_model()
+            print(f"Model v{version} accuracy: {accuracy:.2f}")
+            update = {'status': 'finished', 'model_version': version, 'accuracy': accuracy}
+        except Exception as e:
+            print(f"Training error: {e}")
+            update = {'status': 'failed', 'error': str(e)}
+        
+        with self.lock:
+            job.update(update, finished_at=time.time())
+            self._save(job)
+            if self.active_job == job['job_id']:
+                self.active_job = None
+    
+    def _remember(self, job):
+        self.jobs[job['job_id']] = job
+        while len(self.jobs) > self.max_jobs:
+            self.jobs.popitem(last=False)
+        self._save(job)
+    
+    def _save(self, job):
+        if self.db is None:
+            return
+        try:
+            self.db.execute(
+                f"INSERT OR REPLACE INTO training_jobs ({', '.join(JOB_FIELDS)}) VALUES ({', '.join('?' * len(JOB_FIELDS))})",
+                tuple(job[field] for field in JOB_FIELDS)
+            )
+            self.db.execute(
+                'DELETE FROM training_jobs WHERE job_id NOT IN ('
+                'SELECT job_id FROM training_jobs ORDER BY submitted_at DESC LIMIT ?)', (self.max_jobs,)
+            )
+        except sqlite3.Error as e:
+            # Other workers will not see this job, but it still runs and is known here
+            print(f"Training job store error: {e}")
+    
+    def after_fork(self):
+        """Start a fresh pool in a forked child; the parent's worker process and threads are not inherited"""
+        self.executor = ProcessPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.active_job = None
+        self._open()
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -1,31 +1,114 @@
-from langdetect import detect, DetectorFactory
-from langdetect.lang_detect_exception import LangDetectException
-
-# Set seed for consistent results
-DetectorFactory.seed = 0
-
-class LanguageDetector:
-    def __init__(self):
-        self.supported_languages = ['en', 'es', 'fr', 'de', 'hi', 'zh', 'ja', 'ar']
-    
-    def detect_language(self, text):
-        try:
-            detected_lang = detect(text)
-            if detected_lang in self.supported_languages:
-                return detected_lang
-            return 'en'  # Default to English
-        except LangDetectException:
-            return 'en'
-    
-    def get_language_name(self, lang_code):
-        language_names = {
-            'en': 'English',
-            'es': 'Spanish',
-            'fr': 'French',
-            'de': 'German',
-            'hi': 'Hindi',
-            'zh': 'Chinese',
-            'ja': 'Japanese',
-            'ar': 'Arabic'
-        }
-        return language_names.get(lang_code, 'Unknown')
\ No newline at end of file
+from collections import OrderedDict
+import re
+import threading
+
+from langdetect import detect, DetectorFactory
+from langdetect.lang_detect_exception import LangDetectException
+
+# Set seed for consistent results
+DetectorFactory.seed = 0
+
+# Scripts that identify a supported language on their own. Kana means Japanese
+# even when mixed with Han characters; Han alone is read as Chinese.
+KANA = re.compile('[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]')
+HAN = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+DEVANAGARI = re.compile('[\u0900-\u097f]')
+ARABIC = re.compile('[\u0600-\u06ff\u0750-\u077f\u08a0-\u08ff\ufb50-\ufdff\ufe70-\ufeff]')
+LATIN = re.compile('[A-Za-z\u00c0-\u024f]')
+
+class LanguageDetector:
+    """Tiered detector: Unicode script first, then a memo cache of short texts, then langdetect"""
+    
+    def __init__(self, cache_size=4096, cache_max_length=64):
+        self.supported_languages = ['en', 'es', 'fr', 'de', 'hi', 'zh', 'ja', 'ar']
+        self.cache_size = cache_size
+        self.cache_max_length = cache_max_length
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'script': 0, 'cache': 0, 'langdetect': 0}
+    
+    def detect_language(self, text):
+        language = self.detect_script(text)
+        if language is not None:
+            self._count('script')
+            return language
+        
+        # Short messages repeat a lot ("hi", "thanks"); remember their detections
+        key = ' '.join(text.lower().split()) if len(text) <= self.cache_max_length else None
+        if key is not None:
+            with self.lock:
+                language = self.cache.get(key)
+                if language is not None:
+                    self.cache.move_to_end(key)
+                    self.stats['cache'] += 1
+                    return language
+        
+        language = self._langdetect(text)
+        self._count('langdetect')
+        if key is not None:
+            with self.lock:
+                self.cache[key] = language
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return language
+    
+    def detect_languages(self, texts):
+        """Detect a batch of texts; duplicates within the batch are detected once"""
+        detected = {}
+        languages = []
+        for text in texts:
+            if text not in detected:
+                detected[text] = self.detect_language(text)
+            languages.append(detected[text])
+        return languages
+    
+    def detect_script(self, text):
+        """Decide Japanese, Chinese, Hindi or Arabic from the script alone (None for Latin text)"""
+        if text.isascii():
+            return None
+        
+        latin = len(LATIN.findall(text))
+        kana = len(KANA.findall(text))
+        han = len(HAN.findall(text))
+        if kana and kana + han > latin:
+            return 'ja'
+        if han > latin:
+            return 'zh'
+        if len(DEVANAGARI.findall(text)) > latin:
+            return 'hi'
+        if len(ARABIC.findall(text)) > latin:
+            return 'ar'
+        return None
+    
+    def _langdetect(self, text):
+        try:
+            # langdetect reports Chinese as zh-cn / zh-tw
+            detected_lang = detect(text).split('-')[0]
+            if detected_lang in self.supported_languages:
+                return detected_lang
+            return 'en'  # Default to English
+        except LangDetectException:
+            return 'en'
+    
+    def _count(self, tier):
+        with self.lock:
+            self.stats[tier] += 1
+    
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['cache_size'] = len(self.cache)
+        return stats
+    
+    def get_language_name(self, lang_code):
+        language_names = {
+            'en': 'English',
+            'es': 'Spanish',
+            'fr': 'French',
+            'de': 'German',
+            'hi': 'Hindi',
+            'zh': 'Chinese',
+            'ja': 'Japanese',
+            'ar': 'Arabic'
+        }
+        return language_names.get(lang_code, 'Unknown')
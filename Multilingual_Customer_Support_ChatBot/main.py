@@ -1,287 +1,702 @@
-import sys
-import os
-
-# Add the parent directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from flask import Flask, render_template, request, jsonify
-from flask_cors import CORS
-import json
-
-# Try to import modules with error handling
-try:
-    from app.models.nlp_processor import NLPProcessor
-    from app.models.intent_classifier import IntentClassifier
-    from app.utils.language_detector import LanguageDetector
-    from app.utils.translator import TextTranslator
-    print("✓ All modules imported successfully")
-except ImportError as e:
-    print(f"✗ Import error: {e}")
-    print("Make sure all required files are created and in the correct locations")
-    # Create fallback classes to prevent crashes
-    class NLPProcessor:
-        def __init__(self):
-            pass
-        def tokenize_and_lemmatize(self, text):
-            return text.split()
-        def extract_entities(self, text):
-            return []
-        def get_sentiment(self, text):
-            return 'neutral'
-    
-    class IntentClassifier:
-        def __init__(self):
-            pass
-        def predict_intent(self, text):
-            return 'greeting', 0.5
-        def get_response(self, intent):
-            return "Hello! I'm still learning. Please make sure all files are properly set up."
-    
-    class LanguageDetector:
-        def __init__(self):
-            pass
-        def detect_language(self, text):
-            return 'en'
-    
-    class TextTranslator:
-        def __init__(self):
-            pass
-        def translate_to_english(self, text, source_language):
-            return text
-        def translate_from_english(self, text, target_language):
-            return text
-
-app = Flask(__name__, 
-            template_folder='templates',
-            static_folder='../static')
-CORS(app)
-
-# Initialize components with error handling
-try:
-    nlp_processor = NLPProcessor()
-    intent_classifier = IntentClassifier()
-    language_detector = LanguageDetector()
-    translator = TextTranslator()
-    print("✓ All components initialized successfully")
-except Exception as e:
-    print(f"✗ Error initializing components: {e}")
-    print("Using fallback components")
-
-class ChatBot:
-    def __init__(self):
-        self.conversation_history = []
-        self.default_responses = {
-            'greeting': [
-                "Hello! How can I help you today?",
-                "Hi there! What can I do for you?",
-                "Greetings! How may I assist you?"
-            ],
-            'goodbye': [
-                "Goodbye! Have a great day!",
-                "See you later! Take care!",
-                "Farewell! Don't hesitate to reach out if you need help."
-            ],
-            'unknown': [
-                "I'm sorry, I don't understand that. Could you please rephrase?",
-                "I'm not sure what you mean. Can you try asking differently?",
-                "I don't have information about that. How else can I help you?"
-            ]
-        }
-    
-    def process_message(self, message, user_language=None):
-        try:
-            # Detect language if not provided
-            if not user_language or user_language == 'auto':
-                user_language = language_detector.detect_language(message)
-            
-            # Translate to English for processing if needed
-            english_message = message
-            if user_language != 'en':
-                english_message = translator.translate_to_english(message, user_language)
-            
-            # Process with NLP
-            processed_text = nlp_processor.tokenize_and_lemmatize(english_message)
-            entities = nlp_processor.extract_entities(english_message)
-            sentiment = nlp_processor.get_sentiment(english_message)
-            
-            # Classify intent
-            intent, confidence = intent_classifier.predict_intent(english_message)
-            
-            # Get response
-            english_response = intent_classifier.get_response(intent)
-            
-            # Fallback to default responses if needed
-            if not english_response or english_response == "I'm sorry, I don't understand that request.":
-                if intent in self.default_responses:
-                    import random
-                    english_response = random.choice(self.default_responses[intent])
-                else:
-                    import random
-                    english_response = random.choice(self.default_responses['unknown'])
-            
-            # Translate response back to user's language
-            response = english_response
-            if user_language != 'en':
-                response = translator.translate_from_english(english_response, user_language)
-            
-            # Store conversation
-            self.conversation_history.append({
-                'user_message': message,
-                'response': response,
-                'language': user_language,
-                'intent': intent,
-                'confidence': confidence,
-                'sentiment': sentiment
-            })
-            
-            return {
-                'response': response,
-                'language': user_language,
-                'intent': intent,
-                'confidence': float(confidence),
-                'sentiment': sentiment,
-                'entities': entities
-            }
-            
-        except Exception as e:
-            print(f"✗ Error processing message: {e}")
-            return {
-                'response': "I'm sorry, I encountered an error processing your message. Please try again.",
-                'language': user_language or 'en',
-                'intent': 'error',
-                'confidence': 0.0,
-                'sentiment': 'neutral',
-                'entities': []
-            }
-
-# Initialize chatbot
-chatbot = ChatBot()
-
-@app.route('/')
-def index():
-    """Serve the main chat interface"""
-    try:
-        return render_template('index.html')
-    except Exception as e:
-        print(f"✗ Error loading template: {e}")
-        return f'''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Multilingual Chatbot</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 50px; }}
-                .error {{ color: red; }}
-                .info {{ color: blue; }}
-            </style>
-        </head>
-        <body>
-            <h1>Multilingual Customer Support Chatbot</h1>
-            <div class="error">Template file not found. Please create app/templates/index.html</div>
-            <div class="info">
-                <p>Basic chat interface:</p>
-                <div id="chat"></div>
-                <input type="text" id="message" placeholder="Type your message...">
-                <button onclick="sendMessage()">Send</button>
-            </div>
-            <script>
-                function sendMessage() {{
-                    const message = document.getElementById('message').value;
-                    fetch('/chat', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ message: message }})
-                    }})
-                    .then(response => response.json())
-                    .then(data => {{
-                        document.getElementById('chat').innerHTML += 
-                            '<div>You: ' + message + '</div>' +
-                            '<div>Bot: ' + data.response + '</div>';
-                        document.getElementById('message').value = '';
-                    }});
-                }}
-            </script>
-        </body>
-        </html>
-        '''
-
-@app.route('/chat', methods=['POST'])
-def chat():
-    """Handle chat messages"""
-    try:
-        data = request.json
-        message = data.get('message', '')
-        user_language = data.get('language', None)
-        
-        if not message:
-            return jsonify({'error': 'Message is required'}), 400
-        
-        if len(message) > 500:
-            return jsonify({'error': 'Message too long. Please keep it under 500 characters.'}), 400
-        
-        result = chatbot.process_message(message, user_language)
-        return jsonify(result)
-    
-    except Exception as e:
-        print(f"✗ Chat error: {e}")
-        return jsonify({
-            'error': 'Internal server error',
-            'response': 'I apologize, but I encountered an error. Please try again.',
-            'language': 'en',
-            'intent': 'error',
-            'confidence': 0.0,
-            'sentiment': 'neutral',
-            'entities': []
-        }), 500
-
-@app.route('/train', methods=['POST'])
-def train_model():
-    """Train the intent classification model"""
-    try:
-        intent_classifier.train_model()
-        return jsonify({'message': 'Model trained successfully'})
-    except Exception as e:
-        print(f"✗ Training error: {e}")
-        return jsonify({'error': f'Training failed: {str(e)}'}), 500
-
-@app.route('/health')
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'components': {
-            'nlp_processor': 'initialized',
-            'intent_classifier': 'initialized',
-            'language_detector': 'initialized',
-            'translator': 'initialized'
-        }
-    })
-
-@app.route('/conversation-history')
-def get_conversation_history():
-    """Get conversation history"""
-    return jsonify({
-        'history': chatbot.conversation_history[-10:],  # Return last 10 messages
-        'total_messages': len(chatbot.conversation_history)
-    })
-
-@app.route('/clear-history', methods=['POST'])
-def clear_history():
-    """Clear conversation history"""
-    chatbot.conversation_history = []
-    return jsonify({'message': 'Conversation history cleared'})
-
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
-
-if __name__ == '__main__':
-    print("🚀 Starting Flask application...")
-    print(f"📍 Current working directory: {os.getcwd()}")
-    print(f"📍 Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-    print("📍 Server will be available at: http://localhost:5000")
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, render_template, request, jsonify
+from flask_cors import CORS
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import uuid
+
+from config import Config
+
+# Try to import modules with error handling
+try:
+    from app.models.nlp_processor import NLPProcessor, download_nltk_data
+    from app.models.intent_classifier import IntentClassifier, IntentTrainer
+    from app.utils.language_detector import LanguageDetector
+    from app.utils.response_cache import ResponseCache
+    from app.utils.metrics import PipelineMetrics
+    from app.utils.conversation_store import (
+        ConversationRecord, InMemoryConversationStore, SQLiteConversationStore
+    )
+    from app.utils.translator import (
+        TextTranslator, TranslationCache, TokenBucket,
+        GoogleTranslateBackend, LocalTranslationBackend
+    )
+    print("✓ All modules imported successfully")
+except ImportError as e:
+    print(f"✗ Import error: {e}")
+    print("Make sure all required files are created and in the correct locations")
+    # Create fallback classes to prevent crashes
+    class NLPProcessor:
+        def __init__(self, max_models=0):
+            pass
+        def tokenize_and_lemmatize(self, text):
+            return text.split()
+        def extract_entities(self, text):
+            return []
+        def get_sentiment(self, text):
+            return 'neutral'
+        def analyze(self, text, language='en', timings=None):
+            return {'lemmas': text.split(), 'entities': [], 'sentiment': 'neutral'}
+        def load_spacy_models(self):
+            pass
+    
+    def download_nltk_data():
+        pass
+    
+    class IntentClassifier:
+        def __init__(self, trainer=None, model_format=None, engine=None, check_interval=None):
+            self.intents = {}
+            self.model_version = 0
+            self.swap_listeners = []
+        def predict_intent(self, text):
+            return 'greeting', 0.5
+        def predict_intents(self, texts):
+            return [('greeting', 0.5) for _ in texts]
+        def load_model(self, background=True):
+            pass
+        def get_response(self, intent):
+            return "Hello! I'm still learning. Please make sure all files are properly set up."
+    
+    class IntentTrainer:
+        def __init__(self, max_jobs=50, db_path=None):
+            pass
+        def submit(self, classifier):
+            return None
+        def get_job(self, job_id):
+            return None
+        def after_fork(self):
+            pass
+    
+    class LanguageDetector:
+        def __init__(self, cache_size=0):
+            self.supported_languages = ['en']
+        def detect_language(self, text):
+            return 'en'
+        def detect_languages(self, texts):
+            return ['en' for _ in texts]
+        def get_stats(self):
+            return None
+    
+    class TextTranslator:
+        def __init__(self, cache=None, backend=None, rate_limiter=None):
+            pass
+        def translate_to_english(self, text, source_language):
+            return text
+        def translate_from_english(self, text, target_language):
+            return text
+        def translate_many(self, requests):
+            return [text for text, target_language, source_language in requests]
+        async def translate_many_async(self, requests):
+            return [text for text, target_language, source_language in requests]
+        def after_fork(self):
+            pass
+        def prewarm(self, texts, languages):
+            pass
+        def cache_stats(self):
+            return None
+    
+    class TranslationCache:
+        def __init__(self, max_size=0, db_path=None):
+            pass
+    
+    class ConversationRecord:
+        def __init__(self, *args, **kwargs):
+            pass
+    
+    class InMemoryConversationStore:
+        def __init__(self, *args, **kwargs):
+            pass
+        def append(self, session_id, record):
+            pass
+        def get_history(self, session_id, limit=10):
+            return [], 0
+        def clear(self, session_id):
+            pass
+        def session_count(self):
+            return 0
+        def after_fork(self):
+            pass
+    
+    SQLiteConversationStore = InMemoryConversationStore
+    
+    class ResponseCache:
+        generation = 0
+        def __init__(self, max_size=0, ttl=0):
+            pass
+        def get(self, message, language=None):
+            return None
+        def put(self, message, language, value, generation=None):
+            pass
+        def clear(self):
+            pass
+        def get_stats(self):
+            return None
+    
+    class NullTimer:
+        timings = None
+        def lap(self, stage):
+            pass
+        def skip(self):
+            pass
+        def finish(self):
+            return None
+        def as_milliseconds(self):
+            return {}
+    
+    class PipelineMetrics:
+        def __init__(self, enabled=False):
+            pass
+        def timer(self, force=False):
+            return NullTimer()
+        def after_fork(self):
+            pass
+        def render(self):
+            return ''
+    
+    class TokenBucket:
+        def __init__(self, rate=0, capacity=0):
+            pass
+    
+    class GoogleTranslateBackend:
+        def __init__(self, **kwargs):
+            pass
+    
+    LocalTranslationBackend = GoogleTranslateBackend
+
+app = Flask(__name__, 
+            template_folder='templates',
+            static_folder='../static')
+app.config.from_object(Config)
+CORS(app)
+
+def open_translation_cache():
+    """The SQLite-backed translation cache, or a memory-only one when its file cannot be opened"""
+    try:
+        return TranslationCache(
+            max_size=Config.TRANSLATION_CACHE_SIZE,
+            db_path=Config.TRANSLATION_CACHE_PATH
+        )
+    except (sqlite3.Error, OSError) as e:
+        print(f"✗ Cannot open translation cache {Config.TRANSLATION_CACHE_PATH}: {e}")
+        print("Using an in-memory translation cache")
+        return TranslationCache(max_size=Config.TRANSLATION_CACHE_SIZE)
+
+def open_intent_trainer():
+    """The intent trainer with its job table shared through SQLite, or kept per process when the file cannot be opened"""
+    try:
+        return IntentTrainer(db_path=Config.TRAINING_JOBS_PATH)
+    except (sqlite3.Error, OSError) as e:
+        print(f"✗ Cannot open training job store {Config.TRAINING_JOBS_PATH}: {e}")
+        print("Training jobs are only visible to the worker that started them")
+        return IntentTrainer()
+
+def open_conversation_store():
+    """The configured conversation store, in memory when the SQLite file cannot be opened"""
+    if Config.CONVERSATION_STORE == 'sqlite':
+        try:
+            return SQLiteConversationStore(
+                Config.CONVERSATION_DB_PATH,
+                max_messages=Config.CONVERSATION_MAX_MESSAGES,
+                idle_timeout=Config.SESSION_IDLE_TIMEOUT,
+                max_sessions=Config.MAX_SESSIONS,
+                flush_interval=Config.CONVERSATION_FLUSH_INTERVAL
+            )
+        except (sqlite3.Error, OSError) as e:
+            print(f"✗ Cannot open conversation store {Config.CONVERSATION_DB_PATH}: {e}")
+            print("Keeping conversations in memory only")
+    return InMemoryConversationStore(
+        max_messages=Config.CONVERSATION_MAX_MESSAGES,
+        idle_timeout=Config.SESSION_IDLE_TIMEOUT,
+        max_sessions=Config.MAX_SESSIONS
+    )
+
+# Initialize components; only the disk-backed stores have a fallback, any other error stops startup
+nlp_processor = NLPProcessor(max_models=Config.SPACY_MAX_MODELS)
+intent_trainer = open_intent_trainer()
+intent_classifier = IntentClassifier(
+    trainer=intent_trainer,
+    model_format=Config.INTENT_MODEL_FORMAT,
+    engine=Config.INTENT_MODEL_ENGINE,
+    check_interval=Config.INTENT_MODEL_CHECK_INTERVAL
+)
+language_detector = LanguageDetector(cache_size=Config.LANGUAGE_CACHE_SIZE)
+if Config.TRANSLATION_BACKEND == 'local':
+    translation_backend = LocalTranslationBackend(latency=Config.LOCAL_TRANSLATION_LATENCY)
+else:
+    translation_backend = GoogleTranslateBackend(max_workers=Config.TRANSLATION_MAX_WORKERS)
+translator = TextTranslator(
+    cache=open_translation_cache(),
+    backend=translation_backend,
+    rate_limiter=TokenBucket(
+        rate=Config.TRANSLATION_RATE_LIMIT,
+        capacity=Config.TRANSLATION_BURST
+    )
+)
+conversation_store = open_conversation_store()
+response_cache = ResponseCache(
+    max_size=Config.RESPONSE_CACHE_SIZE,
+    ttl=Config.RESPONSE_CACHE_TTL
+)
+pipeline_metrics = PipelineMetrics(enabled=Config.METRICS_ENABLED)
+# Cached analyses belong to the model that produced them
+intent_classifier.swap_listeners.append(lambda version: response_cache.clear())
+print("✓ All components initialized successfully")
+
+class ChatBot:
+    def __init__(self, store):
+        self.conversation_store = store
+        self.default_responses = {
+            'greeting': [
+                "Hello! How can I help you today?",
+                "Hi there! What can I do for you?",
+                "Greetings! How may I assist you?"
+            ],
+            'goodbye': [
+                "Goodbye! Have a great day!",
+                "See you later! Take care!",
+                "Farewell! Don't hesitate to reach out if you need help."
+            ],
+            'unknown': [
+                "I'm sorry, I don't understand that. Could you please rephrase?",
+                "I'm not sure what you mean. Can you try asking differently?",
+                "I don't have information about that. How else can I help you?"
+            ]
+        }
+    
+    def process_message(self, message, user_language=None, session_id=None, timer=None):
+        return self.process_messages([message], user_language, session_id, timer)[0]
+    
+    def process_messages(self, messages, user_language=None, session_id=None, timer=None):
+        """Blocking wrapper around aprocess_messages for synchronous callers"""
+        return asyncio.run(self.aprocess_messages(messages, user_language, session_id, timer))
+    
+    async def aprocess_messages(self, messages, user_language=None, session_id=None, timer=None):
+        """Process a burst of messages: translations run concurrently and intents are classified in one batch.
+        
+        Stage timings go to timer (by default a new one from pipeline_metrics);
+        read timer.timings afterwards for the per-stage seconds of this call.
+        """
+        if timer is None:
+            timer = pipeline_metrics.timer()
+        items = [
+            {'message': message, 'language': user_language, 'session_id': session_id, 'failed': False}
+            for message in messages
+        ]
+        
+        # Repeated messages reuse the cached analysis and skip straight to the response
+        cache_generation = response_cache.generation
+        for item in items:
+            cached = response_cache.get(item['message'], user_language)
+            item['cached'] = cached is not None
+            if cached is not None:
+                item.update(cached)
+        fresh = [item for item in items if not item['cached']]
+        timer.lap('cache')
+        
+        # Detect language if not provided, in one batch for the whole burst
+        if not user_language or user_language == 'auto':
+            try:
+                languages = language_detector.detect_languages(item['message'] for item in fresh)
+            except Exception as e:
+                print(f"✗ Error detecting languages: {e}")
+                for item in fresh:
+                    item['failed'] = True
+                languages = []
+            for item, language in zip(fresh, languages):
+                item['language'] = language
+        timer.lap('detect')
+        
+        # Translate every non-English message to English concurrently
+        for item in fresh:
+            item['english_message'] = item['message']
+        inbound = [item for item in fresh if not item['failed'] and item['language'] != 'en']
+        translations = await translator.translate_many_async(
+            [(item['message'], 'en', item['language']) for item in inbound]
+        )
+        for item, translation in zip(inbound, translations):
+            item['english_message'] = translation
+        timer.lap('translate_in')
+        
+        # Process with NLP (analyze charges its lemmatize, ner and sentiment steps itself)
+        self._for_each(fresh, lambda item: self._analyze(item, timer.timings))
+        timer.skip()
+        
+        # Classify intent for every message that made it this far in one batch
+        pending = [item for item in fresh if not item['failed']]
+        try:
+            predictions = intent_classifier.predict_intents(
+                [item['english_message'] for item in pending]
+            )
+        except Exception as e:
+            print(f"✗ Error classifying messages: {e}")
+            for item in pending:
+                item['failed'] = True
+            predictions = []
+        for item, (intent, confidence) in zip(pending, predictions):
+            item['intent'] = intent
+            item['confidence'] = confidence
+            response_cache.put(item['message'], user_language, {
+                'language': item['language'],
+                'intent': intent,
+                'confidence': confidence,
+                'entities': item['entities'],
+                'sentiment': item['sentiment']
+            }, generation=cache_generation)
+        timer.lap('classify')
+        
+        # Get responses and translate them back to each user's language concurrently
+        self._for_each(items, self._choose_response)
+        for item in items:
+            item['response'] = item.get('english_response')
+        timer.lap('respond')
+        outbound = [item for item in items if not item['failed'] and item['language'] != 'en']
+        translations = await translator.translate_many_async(
+            [(item['english_response'], item['language'], 'en') for item in outbound]
+        )
+        for item, translation in zip(outbound, translations):
+            item['response'] = translation
+        timer.lap('translate_out')
+        
+        results = [self._finish(item) for item in items]
+        timer.lap('store')
+        timer.finish()
+        return results
+    
+    def _for_each(self, items, step):
+        for item in items:
+            if item['failed']:
+                continue
+            try:
+                step(item)
+            except Exception as e:
+                print(f"✗ Error processing message: {e}")
+                item['failed'] = True
+    
+    def _analyze(self, item, timings=None):
+        analysis = nlp_processor.analyze(item['english_message'], timings=timings)
+        item['processed_text'] = analysis['lemmas']
+        item['entities'] = analysis['entities']
+        item['sentiment'] = analysis['sentiment']
+    
+    def _choose_response(self, item):
+        intent = item['intent']
+        english_response = intent_classifier.get_response(intent)
+        
+        # Fallback to default responses if needed
+        if not english_response or english_response == "I'm sorry, I don't understand that request.":
+            if intent in self.default_responses:
+                english_response = random.choice(self.default_responses[intent])
+            else:
+                english_response = random.choice(self.default_responses['unknown'])
+        item['english_response'] = english_response
+    
+    def _finish(self, item):
+        if item['failed']:
+            return self._error_result(item['language'])
+        
+        # Store conversation
+        if item['session_id']:
+            self.conversation_store.append(item['session_id'], ConversationRecord(
+                item['message'],
+                item['response'],
+                item['language'],
+                item['intent'],
+                item['confidence'],
+                item['sentiment']
+            ))
+        
+        return {
+            'response': item['response'],
+            'language': item['language'],
+            'intent': item['intent'],
+            'confidence': float(item['confidence']),
+            'sentiment': item['sentiment'],
+            'entities': item['entities']
+        }
+    
+    def _error_result(self, user_language=None):
+        return {
+            'response': "I'm sorry, I encountered an error processing your message. Please try again.",
+            'language': user_language or 'en',
+            'intent': 'error',
+            'confidence': 0.0,
+            'sentiment': 'neutral',
+            'entities': []
+        }
+
+# Initialize chatbot
+chatbot = ChatBot(conversation_store)
+
+def get_session_id(data=None, create=False):
+    """Session id from the JSON body, query string or X-Session-ID header"""
+    session_id = (data or {}).get('session_id') or request.args.get('session_id') \
+        or request.headers.get('X-Session-ID')
+    if not session_id and create:
+        session_id = uuid.uuid4().hex
+    return session_id
+
+def prewarm_translation_cache():
+    """Translate every canned response into every supported language ahead of time"""
+    responses = set()
+    for intent_data in intent_classifier.intents.values():
+        responses.update(intent_data.get('responses', []))
+    for intent_responses in chatbot.default_responses.values():
+        responses.update(intent_responses)
+    translator.prewarm(sorted(responses), language_detector.supported_languages)
+    print(f"✓ Translation cache prewarmed: {translator.cache_stats()}")
+
+def warm_up():
+    """Load models up front (the production server calls this in the master before forking)"""
+    nlp_processor.load_spacy_models()
+    # Loads the saved model, or trains one in this process if none is saved yet
+    intent_classifier.load_model(background=False)
+    intent_classifier.predict_intents(['hello'])
+    language_detector.detect_language('hello there')
+    try:
+        nlp_processor.analyze('hello there')
+    except LookupError as e:
+        print(f"✗ NLTK data missing, run download_nltk_data() before serving: {e}")
+
+def after_fork():
+    """Give a forked worker its own database connections, threads and process pool"""
+    translator.after_fork()
+    conversation_store.after_fork()
+    pipeline_metrics.after_fork()
+    intent_trainer.after_fork()
+
+if Config.TRANSLATION_CACHE_PREWARM:
+    threading.Thread(target=prewarm_translation_cache, daemon=True).start()
+
+@app.route('/')
+def index():
+    """Serve the main chat interface"""
+    try:
+        return render_template('index.html')
+    except Exception as e:
+        print(f"✗ Error loading template: {e}")
+        return f'''
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Multilingual Chatbot</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 50px; }}
+                .error {{ color: red; }}
+                .info {{ color: blue; }}
+            </style>
+        </head>
+        <body>
+            <h1>Multilingual Customer Support Chatbot</h1>
+            <div class="error">Template file not found. Please create app/templates/index.html</div>
+            <div class="info">
+                <p>Basic chat interface:</p>
+                <div id="chat"></div>
+                <input type="text" id="message" placeholder="Type your message...">
+                <button onclick="sendMessage()">Send</button>
+            </div>
+            <script>
+                function sendMessage() {{
+                    const message = document.getElementById('message').value;
+                    fetch('/chat', {{
+                        method: 'POST',
+                        headers: {{ 'Content-Type': 'application/json' }},
+                        body: JSON.stringify({{ message: message }})
+                    }})
+                    .then(response => response.json())
+                    .then(data => {{
+                        document.getElementById('chat').innerHTML += 
+                            '<div>You: ' + message + '</div>' +
+                            '<div>Bot: ' + data.response + '</div>';
+                        document.getElementById('message').value = '';
+                    }});
+                }}
+            </script>
+        </body>
+        </html>
+        '''
+
+def parse_chat_request():
+    """(message, user_language, session_id, error_response) for /chat"""
+    data = request.json
+    message = data.get('message', '')
+    user_language = data.get('language', None)
+    
+    if not message:
+        return None, None, None, (jsonify({'error': 'Message is required'}), 400)
+    
+    if len(message) > Config.MAX_MESSAGE_LENGTH:
+        return None, None, None, (jsonify({'error': f'Message too long. Please keep it under {Config.MAX_MESSAGE_LENGTH} characters.'}), 400)
+    
+    return message, user_language, get_session_id(data, create=True), None
+
+def wants_timings():
+    """True when the client asked for per-stage timings with the debug header"""
+    return request.headers.get(Config.DEBUG_TIMINGS_HEADER, '').lower() in ('1', 'true', 'yes')
+
+def chat_error_response(e):
+    print(f"✗ Chat error: {e}")
+    return jsonify({
+        'error': 'Internal server error',
+        'response': 'I apologize, but I encountered an error. Please try again.',
+        'language': 'en',
+        'intent': 'error',
+        'confidence': 0.0,
+        'sentiment': 'neutral',
+        'entities': []
+    }), 500
+
+@app.route('/chat', methods=['POST'])
+def chat():
+    """Handle chat messages"""
+    try:
+        message, user_language, session_id, error = parse_chat_request()
+        if error:
+            return error
+        
+        timer = pipeline_metrics.timer(force=wants_timings())
+        result = chatbot.process_message(message, user_language, session_id, timer)
+        result['session_id'] = session_id
+        if wants_timings():
+            result['timings'] = timer.as_milliseconds()
+        return jsonify(result)
+    
+    except Exception as e:
+        return chat_error_response(e)
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Handle a burst of chat messages in one request"""
+    try:
+        data = request.json or {}
+        messages = data.get('messages')
+        user_language = data.get('language', None)
+        
+        if not isinstance(messages, list) or not messages:
+            return jsonify({'error': 'A non-empty list of messages is required'}), 400
+        
+        if len(messages) > Config.MAX_BATCH_SIZE:
+            return jsonify({'error': f'Too many messages. Please send at most {Config.MAX_BATCH_SIZE} per batch.'}), 400
+        
+        # Validate each message; invalid ones get an error entry in their slot
+        results = [None] * len(messages)
+        valid_indices = []
+        for i, message in enumerate(messages):
+            if not isinstance(message, str) or not message:
+                results[i] = {'error': 'Message is required'}
+            elif len(message) > Config.MAX_MESSAGE_LENGTH:
+                results[i] = {'error': f'Message too long. Please keep it under {Config.MAX_MESSAGE_LENGTH} characters.'}
+            else:
+                valid_indices.append(i)
+        
+        session_id = get_session_id(data, create=True)
+        timer = pipeline_metrics.timer(force=wants_timings())
+        processed = chatbot.process_messages(
+            [messages[i] for i in valid_indices], user_language, session_id, timer
+        )
+        for i, result in zip(valid_indices, processed):
+            results[i] = result
+        
+        response = {'results': results, 'count': len(results), 'session_id': session_id}
+        if wants_timings():
+            # Stages run once for the whole batch, so timings cover all of it
+            response['timings'] = timer.as_milliseconds()
+        return jsonify(response)
+    
+    except Exception as e:
+        print(f"✗ Batch chat error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/train', methods=['POST'])
+def train_model():
+    """Start training the intent classification model in the background"""
+    try:
+        job_id = intent_trainer.submit(intent_classifier)
+        return jsonify({
+            'message': 'Model training started',
+            'job_id': job_id,
+            'status_url': f'/train/{job_id}'
+        }), 202
+    except Exception as e:
+        print(f"✗ Training error: {e}")
+        return jsonify({'error': f'Training failed: {str(e)}'}), 500
+
+@app.route('/train/<job_id>')
+def training_status(job_id):
+    """Status of a background training job"""
+    job = intent_trainer.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Training job not found'}), 404
+    job['current_model_version'] = intent_classifier.model_version
+    return jsonify(job)
+
+@app.route('/health')
+def health_check():
+    """Health check endpoint"""
+    return jsonify({
+        'status': 'healthy',
+        'components': {
+            'nlp_processor': 'initialized',
+            'intent_classifier': 'initialized',
+            'language_detector': 'initialized',
+            'translator': 'initialized'
+        },
+        'language_detection': language_detector.get_stats(),
+        'translation_cache': translator.cache_stats(),
+        'response_cache': response_cache.get_stats(),
+        'active_sessions': conversation_store.session_count(),
+        'model_version': intent_classifier.model_version
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Pipeline stage latency histograms in Prometheus text format"""
+    return Response(pipeline_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/conversation-history')
+def get_conversation_history():
+    """Get a session's conversation history"""
+    session_id = get_session_id()
+    if not session_id:
+        return jsonify({'error': 'session_id is required'}), 400
+    
+    history, total = chatbot.conversation_store.get_history(session_id, limit=10)  # Return last 10 messages
+    return jsonify({
+        'session_id': session_id,
+        'history': history,
+        'total_messages': total
+    })
+
+@app.route('/clear-history', methods=['POST'])
+def clear_history():
+    """Clear a session's conversation history"""
+    session_id = get_session_id(request.get_json(silent=True))
+    if not session_id:
+        return jsonify({'error': 'session_id is required'}), 400
+    
+    chatbot.conversation_store.clear(session_id)
+    return jsonify({'message': 'Conversation history cleared'})
+
+@app.errorhandler(404)
+def not_found(error):
+    return jsonify({'error': 'Endpoint not found'}), 404
+
+@app.errorhandler(500)
+def internal_error(error):
+    return jsonify({'error': 'Internal server error'}), 500
+
+if __name__ == '__main__':
+    print("🚀 Starting Flask application...")
+    print(f"📍 Current working directory: {os.getcwd()}")
+    print(f"📍 Script directory: {os.path.dirname(os.path.abspath(__file__))}")
+    print("📍 Server will be available at: http://localhost:5000")
+    # The development server fetches missing NLTK data itself; production images should bundle it
+    download_nltk_data()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,121 @@
+from bisect import bisect_left
+import threading
+import time
+
+# Upper bounds in seconds, from 100 us (cache hits) to 10 s (slow translations)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PIPELINE_STAGES = ('cache', 'detect', 'translate_in', 'lemmatize', 'ner', 'sentiment',
+                   'classify', 'respond', 'translate_out', 'store')
+
+class Histogram:
+    """Fixed-bucket latency histogram; counts are kept per bucket and summed on render"""
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+    
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+class RequestTimer:
+    """Per-request stage timings, recorded into the pipeline histograms when finished if metrics are enabled"""
+    
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.timings = {}
+        self.started = self.last = time.perf_counter()
+    
+    def lap(self, stage):
+        """Charge the time since the previous lap to stage"""
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self.last
+        self.last = now
+    
+    def skip(self):
+        """Start the next lap now without charging the elapsed time to any stage"""
+        self.last = time.perf_counter()
+    
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+        # A timer forced by the debug header while metrics are off only reports its timings
+        if self.metrics.enabled:
+            self.metrics.record(self.timings, self.total)
+        return self.timings
+    
+    def as_milliseconds(self):
+        timings = {stage: round(seconds * 1000, 3) for stage, seconds in self.timings.items()}
+        timings['total'] = round(self.total * 1000, 3)
+        return timings
+
+class NullTimer:
+    """Stand-in used when metrics are disabled: every call is a no-op"""
+    timings = None
+    
+    def lap(self, stage):
+        pass
+    
+    def skip(self):
+        pass
+    
+    def finish(self):
+        return None
+
+NULL_TIMER = NullTimer()
+
+class PipelineMetrics:
+    """Stage and request latency histograms for ChatBot, rendered in Prometheus text format"""
+    
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.stages = {stage: Histogram(buckets) for stage in PIPELINE_STAGES}
+        self.requests = Histogram(buckets)
+        self.lock = threading.Lock()
+    
+    def timer(self, force=False):
+        """A RequestTimer, or NULL_TIMER when metrics are disabled and timings were not requested"""
+        if self.enabled or force:
+            return RequestTimer(self)
+        return NULL_TIMER
+    
+    def record(self, timings, total):
+        with self.lock:
+            for stage, seconds in timings.items():
+                histogram = self.stages.get(stage)
+                if histogram is None:
+                    histogram = self.stages[stage] = Histogram(self.requests.buckets)
+                histogram.observe(seconds)
+            self.requests.observe(total)
+    
+    def after_fork(self):
+        self.lock = threading.Lock()
+    
+    def render(self):
+        with self.lock:
+            lines = [
+                '# HELP chatbot_stage_seconds Time spent in each ChatBot pipeline stage per request.',
+                '# TYPE chatbot_stage_seconds histogram'
+            ]
+            for stage, histogram in self.stages.items():
+                lines.extend(histogram.render('chatbot_stage_seconds', f'stage="{stage}"'))
+            lines.extend([
+                '# HELP chatbot_request_seconds Time spent processing a chat request.',
+                '# TYPE chatbot_request_seconds histogram'
+            ])
+            lines.extend(self.requests.render('chatbot_request_seconds', 'pipeline="chat"'))
+        return '\n'.join(lines) + '\n'
@@ -1,78 +1,181 @@
-import spacy
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import re
-
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('wordnet')
-
-class NLPProcessor:
-    def __init__(self):
-        self.lemmatizer = WordNetLemmatizer()
-        self.spacy_models = {
-            'en': 'en_core_web_sm',
-            'es': 'es_core_news_sm',
-            'fr': 'fr_core_news_sm',
-            'de': 'de_core_news_sm'
-        }
-        self.nlp_models = {}
-        self.load_spacy_models()
-    
-    def load_spacy_models(self):
-        for lang, model_name in self.spacy_models.items():
-            try:
-                self.nlp_models[lang] = spacy.load(model_name)
-            except OSError:
-                print(f"Warning: {model_name} not found. Install with: python -m spacy download {model_name}")
-    
-    def clean_text(self, text):
-        # Remove special characters and digits
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        # Convert to lowercase
-        text = text.lower()
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    
-    def tokenize_and_lemmatize(self, text, language='en'):
-        # Clean text
-        cleaned_text = self.clean_text(text)
-        
-        # Tokenize
-        tokens = word_tokenize(cleaned_text)
-        
-        # Remove stopwords
-        stop_words = set(stopwords.words('english'))
-        tokens = [token for token in tokens if token not in stop_words]
-        
-        # Lemmatize
-        lemmatized_tokens = [self.lemmatizer.lemmatize(token) for token in tokens]
-        
-        return lemmatized_tokens
-    
-    def extract_entities(self, text, language='en'):
-        if language in self.nlp_models:
-            doc = self.nlp_models[language](text)
-            entities = [(ent.text, ent.label_) for ent in doc.ents]
-            return entities
-        return []
-    
-    def get_sentiment(self, text, language='en'):
-        # Simple sentiment analysis based on keywords
-        positive_words = ['good', 'great', 'excellent', 'happy', 'satisfied', 'love', 'wonderful']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'angry', 'disappointed', 'problem']
-        
-        words = text.lower().split()
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
-        
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
-        else:
-            return 'neutral'
\ No newline at end of file
+import spacy
+import nltk
+from nltk.tokenize import word_tokenize
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from collections import OrderedDict
+from functools import lru_cache
+import threading
+import time
+import re
+
+# NLTK data used by NLPProcessor (package name -> resource path)
+NLTK_PACKAGES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet'
+}
+
+NON_LETTERS = re.compile(r'[^a-zA-Z]')
+
+# Keyword lexicons for get_sentiment
+POSITIVE_WORDS = frozenset(['good', 'great', 'excellent', 'happy', 'satisfied', 'love', 'wonderful'])
+NEGATIVE_WORDS = frozenset(['bad', 'terrible', 'awful', 'hate', 'angry', 'disappointed', 'problem'])
+
+# Letter-only words that word_tokenize splits in two (MacIntyre contractions)
+CONTRACTIONS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na')
+}
+
+def download_nltk_data():
+    """Download any missing NLTK data (network access only for packages not installed yet)"""
+    for package, resource in NLTK_PACKAGES.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package, quiet=True)
+
+class NLPProcessor:
+    # Only tok2vec and ner are needed for entity extraction
+    EXCLUDED_COMPONENTS = ['parser', 'tagger', 'lemmatizer', 'attribute_ruler', 'morphologizer', 'senter']
+    
+    def __init__(self, max_models=2):
+        self.lemmatizer = WordNetLemmatizer()
+        self.lemmatize = lru_cache(maxsize=65536)(self.lemmatizer.lemmatize)
+        self._stop_words = None
+        self.spacy_models = {
+            'en': 'en_core_web_sm',
+            'es': 'es_core_news_sm',
+            'fr': 'fr_core_news_sm',
+            'de': 'de_core_news_sm'
+        }
+        # Models are loaded on first use and evicted least-recently-used
+        self.max_models = max_models
+        self.nlp_models = OrderedDict()
+        self.missing_models = set()
+        self.models_lock = threading.Lock()
+    
+    def load_spacy_models(self):
+        """Eagerly load models (up to max_models), e.g. before forking workers"""
+        for lang in list(self.spacy_models)[:self.max_models]:
+            self.get_spacy_model(lang)
+    
+    def get_spacy_model(self, language):
+        if language not in self.spacy_models or language in self.missing_models:
+            return None
+        
+        with self.models_lock:
+            if language in self.nlp_models:
+                self.nlp_models.move_to_end(language)
+                return self.nlp_models[language]
+            
+            model_name = self.spacy_models[language]
+            try:
+                nlp = spacy.load(model_name, exclude=self.EXCLUDED_COMPONENTS)
+            except OSError:
+                print(f"Warning: {model_name} not found. Install with: python -m spacy download {model_name}")
+                self.missing_models.add(language)
+                return None
+            
+            self.nlp_models[language] = nlp
+            while len(self.nlp_models) > self.max_models:
+                self.nlp_models.popitem(last=False)
+            return nlp
+    
+    @property
+    def stop_words(self):
+        if self._stop_words is None:
+            self._stop_words = frozenset(stopwords.words('english'))
+        return self._stop_words
+    
+    def clean_text(self, text):
+        # Remove special characters and digits
+        text = re.sub(r'[^a-zA-Z\s]', '', text)
+        # Convert to lowercase
+        text = text.lower()
+        # Remove extra whitespace
+        text = re.sub(r'\s+', ' ', text).strip()
+        return text
+    
+    def tokenize_and_lemmatize(self, text, language='en'):
+        # Clean text
+        cleaned_text = self.clean_text(text)
+        
+        # Tokenize
+        tokens = word_tokenize(cleaned_text)
+        
+        # Remove stopwords
+        stop_words = self.stop_words
+        tokens = [token for token in tokens if token not in stop_words]
+        
+        # Lemmatize
+        lemmatized_tokens = [self.lemmatize(token) for token in tokens]
+        
+        return lemmatized_tokens
+    
+    def extract_entities(self, text, language='en'):
+        nlp = self.get_spacy_model(language)
+        if nlp is not None:
+            doc = nlp(text)
+            entities = [(ent.text, ent.label_) for ent in doc.ents]
+            return entities
+        return []
+    
+    def get_sentiment(self, text, language='en'):
+        # Simple sentiment analysis based on keywords
+        return self.score_sentiment(text.lower().split())
+    
+    def score_sentiment(self, words):
+        positive_count = sum(1 for word in words if word in POSITIVE_WORDS)
+        negative_count = sum(1 for word in words if word in NEGATIVE_WORDS)
+        
+        if positive_count > negative_count:
+            return 'positive'
+        elif negative_count > positive_count:
+            return 'negative'
+        else:
+            return 'neutral'
+    
+    def analyze(self, text, language='en', timings=None):
+        """Lemmas, entities and sentiment from a single tokenization of the text.
+        
+        Gives the same results as calling tokenize_and_lemmatize, extract_entities
+        and get_sentiment separately. If timings is a dict, the seconds spent on
+        the lemmatize, ner and sentiment steps are added to it.
+        """
+        start = time.perf_counter() if timings is not None else 0.0
+        stop_words = self.stop_words
+        lemmas = []
+        lowered_words = []
+        for word in text.split():
+            lowered_words.append(word.lower())
+            
+            # Letters only, as clean_text does, then word_tokenize's contraction splits
+            token = NON_LETTERS.sub('', word).lower()
+            if not token:
+                continue
+            for part in CONTRACTIONS.get(token, (token,)):
+                if part not in stop_words:
+                    lemmas.append(self.lemmatize(part))
+        
+        if timings is None:
+            return {
+                'lemmas': lemmas,
+                'entities': self.extract_entities(text, language),
+                'sentiment': self.score_sentiment(lowered_words)
+            }
+        
+        lemmatized = time.perf_counter()
+        entities = self.extract_entities(text, language)
+        recognized = time.perf_counter()
+        sentiment = self.score_sentiment(lowered_words)
+        for stage, seconds in (('lemmatize', lemmatized - start), ('ner', recognized - lemmatized),
+                               ('sentiment', time.perf_counter() - recognized)):
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        return {'lemmas': lemmas, 'entities': entities, 'sentiment': sentiment}
\ No newline at end of file
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+import re
+import threading
+import time
+
+PUNCTUATION = re.compile(r'[^\w\s]')
+WHITESPACE = re.compile(r'\s+')
+
+class ResponseCache:
+    """Bounded TTL cache of message analyses keyed on normalized text and language"""
+    
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Bumped by clear() so analyses computed against an older model are not stored
+        self.generation = 0
+    
+    def normalize(self, text):
+        text = PUNCTUATION.sub('', text.lower())
+        return WHITESPACE.sub(' ', text).strip()
+    
+    def make_key(self, message, language=None):
+        return (self.normalize(message), language or 'auto')
+    
+    def get(self, message, language=None):
+        key = self.make_key(message, language)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, message, language, value, generation=None):
+        key = self.make_key(message, language)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+    
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
\ No newline at end of file
@@ -12,6 +12,7 @@ class ChatBot {
         
         this.isTyping = false;
         this.conversationHistory = [];
+        this.sessionId = null;
         
         this.init();
     }
@@ -80,7 +81,8 @@ class ChatBot {
         const selectedLanguage = this.languageSelect.value;
         const requestBody = {
             message: message,
-            language: selectedLanguage === 'auto' ? null : selectedLanguage
+            language: selectedLanguage === 'auto' ? null : selectedLanguage,
+            session_id: this.sessionId
         };
         
         const response = await fetch('/chat', {
@@ -91,7 +93,11 @@ class ChatBot {
             body: JSON.stringify(requestBody)
         });
         
-        return await response.json();
+        const data = await response.json();
+        if (data.session_id) {
+            this.sessionId = data.session_id;
+        }
+        return data;
     }
     
     addMessage(text, sender, type = 'normal') {
@@ -438,7 +444,14 @@ class ChatBotEnhanced extends ChatBot {
                 }
             });
             
-            const result = await response.json();
+            let result = await response.json();
+            
+            // Training runs in the background; poll the job until it is done
+            const statusUrl = result.status_url;
+            while (statusUrl && !result.error && result.status !== 'finished') {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                result = await (await fetch(statusUrl)).json();
+            }
             
             if (result.error) {
                 this.addMessage(`Training failed: ${result.error}`, 'bot', 'error');
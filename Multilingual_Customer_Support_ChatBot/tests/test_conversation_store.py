@@ -0,0 +1,77 @@
+"""SQLiteConversationStore's write-behind queue when the database fails, and reads of unflushed sessions"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_store import WRITE_ATTEMPTS, ConversationRecord, SQLiteConversationStore
+
+
+def record(message):
+    return ConversationRecord(message, 'reply', 'en', 'greeting', 0.9, 'neutral')
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A long interval keeps the writer thread out of the way; the tests flush themselves
+    store = SQLiteConversationStore(str(tmp_path / 'conversations.db'), flush_interval=3600)
+    yield store
+    store.close()
+
+
+def break_writes(store, monkeypatch):
+    def insert(rows):
+        raise sqlite3.OperationalError('database is locked')
+    monkeypatch.setattr(store, '_insert', insert)
+
+
+def messages(store, session_id):
+    history, total = store.get_history(session_id)
+    return [entry['user_message'] for entry in history], total
+
+
+def test_failed_batch_is_retried_in_order(store, monkeypatch):
+    store.append('a', record('one'))
+    break_writes(store, monkeypatch)
+    store.flush()
+    store.append('a', record('two'))
+    monkeypatch.undo()
+    store.flush()
+    store.sessions.clear()
+    assert messages(store, 'a') == (['one', 'two'], 2)
+    assert store.dropped == 0
+
+
+def test_batch_is_dropped_after_its_attempts(store, monkeypatch):
+    store.append('a', record('one'))
+    break_writes(store, monkeypatch)
+    for _ in range(WRITE_ATTEMPTS):
+        store.flush()
+    assert store.dropped == 1
+    assert not store.failed and store.pending.empty()
+
+
+def test_writer_thread_survives_a_failing_flush(store, monkeypatch):
+    def flush():
+        monkeypatch.undo()
+        raise RuntimeError('boom')
+    monkeypatch.setattr(store, 'flush', flush)
+    store.flush_interval = 0.01
+    store.stopped.wait(0.1)
+    assert store.writer.is_alive()
+
+
+def test_load_merges_queued_writes_without_flushing(store, monkeypatch):
+    store.append('a', record('one'))
+    store.flush()
+    store.append('a', record('two'))
+    store.clear('b')
+    store.append('b', record('three'))
+    store.sessions.clear()
+    monkeypatch.setattr(store, 'flush', lambda: pytest.fail('flushed on the request thread'))
+    assert messages(store, 'a') == (['one', 'two'], 2)
+    assert messages(store, 'b') == (['three'], 1)
+    assert store.pending.qsize() == 3
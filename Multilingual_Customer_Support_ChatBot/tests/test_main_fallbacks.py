@@ -0,0 +1,53 @@
+"""The Flask app with the fallback components main.py defines when the app package cannot be imported"""
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def main(monkeypatch):
+    # A None entry makes every `from app... import` raise ImportError
+    monkeypatch.setitem(sys.modules, 'app', None)
+    monkeypatch.delitem(sys.modules, 'main', raising=False)
+    module = importlib.import_module('main')
+    assert module.ResponseCache.__module__ == 'main'
+    yield module
+    sys.modules.pop('main', None)
+
+
+def test_chat_with_fallback_components(main):
+    response = main.app.test_client().post('/chat', json={'message': 'hello', 'language': 'en'})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['response']
+
+
+def test_chat_batch_with_fallback_components(main):
+    response = main.app.test_client().post('/chat/batch', json={'messages': ['hello', 'thanks', ''], 'language': 'en'})
+    assert response.status_code == 200, response.get_json()
+    results = response.get_json()['results']
+    assert [('error' in result) for result in results] == [False, False, True]
+
+
+def test_fallback_response_cache_takes_a_generation(main):
+    cache = main.ResponseCache()
+    assert cache.generation == 0
+    cache.put('hello', 'en', {}, generation=cache.generation)
+    assert cache.get('hello', 'en') is None
+
+
+def test_unopenable_stores_fall_back_to_memory(main, monkeypatch, tmp_path):
+    import conversation_store
+    import translator
+    missing = str(tmp_path / 'missing' / 'data.db')
+    monkeypatch.setattr(main, 'SQLiteConversationStore', conversation_store.SQLiteConversationStore)
+    monkeypatch.setattr(main, 'InMemoryConversationStore', conversation_store.InMemoryConversationStore)
+    monkeypatch.setattr(main, 'TranslationCache', translator.TranslationCache)
+    monkeypatch.setattr(main.Config, 'CONVERSATION_STORE', 'sqlite')
+    monkeypatch.setattr(main.Config, 'CONVERSATION_DB_PATH', missing)
+    monkeypatch.setattr(main.Config, 'TRANSLATION_CACHE_PATH', missing)
+    assert type(main.open_conversation_store()) is conversation_store.InMemoryConversationStore
+    assert main.open_translation_cache().db is None
@@ -1,27 +1,318 @@
-from googletrans import Translator
-import time
-
-class TextTranslator:
-    def __init__(self):
-        self.translator = Translator()
-    
-    def translate_text(self, text, target_language='en', source_language='auto'):
-        try:
-            # Add small delay to avoid rate limiting
-            time.sleep(0.1)
-            
-            result = self.translator.translate(
-                text, 
-                dest=target_language, 
-                src=source_language
-            )
-            return result.text
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return text  # Return original text if translation fails
-    
-    def translate_to_english(self, text, source_language):
-        return self.translate_text(text, target_language='en', source_language=source_language)
-    
-    def translate_from_english(self, text, target_language):
-        return self.translate_text(text, target_language=target_language, source_language='en')
\ No newline at end of file
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import sqlite3
+import threading
+import time
+
+class TranslationCache:
+    """Two-tier translation cache: a bounded in-memory LRU backed by a SQLite file"""
+    
+    def __init__(self, max_size=2048, db_path=None):
+        self.max_size = max_size
+        self.db_path = db_path
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        # SQLite calls take their own lock so a slow disk lookup never holds up the memory tier
+        self.db_lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'miss_seconds': 0.0}
+        self.db = None
+        self._connect()
+    
+    def _connect(self):
+        if self.db_path:
+            self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                'text TEXT NOT NULL, src TEXT NOT NULL, dest TEXT NOT NULL, translation TEXT NOT NULL, '
+                'PRIMARY KEY (text, src, dest))'
+            )
+            self.db.commit()
+    
+    def after_fork(self):
+        """A forked child must not share the parent's SQLite connection"""
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self._connect()
+    
+    def get(self, text, src, dest):
+        translation = self.get_memory(text, src, dest)
+        if translation is None:
+            translation = self.get_disk(text, src, dest)
+        return translation
+    
+    def get_memory(self, text, src, dest):
+        """Look up the in-memory tier only; a miss is counted by get_disk"""
+        key = (text, src, dest)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self.memory[key]
+        return None
+    
+    def get_disk(self, text, src, dest):
+        """Look up the SQLite tier (blocking file I/O) and promote a hit to memory"""
+        key = (text, src, dest)
+        row = None
+        if self.db is not None:
+            with self.db_lock:
+                row = self.db.execute(
+                    'SELECT translation FROM translations WHERE text = ? AND src = ? AND dest = ?', key
+                ).fetchone()
+        with self.lock:
+            if row is not None:
+                self.stats['disk_hits'] += 1
+                self._remember(key, row[0])
+                return row[0]
+            
+            self.stats['misses'] += 1
+            return None
+    
+    def put(self, text, src, dest, translation, elapsed=0.0):
+        self.put_memory(text, src, dest, translation, elapsed)
+        self.put_disk(text, src, dest, translation)
+    
+    def put_memory(self, text, src, dest, translation, elapsed=0.0):
+        with self.lock:
+            self.stats['miss_seconds'] += elapsed
+            self._remember((text, src, dest), translation)
+    
+    def put_disk(self, text, src, dest, translation):
+        """Write to the SQLite tier (blocking file I/O); a no-op without one"""
+        if self.db is not None:
+            with self.db_lock:
+                self.db.execute(
+                    'INSERT OR REPLACE INTO translations (text, src, dest, translation) VALUES (?, ?, ?, ?)',
+                    (text, src, dest, translation)
+                )
+                self.db.commit()
+    
+    def _remember(self, key, translation):
+        self.memory[key] = translation
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+    
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['memory_size'] = len(self.memory)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = hits / lookups if lookups else 0.0
+        # Each hit saves roughly what an average miss costs
+        average_miss = stats['miss_seconds'] / stats['misses'] if stats['misses'] else 0.0
+        stats['estimated_seconds_saved'] = hits * average_miss
+        return stats
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by all threads and coroutines of a translator"""
+    
+    def __init__(self, rate=10.0, capacity=10):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def after_fork(self):
+        self.lock = threading.Lock()
+    
+    def _reserve(self):
+        """Take a token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+    
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class TranslationBackend:
+    """Interface for translation providers"""
+    
+    def translate(self, text, dest, src):
+        raise NotImplementedError
+    
+    async def atranslate(self, text, dest, src):
+        # Blocking backends run on the default executor so the event loop stays free
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.translate, text, dest, src)
+    
+    def after_fork(self):
+        pass
+
+class GoogleTranslateBackend(TranslationBackend):
+    """googletrans backend; every worker thread keeps its own client so connections are reused"""
+    
+    def __init__(self, max_workers=16):
+        from googletrans import Translator
+        self.translator_class = Translator
+        self.max_workers = max_workers
+        self.after_fork()
+    
+    def after_fork(self):
+        # Threads (and the clients they hold) do not survive a fork
+        self.local = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='translate')
+    
+    def _client(self):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.translator_class()
+        return client
+    
+    def translate(self, text, dest, src):
+        return self._client().translate(text, dest=dest, src=src).text
+    
+    async def atranslate(self, text, dest, src):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.translate, text, dest, src)
+
+class LocalTranslationBackend(TranslationBackend):
+    """Offline stand-in: dictionary lookup (identity by default) with a simulated latency"""
+    
+    def __init__(self, latency=0.0, dictionary=None):
+        self.latency = latency
+        self.dictionary = dictionary or {}
+    
+    def _lookup(self, text, dest, src):
+        return self.dictionary.get((text, src, dest), text)
+    
+    def translate(self, text, dest, src):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._lookup(text, dest, src)
+    
+    async def atranslate(self, text, dest, src):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._lookup(text, dest, src)
+
+class TextTranslator:
+    def __init__(self, cache=None, backend=None, rate_limiter=None):
+        self.backend = backend if backend is not None else GoogleTranslateBackend()
+        self.cache = cache
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TokenBucket()
+    
+    def after_fork(self):
+        if self.cache is not None:
+            self.cache.after_fork()
+        self.backend.after_fork()
+        self.rate_limiter.after_fork()
+    
+    def translate_text(self, text, target_language='en', source_language='auto'):
+        if self.cache is not None:
+            try:
+                cached = self.cache.get(text, source_language, target_language)
+            except Exception as e:
+                # A cache that cannot be read is a miss, not a failed translation
+                print(f"Translation cache error: {e}")
+                cached = None
+            if cached is not None:
+                return cached
+        
+        try:
+            start = time.perf_counter()
+            
+            # Wait for a token to avoid rate limiting
+            self.rate_limiter.acquire()
+            
+            translation = self.backend.translate(text, target_language, source_language)
+        except Exception as e:
+            print(f"Translation error: {e}")
+            return text  # Return original text if translation fails
+        
+        # Only successful translations are cached, and failing to cache one does not lose it
+        if self.cache is not None:
+            try:
+                self.cache.put(text, source_language, target_language, translation,
+                               elapsed=time.perf_counter() - start)
+            except Exception as e:
+                print(f"Translation cache error: {e}")
+        return translation
+    
+    async def _cache_disk(self, method, *args):
+        """Run a SQLite-tier cache call on the default executor so the event loop stays free"""
+        if self.cache.db is None:
+            return method(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, method, *args)
+    
+    async def atranslate_text(self, text, target_language='en', source_language='auto'):
+        if self.cache is not None:
+            cached = self.cache.get_memory(text, source_language, target_language)
+            if cached is None:
+                try:
+                    cached = await self._cache_disk(self.cache.get_disk, text, source_language, target_language)
+                except Exception as e:
+                    # A cache that cannot be read is a miss, not a failed message in the batch
+                    print(f"Translation cache error: {e}")
+            if cached is not None:
+                return cached
+        
+        try:
+            start = time.perf_counter()
+            await self.rate_limiter.acquire_async()
+            translation = await self.backend.atranslate(text, target_language, source_language)
+        except Exception as e:
+            print(f"Translation error: {e}")
+            return text
+        
+        if self.cache is not None:
+            self.cache.put_memory(text, source_language, target_language, translation,
+                                  elapsed=time.perf_counter() - start)
+            try:
+                await self._cache_disk(self.cache.put_disk, text, source_language, target_language, translation)
+            except Exception as e:
+                print(f"Translation cache error: {e}")
+        return translation
+    
+    async def translate_many_async(self, requests):
+        """Translate (text, target_language, source_language) triples concurrently"""
+        return await asyncio.gather(*(
+            self.atranslate_text(text, target_language, source_language)
+            for text, target_language, source_language in requests
+        ))
+    
+    def translate_many(self, requests):
+        """Blocking wrapper around translate_many_async for synchronous callers"""
+        requests = list(requests)
+        if not requests:
+            return []
+        return asyncio.run(self.translate_many_async(requests))
+    
+    def translate_to_english(self, text, source_language):
+        return self.translate_text(text, target_language='en', source_language=source_language)
+    
+    def translate_from_english(self, text, target_language):
+        return self.translate_text(text, target_language=target_language, source_language='en')
+    
+    async def atranslate_to_english(self, text, source_language):
+        return await self.atranslate_text(text, target_language='en', source_language=source_language)
+    
+    async def atranslate_from_english(self, text, target_language):
+        return await self.atranslate_text(text, target_language=target_language, source_language='en')
+    
+    def prewarm(self, texts, languages):
+        """Translate every English text into every language so replies are served from cache"""
+        self.translate_many(
+            (text, language, 'en') for language in languages if language != 'en' for text in texts
+        )
+    
+    def cache_stats(self):
+        if self.cache is None:
+            return None
+        return self.cache.get_stats()
\ No newline at end of file
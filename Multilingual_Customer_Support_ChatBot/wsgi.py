@@ -0,0 +1,12 @@
+"""Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (see gunicorn.conf.py) this module is imported once in the
+gunicorn master: models are loaded here and then shared copy-on-write by every
+forked worker. Nothing is downloaded at import; install the spaCy models and
+NLTK data when building the image.
+"""
+from app.main import app, warm_up
+
+warm_up()
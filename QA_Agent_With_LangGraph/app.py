@@ -1,368 +1,442 @@
-import streamlit as st
-import pandas as pd
-import os
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
-from langchain_core.tools import tool
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, MessagesState
-from langgraph.prebuilt import ToolNode
-import json
-
-# Configuration
-st.set_page_config(page_title="Hotel Query Agent", page_icon="🏨", layout="wide")
-
-@dataclass
-class HotelQueryParams:
-    """Parameters for hotel queries"""
-    city: Optional[str] = None
-    country: Optional[str] = None
-    min_star_rating: float = 0.0
-    min_cleanliness: float = 0.0
-    min_comfort: float = 0.0
-    min_facilities: float = 0.0
-    sort_by: str = "star_rating"
-    limit: int = 5
-
-class HotelDataManager:
-    """Manages hotel dataset loading and querying"""
-    
-    def __init__(self):
-        self.df = None
-        self.required_columns = [
-            'hotel_id', 'hotel_name', 'city', 'country', 
-            'lat', 'lon', 'star_rating', 'cleanliness_base', 
-            'comfort_base', 'facilities_base'
-        ]
-    
-    def load_data(self, file_path: str = "hotels.csv") -> bool:
-        """Load and normalize the hotel dataset"""
-        try:
-            self.df = pd.read_csv(file_path)
-            
-            # Check for required columns
-            missing_cols = [col for col in self.required_columns if col not in self.df.columns]
-            if missing_cols:
-                st.error(f"Missing required columns: {missing_cols}")
-                return False
-            
-            # Normalize data
-            self.df['city'] = self.df['city'].str.strip().str.lower()
-            self.df['country'] = self.df['country'].str.strip().str.lower()
-            
-            # Ensure numeric columns are properly typed
-            numeric_cols = ['star_rating', 'cleanliness_base', 'comfort_base', 'facilities_base']
-            for col in numeric_cols:
-                self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
-            
-            # Remove rows with missing critical data
-            self.df = self.df.dropna(subset=numeric_cols)
-            
-            return True
-            
-        except Exception as e:
-            st.error(f"Error loading dataset: {e}")
-            return False
-    
-    def query_hotels(self, params: HotelQueryParams) -> Dict[str, Any]:
-        """Query hotels based on parameters"""
-        if self.df is None:
-            return {"error": "Dataset not loaded"}
-        
-        # Start with all data
-        filtered_df = self.df.copy()
-        
-        # Apply filters
-        if params.city:
-            city_filter = params.city.strip().lower()
-            filtered_df = filtered_df[filtered_df['city'].str.contains(city_filter, na=False)]
-        
-        if params.country:
-            country_filter = params.country.strip().lower()
-            filtered_df = filtered_df[filtered_df['country'].str.contains(country_filter, na=False)]
-        
-        # Apply minimum thresholds
-        filtered_df = filtered_df[
-            (filtered_df['star_rating'] >= params.min_star_rating) &
-            (filtered_df['cleanliness_base'] >= params.min_cleanliness) &
-            (filtered_df['comfort_base'] >= params.min_comfort) &
-            (filtered_df['facilities_base'] >= params.min_facilities)
-        ]
-        
-        if filtered_df.empty:
-            return {
-                "results": [],
-                "total_found": 0,
-                "message": "No hotels found matching your criteria."
-            }
-        
-        # Sort results
-        valid_sort_columns = ['star_rating', 'cleanliness_base', 'comfort_base', 'facilities_base']
-        if params.sort_by in valid_sort_columns:
-            filtered_df = filtered_df.sort_values(params.sort_by, ascending=False)
-        
-        # Limit results (clamp between 1 and 10)
-        limit = max(1, min(10, params.limit))
-        result_df = filtered_df.head(limit)
-        
-        # Format results
-        results = []
-        for _, row in result_df.iterrows():
-            results.append({
-                "hotel_name": row['hotel_name'],
-                "city": row['city'].title(),
-                "country": row['country'].title(),
-                "star_rating": float(row['star_rating']),
-                "cleanliness": float(row['cleanliness_base']),
-                "comfort": float(row['comfort_base']),
-                "facilities": float(row['facilities_base'])
-            })
-        
-        return {
-            "results": results,
-            "total_found": len(filtered_df),
-            "message": f"Found {len(filtered_df)} hotel(s), showing top {len(results)}"
-        }
-
-# Initialize hotel data manager
-@st.cache_resource
-def get_hotel_manager():
-    manager = HotelDataManager()
-    if manager.load_data():
-        return manager
-    return None
-
-# Define the tool
-hotel_manager = get_hotel_manager()
-
-@tool
-def query_hotels(
-    city: Optional[str] = None,
-    country: Optional[str] = None,
-    min_star_rating: float = 0.0,
-    min_cleanliness: float = 0.0,
-    min_comfort: float = 0.0,
-    min_facilities: float = 0.0,
-    sort_by: str = "star_rating",
-    limit: int = 5
-) -> str:
-    """
-    Query hotels from the dataset based on specified criteria.
-    
-    Args:
-        city: City to filter by (case-insensitive)
-        country: Country to filter by (case-insensitive)
-        min_star_rating: Minimum star rating (0-5)
-        min_cleanliness: Minimum cleanliness score
-        min_comfort: Minimum comfort score
-        min_facilities: Minimum facilities score
-        sort_by: Column to sort by (star_rating, cleanliness_base, comfort_base, facilities_base)
-        limit: Maximum number of results to return (1-10)
-    
-    Returns:
-        JSON string with query results
-    """
-    if hotel_manager is None:
-        return json.dumps({"error": "Hotel dataset not available"})
-    
-    params = HotelQueryParams(
-        city=city,
-        country=country,
-        min_star_rating=min_star_rating,
-        min_cleanliness=min_cleanliness,
-        min_comfort=min_comfort,
-        min_facilities=min_facilities,
-        sort_by=sort_by,
-        limit=limit
-    )
-    
-    result = hotel_manager.query_hotels(params)
-    return json.dumps(result)
-
-# LangGraph Agent Setup
-def create_agent():
-    """Create the LangGraph agent"""
-    
-    # Check for API key
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("Please set the OPENAI_API_KEY environment variable")
-        return None
-    
-    # Initialize LLM
-    llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
-    
-    # Bind tools to LLM
-    llm_with_tools = llm.bind_tools([query_hotels])
-    
-    # System prompt
-    system_prompt = """You are a helpful hotel search assistant. When users ask about hotels, you should:
-
-1. Use the query_hotels tool to search the hotel database
-2. Always provide results in a clear, tabular text format
-3. Include hotel name, location, star rating, and key scores (cleanliness, comfort, facilities)
-4. If no results are found, suggest alternative searches (e.g., broader criteria, different cities)
-5. Be conversational and helpful in your responses
-
-The tool accepts these parameters:
-- city, country: for location filtering (case-insensitive)
-- min_star_rating, min_cleanliness, min_comfort, min_facilities: for quality filtering
-- sort_by: choose from 'star_rating', 'cleanliness_base', 'comfort_base', 'facilities_base'
-- limit: number of results (1-10)
-
-Always use the tool when users ask about hotels, even for general questions about hotel data."""
-    
-    def agent_node(state: MessagesState):
-        messages = state["messages"]
-        # Add system message if not present
-        if not any(isinstance(msg, SystemMessage) for msg in messages):
-            messages = [SystemMessage(content=system_prompt)] + messages
-        
-        response = llm_with_tools.invoke(messages)
-        return {"messages": [response]}
-    
-    def format_response_node(state: MessagesState):
-        """Format the final response with hotel data"""
-        messages = state["messages"]
-        last_message = messages[-1]
-        
-        # If the last message has tool calls, don't modify it
-        if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-            return {"messages": []}
-        
-        # Check if we have tool responses to format
-        tool_results = []
-        for msg in reversed(messages):
-            if hasattr(msg, 'content') and isinstance(msg.content, str):
-                try:
-                    # Check if this looks like a tool result
-                    if msg.content.startswith('{"results":') or msg.content.startswith('{"error":'):
-                        data = json.loads(msg.content)
-                        tool_results.append(data)
-                        break
-                except:
-                    continue
-        
-        if tool_results and 'results' in tool_results[0]:
-            data = tool_results[0]
-            if data['results']:
-                # Format as table
-                formatted_response = f"{data['message']}\n\n"
-                formatted_response += "📍 **Hotel Results:**\n\n"
-                formatted_response += "| Hotel Name | Location | ⭐ Rating | 🧽 Clean | 🛏️ Comfort | 🏢 Facilities |\n"
-                formatted_response += "|------------|----------|-----------|----------|------------|---------------|\n"
-                
-                for hotel in data['results']:
-                    formatted_response += f"| {hotel['hotel_name']} | {hotel['city']}, {hotel['country']} | {hotel['star_rating']:.1f} | {hotel['cleanliness']:.1f} | {hotel['comfort']:.1f} | {hotel['facilities']:.1f} |\n"
-                
-                return {"messages": [AIMessage(content=formatted_response)]}
-            else:
-                no_results_msg = f"{data['message']}\n\n💡 **Suggestions:**\n- Try searching in a different city\n- Lower your rating requirements\n- Remove some filters"
-                return {"messages": [AIMessage(content=no_results_msg)]}
-        
-        return {"messages": []}
-    
-    # Create the graph
-    workflow = StateGraph(MessagesState)
-    
-    # Add nodes
-    workflow.add_node("agent", agent_node)
-    workflow.add_node("tools", ToolNode([query_hotels]))
-    workflow.add_node("format_response", format_response_node)
-    
-    # Add edges
-    workflow.add_edge("agent", "tools")
-    workflow.add_edge("tools", "format_response")
-    workflow.add_edge("format_response", "agent")
-    
-    # Set entry point
-    workflow.set_entry_point("agent")
-    
-    return workflow.compile()
-
-# Streamlit UI
-def main():
-    st.title("🏨 Hotel Query Agent")
-    st.markdown("Ask me about hotels! I can help you find hotels based on location, ratings, and amenities.")
-    
-    # Check if dataset is loaded
-    if hotel_manager is None:
-        st.error("❌ Could not load hotels.csv dataset. Please ensure the file exists in the current directory.")
-        st.info("The dataset should contain columns: hotel_id, hotel_name, city, country, lat, lon, star_rating, cleanliness_base, comfort_base, facilities_base")
-        return
-    
-    # Check for API key
-    if not os.getenv("OPENAI_API_KEY"):
-        st.error("❌ OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        st.info("You can set it by running: `export OPENAI_API_KEY=your_api_key_here`")
-        return
-    
-    st.success("✅ Dataset loaded successfully!")
-    
-    # Create agent
-    agent = create_agent()
-    if agent is None:
-        return
-    
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-    
-    # Display chat history
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-    
-    # Chat input
-    if prompt := st.chat_input("Ask about hotels (e.g., 'Top 5 hotels in Paris by cleanliness')"):
-        # Add user message
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # Get agent response
-        with st.chat_message("assistant"):
-            with st.spinner("Searching hotels..."):
-                try:
-                    # Invoke agent
-                    response = agent.invoke({
-                        "messages": [HumanMessage(content=prompt)]
-                    })
-                    
-                    # Get the final response
-                    final_message = response["messages"][-1]
-                    assistant_response = final_message.content
-                    
-                    st.markdown(assistant_response)
-                    st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-                    
-                except Exception as e:
-                    error_msg = f"Sorry, I encountered an error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
-    
-    # Sidebar with example queries
-    with st.sidebar:
-        st.header("💡 Example Queries")
-        example_queries = [
-            "Top 5 hotels in Paris by cleanliness",
-            "Hotels in Japan with at least 4 stars",
-            "Best comfort hotels in New York",
-            "Show me 3 hotels in London sorted by facilities",
-            "Hotels with cleanliness above 8.5 in Italy"
-        ]
-        
-        for query in example_queries:
-            if st.button(query, key=f"example_{query}"):
-                st.session_state.messages.append({"role": "user", "content": query})
-                st.rerun()
-        
-        st.header("ℹ️ Dataset Info")
-        if hotel_manager and hotel_manager.df is not None:
-            st.write(f"📊 Total hotels: {len(hotel_manager.df)}")
-            st.write(f"🌍 Countries: {hotel_manager.df['country'].nunique()}")
-            st.write(f"🏙️ Cities: {hotel_manager.df['city'].nunique()}")
-
-if __name__ == "__main__":
+import streamlit as st
+import os
+from typing import Dict, Iterator, List, Optional, Any
+from langchain_core.tools import tool
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage
+from langchain_openai import ChatOpenAI
+from langgraph.graph import END, StateGraph, MessagesState
+from langgraph.prebuilt import ToolNode
+import json
+
+from fake_llm import FakeHotelLLM
+from hotel_index import HotelIndex, HotelQueryParams, NearbyQueryParams
+from hotel_store import MissingColumnsError, REQUIRED_COLUMNS, load_table
+from query_cache import QueryCache, normalize_text
+from query_parser import parse_hotel_query
+
+# Configuration
+st.set_page_config(page_title="Hotel Query Agent", page_icon="🏨", layout="wide")
+
+# Tool results and answers are cached per (normalized) query; 0 disables the cache
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "300"))
+# "openai", or "fake" to run offline with FakeHotelLLM
+AGENT_LLM = os.getenv("AGENT_LLM", "openai")
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.8"))
+
+class HotelDataManager:
+    """Manages hotel dataset loading and querying"""
+    
+    def __init__(self):
+        self.index = None
+        self.required_columns = REQUIRED_COLUMNS
+        self.cache = QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+    
+    def load_data(self, file_path: str = "hotels.csv") -> bool:
+        """Load the hotel dataset from its columnar snapshot, rebuilding it when the CSV changes"""
+        try:
+            self.index = HotelIndex(load_table(file_path))
+            self.cache.clear()
+            return True
+        
+        except MissingColumnsError as e:
+            st.error(f"Missing required columns: {e.columns}")
+            return False
+        
+        except Exception as e:
+            st.error(f"Error loading dataset: {e}")
+            return False
+    
+    def query_hotels(self, params: HotelQueryParams) -> Dict[str, Any]:
+        """Query hotels based on parameters"""
+        if self.index is None:
+            return {"error": "Dataset not loaded"}
+        
+        return self._cached(("query",) + params.cache_key(), self.index.query, params)
+    
+    def query_nearby(self, params: NearbyQueryParams) -> Dict[str, Any]:
+        """Query hotels around a point"""
+        if self.index is None:
+            return {"error": "Dataset not loaded"}
+        
+        return self._cached(("nearby",) + params.cache_key(), self.index.query_nearby, params)
+    
+    def _cached(self, key, query, params):
+        # Read the generation first so a result from before a reload is never stored
+        generation = self.cache.generation
+        result = self.cache.get(key)
+        if result is None:
+            result = query(params)
+            self.cache.put(key, result, generation)
+        return result
+
+# Initialize hotel data manager
+@st.cache_resource
+def get_hotel_manager():
+    manager = HotelDataManager()
+    if manager.load_data():
+        return manager
+    return None
+
+# Define the tool
+hotel_manager = get_hotel_manager()
+
+@tool
+def query_hotels(
+    city: Optional[str] = None,
+    country: Optional[str] = None,
+    min_star_rating: float = 0.0,
+    min_cleanliness: float = 0.0,
+    min_comfort: float = 0.0,
+    min_facilities: float = 0.0,
+    sort_by: str = "star_rating",
+    limit: int = 5,
+    weights: Optional[Dict[str, float]] = None,
+    pareto: bool = False
+) -> str:
+    """
+    Query hotels from the dataset based on specified criteria.
+    
+    Args:
+        city: City to filter by (case-insensitive)
+        country: Country to filter by (case-insensitive)
+        min_star_rating: Minimum star rating (0-5)
+        min_cleanliness: Minimum cleanliness score
+        min_comfort: Minimum comfort score
+        min_facilities: Minimum facilities score
+        sort_by: Column to sort by (star_rating, cleanliness_base, comfort_base, facilities_base,
+            location_base, staff_base, value_for_money_base)
+        limit: Maximum number of results to return (1-10)
+        weights: Rank by a weighted average of several scores instead of sort_by, e.g.
+            {"cleanliness": 2, "value_for_money": 1}; scores are star_rating, cleanliness,
+            comfort, facilities, location, staff, value_for_money
+        pareto: With weights, only return hotels no other match beats on every weighted score
+            (for "best on cleanliness and value")
+    
+    Returns:
+        JSON string with query results
+    """
+    if hotel_manager is None:
+        return json.dumps({"error": "Hotel dataset not available"})
+    
+    params = HotelQueryParams(
+        city=city,
+        country=country,
+        min_star_rating=min_star_rating,
+        min_cleanliness=min_cleanliness,
+        min_comfort=min_comfort,
+        min_facilities=min_facilities,
+        sort_by=sort_by,
+        limit=limit,
+        weights=weights,
+        pareto=pareto
+    )
+    
+    result = hotel_manager.query_hotels(params)
+    return json.dumps(result)
+
+@tool
+def find_hotels_near(
+    lat: float,
+    lon: float,
+    radius_km: Optional[float] = None,
+    min_star_rating: float = 0.0,
+    min_cleanliness: float = 0.0,
+    min_comfort: float = 0.0,
+    min_facilities: float = 0.0,
+    limit: int = 5
+) -> str:
+    """
+    Find hotels near a point, closest first.
+    
+    Args:
+        lat: Latitude of the point (-90 to 90)
+        lon: Longitude of the point (-180 to 180)
+        radius_km: Only return hotels within this many km; omit to get the nearest hotels
+        min_star_rating: Minimum star rating (0-5)
+        min_cleanliness: Minimum cleanliness score
+        min_comfort: Minimum comfort score
+        min_facilities: Minimum facilities score
+        limit: Maximum number of results to return (1-10)
+    
+    Returns:
+        JSON string with query results, each with its distance_km
+    """
+    if hotel_manager is None:
+        return json.dumps({"error": "Hotel dataset not available"})
+    
+    params = NearbyQueryParams(
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        min_star_rating=min_star_rating,
+        min_cleanliness=min_cleanliness,
+        min_comfort=min_comfort,
+        min_facilities=min_facilities,
+        limit=limit
+    )
+    
+    result = hotel_manager.query_nearby(params)
+    return json.dumps(result)
+
+TOOLS = [query_hotels, find_hotels_near]
+
+def format_results(data: Dict[str, Any]) -> Optional[str]:
+    """Markdown table of a query result, or None when it is an error"""
+    if 'results' not in data:
+        return None
+    
+    if not data['results']:
+        return f"{data['message']}\n\n💡 **Suggestions:**\n- Try searching in a different city\n- Lower your rating requirements\n- Remove some filters"
+    
+    # Format as table
+    formatted_response = f"{data['message']}\n\n"
+    formatted_response += "📍 **Hotel Results:**\n\n"
+    nearby = 'distance_km' in data['results'][0]
+    scored = 'score' in data['results'][0]
+    formatted_response += "| Hotel Name | Location | ⭐ Rating | 🧽 Clean | 🛏️ Comfort | 🏢 Facilities |" + (" 📏 Distance |" if nearby else "") + (" 🎯 Score |" if scored else "") + "\n"
+    formatted_response += "|------------|----------|-----------|----------|------------|---------------|" + ("-------------|" if nearby else "") + ("----------|" if scored else "") + "\n"
+    
+    for hotel in data['results']:
+        formatted_response += f"| {hotel['hotel_name']} | {hotel['city']}, {hotel['country']} | {hotel['star_rating']:.1f} | {hotel['cleanliness']:.1f} | {hotel['comfort']:.1f} | {hotel['facilities']:.1f} |"
+        formatted_response += f" {hotel['distance_km']:.1f} km |" if nearby else ""
+        formatted_response += f" {hotel['score']:.2f} |" if scored else ""
+        formatted_response += "\n"
+    
+    return formatted_response
+
+# LangGraph Agent Setup
+def create_agent():
+    """Create the LangGraph agent"""
+    
+    if AGENT_LLM == "fake":
+        llm = FakeHotelLLM(hotel_manager.index, latency=FAKE_LLM_LATENCY)
+    else:
+        # Check for API key
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            st.error("Please set the OPENAI_API_KEY environment variable")
+            return None
+        
+        # Initialize LLM
+        llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+    
+    return build_graph(llm)
+
+def build_graph(llm):
+    """Compile the agent graph around a chat model.
+    
+    agent -> tools -> format_response -> END when the LLM calls a tool and
+    the result formats as a table; agent -> END when it answers directly.
+    A tool error goes back to the agent so the LLM can explain it.
+    """
+    # Bind tools to LLM
+    llm_with_tools = llm.bind_tools(TOOLS)
+    
+    # System prompt
+    system_prompt = """You are a helpful hotel search assistant. When users ask about hotels, you should:
+
+1. Use the query_hotels tool to search the hotel database, or find_hotels_near for questions about hotels near a place
+2. Always provide results in a clear, tabular text format
+3. Include hotel name, location, star rating, and key scores (cleanliness, comfort, facilities)
+4. If no results are found, suggest alternative searches (e.g., broader criteria, different cities)
+5. Be conversational and helpful in your responses
+
+The tool accepts these parameters:
+- city, country: for location filtering (case-insensitive)
+- min_star_rating, min_cleanliness, min_comfort, min_facilities: for quality filtering
+- sort_by: choose from 'star_rating', 'cleanliness_base', 'comfort_base', 'facilities_base', 'location_base', 'staff_base', 'value_for_money_base'
+- limit: number of results (1-10)
+- weights: to rank on several scores at once, e.g. {"cleanliness": 2, "value_for_money": 1}
+- pareto: set with weights when the user wants hotels that are best on several scores ("best on cleanliness and value")
+
+find_hotels_near takes the latitude and longitude of the place the user names (use its well-known coordinates), an optional radius_km, the same quality filters and limit.
+
+Always use the tool when users ask about hotels, even for general questions about hotel data."""
+
+    def agent_node(state: MessagesState):
+        messages = state["messages"]
+        # Add system message if not present
+        if not any(isinstance(msg, SystemMessage) for msg in messages):
+            messages = [SystemMessage(content=system_prompt)] + messages
+        
+        response = llm_with_tools.invoke(messages)
+        return {"messages": [response]}
+    
+    def format_response_node(state: MessagesState):
+        """Format the final response with hotel data"""
+        messages = state["messages"]
+        last_message = messages[-1]
+        
+        # If the last message has tool calls, don't modify it
+        if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
+            return {"messages": []}
+        
+        # Check if we have tool responses to format
+        tool_results = []
+        for msg in reversed(messages):
+            if hasattr(msg, 'content') and isinstance(msg.content, str):
+                try:
+                    # Check if this looks like a tool result
+                    if msg.content.startswith('{"results":') or msg.content.startswith('{"error":'):
+                        data = json.loads(msg.content)
+                        tool_results.append(data)
+                        break
+                except:
+                    continue
+        
+        if tool_results:
+            formatted_response = format_results(tool_results[0])
+            if formatted_response is not None:
+                return {"messages": [AIMessage(content=formatted_response)]}
+        
+        return {"messages": []}
+    
+    # Create the graph
+    workflow = StateGraph(MessagesState)
+    
+    # Add nodes
+    workflow.add_node("agent", agent_node)
+    workflow.add_node("tools", ToolNode(TOOLS))
+    workflow.add_node("format_response", format_response_node)
+    
+    # Add edges
+    workflow.add_conditional_edges("agent", route_agent, ["tools", END])
+    workflow.add_edge("tools", "format_response")
+    workflow.add_conditional_edges("format_response", route_format_response, ["agent", END])
+    
+    # Set entry point
+    workflow.set_entry_point("agent")
+    
+    return workflow.compile()
+
+def route_agent(state: MessagesState) -> str:
+    """Run the tools the LLM asked for, or finish on a direct answer"""
+    last_message = state["messages"][-1]
+    return "tools" if getattr(last_message, "tool_calls", None) else END
+
+def route_format_response(state: MessagesState) -> str:
+    """Finish once the results are formatted; tool errors go back to the LLM"""
+    return END if isinstance(state["messages"][-1], AIMessage) else "agent"
+
+@st.cache_resource
+def get_agent():
+    """The compiled graph, built once per process instead of on every rerun"""
+    return create_agent()
+
+def stream_answer(agent, prompt: str) -> Iterator[str]:
+    """Yield the answer to a chat message as it grows, skipping the LLM when it can be.
+    
+    Plain hotel searches the rule parser fully understands go straight to
+    query_hotels. Anything else is streamed from the agent: LLM tokens as
+    they arrive, then the results table as soon as format_response builds
+    it. The final answer is cached by the normalized message until the
+    dataset reloads.
+    """
+    params = parse_hotel_query(prompt, hotel_manager.index)
+    if params is not None:
+        answer = format_results(hotel_manager.query_hotels(params))
+        if answer is not None:
+            yield answer
+            return
+    
+    key = ("answer", normalize_text(prompt))
+    generation = hotel_manager.cache.generation
+    answer = hotel_manager.cache.get(key)
+    if answer is not None:
+        yield answer
+        return
+    
+    answer = ""
+    for message, metadata in agent.stream({"messages": [HumanMessage(content=prompt)]}, stream_mode="messages"):
+        if metadata.get("langgraph_node") not in ("agent", "format_response") or not message.content:
+            continue
+        # Token chunks extend the answer; a whole message (the table) replaces it
+        answer = answer + message.content if isinstance(message, AIMessageChunk) else message.content
+        yield answer
+    if answer:
+        hotel_manager.cache.put(key, answer, generation)
+
+# Streamlit UI
+def main():
+    st.title("🏨 Hotel Query Agent")
+    st.markdown("Ask me about hotels! I can help you find hotels based on location, ratings, and amenities.")
+    
+    # Check if dataset is loaded
+    if hotel_manager is None:
+        st.error("❌ Could not load hotels.csv dataset. Please ensure the file exists in the current directory.")
+        st.info("The dataset should contain columns: hotel_id, hotel_name, city, country, lat, lon, star_rating, cleanliness_base, comfort_base, facilities_base")
+        return
+    
+    # Check for API key
+    if AGENT_LLM != "fake" and not os.getenv("OPENAI_API_KEY"):
+        st.error("❌ OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
+        st.info("You can set it by running: `export OPENAI_API_KEY=your_api_key_here`")
+        return
+    
+    st.success("✅ Dataset loaded successfully!")
+    
+    # Create agent
+    agent = get_agent()
+    if agent is None:
+        return
+    
+    # Initialize chat history
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+    
+    # Display chat history
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    
+    # Chat input; example queries from the sidebar arrive as a pending prompt
+    prompt = st.chat_input("Ask about hotels (e.g., 'Top 5 hotels in Paris by cleanliness')")
+    prompt = prompt or st.session_state.pop("pending_prompt", None)
+    if prompt:
+        # Add user message
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        
+        # Get agent response
+        with st.chat_message("assistant"):
+            with st.spinner("Searching hotels..."):
+                try:
+                    placeholder = st.empty()
+                    assistant_response = ""
+                    for assistant_response in stream_answer(agent, prompt):
+                        placeholder.markdown(assistant_response)
+                    
+                    st.session_state.messages.append({"role": "assistant", "content": assistant_response})
+                
+                except Exception as e:
+                    error_msg = f"Sorry, I encountered an error: {str(e)}"
+                    st.error(error_msg)
+                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+    
+    # Sidebar with example queries
+    with st.sidebar:
+        st.header("💡 Example Queries")
+        example_queries = [
+            "Top 5 hotels in Paris by cleanliness",
+            "Hotels in Japan with at least 4 stars",
+            "Best comfort hotels in New York",
+            "Show me 3 hotels in London sorted by facilities",
+            "Hotels with cleanliness above 8.5 in Italy",
+            "Hotels best on cleanliness and value"
+        ]
+        
+        for query in example_queries:
+            if st.button(query, key=f"example_{query}"):
+                st.session_state.pending_prompt = query
+                st.rerun()
+        
+        st.header("ℹ️ Dataset Info")
+        if hotel_manager and hotel_manager.index is not None:
+            st.write(f"📊 Total hotels: {hotel_manager.index.size}")
+            st.write(f"🌍 Countries: {len(hotel_manager.index.country.keys)}")
+            st.write(f"🏙️ Cities: {len(hotel_manager.index.city.keys)}")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
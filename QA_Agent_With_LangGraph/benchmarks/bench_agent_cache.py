@@ -0,0 +1,144 @@
+"""Per-message latency of the chat: every message through the LLM vs the fast path and caches.
+
+Builds a synthetic hotel table (200k rows by default) and replays a stream
+of chat messages: the sidebar example queries, rewordings of them, and
+questions the rule parser cannot answer, with popular ones repeated. The
+LLM is FakeHotelLLM, which sleeps --latency seconds per call in place of
+the API round trip, so this runs offline.
+
+- baseline: the LLM picks the query_hotels call for every message, the
+  query runs uncached and the LLM is called again to write the answer
+- fast path: answer_prompt in app.py (rule parser, tool-result cache,
+  answer cache), falling back to the baseline turn
+
+    python benchmarks/bench_agent_cache.py
+    python benchmarks/bench_agent_cache.py --latency 0.8 --messages 100
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.messages import HumanMessage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_llm import FakeHotelLLM
+from hotel_index import HotelIndex, HotelQueryParams
+from hotel_store import HotelTable, read_frame
+from query_cache import QueryCache, normalize_text
+from query_parser import parse_hotel_query
+from bench_hotel_query import write_hotels
+
+PROMPTS = [
+    # The sidebar example queries
+    "Top 5 hotels in Paris by cleanliness",
+    "Hotels in Japan with at least 4 stars",
+    "Best comfort hotels in New York",
+    "Show me 3 hotels in London sorted by facilities",
+    "Hotels with cleanliness above 8.5 in Italy",
+    # Rewordings the parser also understands
+    "top 5 hotels in paris by cleanliness!",
+    "Hotels in Japan with at least 4 stars.",
+    "Top 3 hotels in Rome",
+    "10 hotels in Tokyo sorted by comfort",
+    "hotels in Spain with comfort above 9",
+    # Messages that need the LLM
+    "Which hotels are close to the Eiffel Tower?",
+    "Cheap hotels in Paris",
+    "Can you recommend a family friendly hotel in London?",
+    "What's the best area to stay in Tokyo?",
+]
+
+
+def make_stream(rng, count):
+    """Messages drawn with Zipf-like popularity, so some repeat often"""
+    weights = 1.0 / np.arange(1, len(PROMPTS) + 1)
+    order = rng.permutation(len(PROMPTS))
+    picks = rng.choice(len(PROMPTS), size=count, p=weights / weights.sum())
+    return [PROMPTS[order[i]] for i in picks]
+
+
+def make_llm(index, latency):
+    llm = FakeHotelLLM(index, latency=latency)
+    # Only the tool names are used, so app.py's tools need not be imported
+    llm.tools = ['query_hotels']
+    return llm
+
+
+def llm_turn(llm, index, prompt):
+    """One message through the LLM: pick the tool call, run it, write the answer"""
+    message = llm.invoke([HumanMessage(content=prompt)])
+    if message.tool_calls:
+        result = index.query(HotelQueryParams(**message.tool_calls[0]['args']))
+        message = llm.invoke([HumanMessage(content=prompt), message])
+        return result
+    return message.content
+
+
+def fast_turn(llm, index, cache, prompt, stats):
+    """app.answer_prompt with the Streamlit parts left out"""
+    params = parse_hotel_query(prompt, index)
+    if params is not None:
+        stats['parsed'] += 1
+        key = ('query',) + params.cache_key()
+        result = cache.get(key)
+        if result is None:
+            result = index.query(params)
+            cache.put(key, result)
+        return result
+    
+    key = ('answer', normalize_text(prompt))
+    answer = cache.get(key)
+    if answer is None:
+        answer = llm_turn(llm, index, prompt)
+        cache.put(key, answer)
+    return answer
+
+
+def run(turn, stream):
+    timings = []
+    for prompt in stream:
+        start = time.perf_counter()
+        turn(prompt)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.1)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'hotels.csv')
+        write_hotels(path, args.rows, rng)
+        index = HotelIndex(HotelTable.from_frame(read_frame(path)))
+    stream = make_stream(rng, args.messages)
+    
+    baseline_llm = make_llm(index, args.latency)
+    baseline = run(lambda prompt: llm_turn(baseline_llm, index, prompt), stream)
+    
+    fast_llm = make_llm(index, args.latency)
+    cache = QueryCache()
+    stats = {'parsed': 0}
+    fast = run(lambda prompt: fast_turn(fast_llm, index, cache, prompt, stats), stream)
+    
+    cache_stats = cache.get_stats()
+    print(f"{index.size} hotels, {len(stream)} messages ({len(set(stream))} distinct), "
+          f"LLM latency {args.latency * 1000:.0f} ms per call\n")
+    print(f"{'path':>10} {'LLM calls':>10} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'total s':>8}")
+    for name, llm, timings in [('baseline', baseline_llm, baseline), ('fast path', fast_llm, fast)]:
+        p50, p99 = np.percentile(timings, [50, 99])
+        print(f"{name:>10} {llm.calls:>10} {p50:>9.2f} {p99:>9.2f} {timings.mean():>9.2f} {timings.sum() / 1000:>8.2f}")
+    print(f"\nparsed without the LLM: {stats['parsed']}/{len(stream)} messages, "
+          f"cache hit rate {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} hits, {cache_stats['misses']} misses)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Time to first answer and LLM calls per question: the old looping graph vs the streamed one.
+
+Runs questions the rule parser leaves to the LLM through the agent with
+FakeHotelLLM standing in for ChatOpenAI (--latency seconds per call), on
+a synthetic hotels.csv (20k rows by default).
+
+- before: create_agent() on every question, as on every Streamlit rerun,
+  then agent.invoke on agent -> tools -> format_response -> agent, which
+  only stops at LangGraph's recursion limit. The limit is set to 25 here,
+  the default of older LangGraph releases; current ones default to about
+  10000 steps, a third of them LLM calls
+- after: the graph built once by build_graph, answered by stream_answer;
+  time to first answer is when the first text reaches the page
+
+    python benchmarks/bench_agent_stream.py
+    python benchmarks/bench_agent_stream.py --latency 0.8
+"""
+import sys
+import os
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.errors import GraphRecursionError
+from langgraph.graph import StateGraph, MessagesState
+from langgraph.prebuilt import ToolNode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_hotel_query import write_hotels
+
+RECURSION_LIMIT = 25
+
+QUESTIONS = [
+    "Cheap hotels in Paris",
+    "Quiet hotels in London by comfort",
+    "Family hotels in Tokyo with at least 4 stars",
+    "Romantic hotels in Italy",
+    "Hello, what can you do?",
+]
+
+
+def old_graph(app, llm):
+    """The graph as create_agent built it before: every edge unconditional"""
+    llm_with_tools = llm.bind_tools(app.TOOLS)
+    
+    def agent_node(state):
+        return {"messages": [llm_with_tools.invoke(state["messages"])]}
+    
+    def format_response_node(state):
+        last_message = state["messages"][-1]
+        if last_message.type == "tool":
+            formatted = app.format_results(json.loads(last_message.content))
+            if formatted is not None:
+                return {"messages": [AIMessage(content=formatted)]}
+        return {"messages": []}
+    
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("agent", agent_node)
+    workflow.add_node("tools", ToolNode(app.TOOLS))
+    workflow.add_node("format_response", format_response_node)
+    workflow.add_edge("agent", "tools")
+    workflow.add_edge("tools", "format_response")
+    workflow.add_edge("format_response", "agent")
+    workflow.set_entry_point("agent")
+    return workflow.compile()
+
+
+def before(app, llm, question):
+    start = time.perf_counter()
+    agent = old_graph(app, llm)
+    built = time.perf_counter()
+    try:
+        agent.invoke({"messages": [HumanMessage(content=question)]}, {"recursion_limit": RECURSION_LIMIT})
+        answered = True
+    except GraphRecursionError:
+        answered = False
+    end = time.perf_counter()
+    # invoke shows nothing until it returns
+    return built - start, end - start, end - start, answered
+
+
+def after(app, agent, question):
+    app.hotel_manager.cache.clear()
+    start = time.perf_counter()
+    first = None
+    answer = ""
+    for answer in app.stream_answer(agent, question):
+        if first is None and answer:
+            first = time.perf_counter() - start
+    end = time.perf_counter() - start
+    return 0.0, first if first is not None else end, end, bool(answer)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.1)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        write_hotels(os.path.join(directory, 'hotels.csv'), args.rows, np.random.default_rng(0))
+        os.chdir(directory)
+        # app.py loads hotels.csv from the working directory when imported
+        os.environ["AGENT_LLM"] = "fake"
+        import app
+        from fake_llm import FakeHotelLLM
+        
+        print(f"LLM latency {args.latency * 1000:.0f} ms per call, {len(QUESTIONS)} questions\n")
+        print(f"{'graph':>7} {'build ms':>9} {'first answer ms':>16} {'total ms':>9} {'LLM calls':>10} {'answered':>9}")
+        for name in ['before', 'after']:
+            llm = FakeHotelLLM(app.hotel_manager.index, latency=args.latency)
+            agent = app.build_graph(llm) if name == 'after' else None
+            rows = []
+            for question in QUESTIONS:
+                calls = llm.calls
+                if name == 'before':
+                    build, first, total, answered = before(app, llm, question)
+                else:
+                    build, first, total, answered = after(app, agent, question)
+                rows.append((build, first, total, llm.calls - calls, answered))
+            build, first, total, calls = (np.mean([row[i] for row in rows]) for i in range(4))
+            answered = sum(row[4] for row in rows)
+            print(f"{name:>7} {build * 1000:>9.2f} {first * 1000:>16.1f} {total * 1000:>9.1f} {calls:>10.1f} "
+                  f"{answered:>5}/{len(QUESTIONS)}")
+
+
+if __name__ == '__main__':
+    main()
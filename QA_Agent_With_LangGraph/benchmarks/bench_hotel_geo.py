@@ -0,0 +1,129 @@
+"""Radius and nearest-hotel search: brute-force pandas scan vs the GeoIndex grid.
+
+Builds 1M synthetic hotels (by default), most clustered around city centres
+and the rest scattered, then runs radius queries of several sizes and
+k-nearest queries, some with rating thresholds, through both and checks
+they return the same hotels.
+
+    python benchmarks/bench_hotel_geo.py
+    python benchmarks/bench_hotel_geo.py --rows 200000
+"""
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hotel_geo import haversine_km
+from hotel_index import HotelIndex, NearbyQueryParams
+from hotel_store import HotelTable
+
+CITIES = 2000
+QUERIES = 300
+BASELINE_QUERIES = 30
+
+
+def make_hotels(rows, rng):
+    centres_lat = rng.uniform(-50, 65, CITIES)
+    centres_lon = rng.uniform(-180, 180, CITIES)
+    city = rng.integers(0, CITIES, rows)
+    clustered = rng.random(rows) < 0.8
+    lat = np.where(clustered, centres_lat[city] + rng.normal(0, 0.1, rows), rng.uniform(-60, 70, rows))
+    lon = np.where(clustered, centres_lon[city] + rng.normal(0, 0.1, rows), rng.uniform(-180, 180, rows))
+    return pd.DataFrame({
+        'hotel_id': np.arange(rows),
+        'hotel_name': [f'Hotel {i}' for i in range(rows)],
+        'city': [f'city {i}' for i in city],
+        'country': 'somewhere',
+        'lat': lat.clip(-90, 90),
+        'lon': (lon + 180) % 360 - 180,
+        'star_rating': rng.integers(1, 6, rows).astype(float),
+        'cleanliness_base': rng.uniform(5, 10, rows).round(1),
+        'comfort_base': rng.uniform(5, 10, rows).round(1),
+        'facilities_base': rng.uniform(5, 10, rows).round(1),
+    }), centres_lat, centres_lon
+
+
+def make_queries(rng, centres_lat, centres_lon):
+    queries = []
+    for i in range(QUERIES):
+        city = rng.integers(0, CITIES)
+        lat, lon = centres_lat[city] + rng.normal(0, 0.05), centres_lon[city] + rng.normal(0, 0.05)
+        radius = [None, 2.0, 10.0, 50.0][i % 4]
+        params = NearbyQueryParams(lat=float(lat), lon=float(lon), radius_km=radius, limit=int(rng.integers(1, 11)))
+        if rng.random() < 0.3:
+            params.min_star_rating = 4.0
+            params.min_cleanliness = 8.5
+        queries.append(params)
+    return queries
+
+
+def baseline_nearby(df, params):
+    """Distance to every hotel with pandas, then filter and sort"""
+    distances = pd.Series(haversine_km(df['lat'].to_numpy(), df['lon'].to_numpy(), params.lat, params.lon),
+                          index=df.index)
+    mask = ((df['star_rating'] >= params.min_star_rating) &
+            (df['cleanliness_base'] >= params.min_cleanliness) &
+            (df['comfort_base'] >= params.min_comfort) &
+            (df['facilities_base'] >= params.min_facilities))
+    if params.radius_km:
+        mask &= distances <= params.radius_km
+    matched = distances[mask]
+    limit = max(1, min(10, params.limit))
+    nearest = matched.nsmallest(limit)
+    return {
+        'names': df.loc[nearest.index, 'hotel_name'].tolist(),
+        'distances': nearest.round(2).tolist(),
+        'total_found': len(matched) if params.radius_km else len(nearest),
+    }
+
+
+def same_result(expected, actual):
+    """Same totals and distances; hotels at exactly the same distance may swap places"""
+    return (expected['total_found'] == actual['total_found'] and
+            expected['distances'] == [result['distance_km'] for result in actual['results']])
+
+
+def latencies(query, queries):
+    timings = []
+    for params in queries:
+        start = time.perf_counter()
+        query(params)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, [50, 99]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    
+    df, centres_lat, centres_lon = make_hotels(args.rows, rng)
+    start = time.perf_counter()
+    index = HotelIndex(HotelTable.from_frame(df))
+    build_time = time.perf_counter() - start
+    queries = make_queries(rng, centres_lat, centres_lon)
+    
+    mismatches = 0
+    for params in queries[:BASELINE_QUERIES]:
+        mismatches += not same_result(baseline_nearby(df, params), index.query_nearby(params))
+    
+    print(f"{len(df)} hotels, table and grid built in {build_time:.2f}s\n")
+    print(f"{'search':>10} {'radius':>7} {'queries':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for radius in [2.0, 10.0, 50.0, None]:
+        subset = [params for params in queries if params.radius_km == radius]
+        label = f'{radius:g} km' if radius else 'nearest'
+        base_p50, base_p99 = latencies(lambda params: baseline_nearby(df, params), subset[:BASELINE_QUERIES // 4])
+        fast_p50, fast_p99 = latencies(index.query_nearby, subset)
+        print(f"{'pandas':>10} {label:>7} {BASELINE_QUERIES // 4:>8} {base_p50:>9.2f} {base_p99:>9.2f}")
+        print(f"{'GeoIndex':>10} {label:>7} {len(subset):>8} {fast_p50:>9.3f} {fast_p99:>9.3f}")
+    print(f"\nmismatched results: {mismatches}/{BASELINE_QUERIES}")
+
+
+if __name__ == '__main__':
+    main()
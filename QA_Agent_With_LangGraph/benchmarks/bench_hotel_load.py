@@ -0,0 +1,108 @@
+"""Cold-start time and memory of the hotel dataset: parsing the CSV vs the snapshot.
+
+Writes a synthetic hotels file (2M rows by default) and loads it in fresh
+processes three ways:
+
+- csv: read_frame plus building the table in memory (every start before snapshots)
+- build: load_table with no snapshot yet (parses once and writes the snapshot)
+- snapshot: load_table with a fresh snapshot (memory-mapped, no parsing)
+
+Memory is read from /proc (Linux) after the load and again after a batch
+of queries. RssFile pages come from the page cache and are shared by every
+process that maps the snapshot; RssAnon pages are private to the process.
+
+    python benchmarks/bench_hotel_load.py
+    python benchmarks/bench_hotel_load.py --rows 5000000
+"""
+import sys
+import os
+import argparse
+import json
+import random
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = 100
+
+
+def memory():
+    """Resident set size in MB, split into private and file-backed pages"""
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in ('VmRSS', 'RssAnon', 'RssFile'):
+                fields[name] = int(value.split()[0]) / 1024
+    return fields
+
+
+def child(mode, path):
+    from hotel_index import HotelIndex
+    from hotel_store import HotelTable, load_table, read_frame
+    from bench_hotel_query import make_queries
+    
+    before = memory()
+    start = time.perf_counter()
+    if mode == 'csv':
+        table = HotelTable.from_frame(read_frame(path))
+    else:
+        table = load_table(path)
+    index = HotelIndex(table)
+    load_time = time.perf_counter() - start
+    loaded = memory()
+    
+    for params in make_queries(random.Random(0), QUERIES):
+        index.query(params)
+    queried = memory()
+    print(json.dumps({
+        'seconds': load_time,
+        'loaded': {name: loaded[name] - before.get(name, 0.0) for name in loaded},
+        'queried': {name: queried[name] - before.get(name, 0.0) for name in queried},
+    }))
+
+
+def run_child(mode, path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'))
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+    
+    from bench_hotel_query import write_hotels
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'hotels.csv')
+        write_hotels(path, args.rows, np.random.default_rng(0))
+        csv_mb = os.path.getsize(path) / 2 ** 20
+        
+        results = [('csv', run_child('csv', path)), ('build', run_child('build', path))]
+        snapshot_mb = os.path.getsize(path + '.snapshot') / 2 ** 20
+        results.append(('snapshot', run_child('snapshot', path)))
+    
+    print(f"{args.rows} hotels, CSV {csv_mb:.0f} MB, snapshot {snapshot_mb:.0f} MB\n")
+    print(f"{'load':>9} {'seconds':>8} {'RSS MB':>7} {'anon MB':>8} {'file MB':>8}   "
+          f"after {QUERIES} queries: {'RSS MB':>7} {'anon MB':>8} {'file MB':>8}")
+    for mode, result in results:
+        loaded, queried = result['loaded'], result['queried']
+        print(f"{mode:>9} {result['seconds']:>8.2f} {loaded['VmRSS']:>7.0f} {loaded['RssAnon']:>8.0f} "
+              f"{loaded['RssFile']:>8.0f}   {'':>19} {queried['VmRSS']:>7.0f} {queried['RssAnon']:>8.0f} "
+              f"{queried['RssFile']:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Per-query latency of query_hotels: the DataFrame scan vs HotelIndex.
+
+Writes a synthetic hotels file (1M rows by default), parses it with
+read_frame, then runs the same mix of city, country,
+threshold and sort queries through both implementations and checks that
+they agree.
+
+    python benchmarks/bench_hotel_query.py
+    python benchmarks/bench_hotel_query.py --rows 200000
+"""
+import sys
+import os
+import argparse
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hotel_index import HotelIndex, HotelQueryParams, SORT_COLUMNS, THRESHOLDS
+from hotel_store import HotelTable, read_frame
+
+BASELINE_QUERIES = 30
+INDEX_QUERIES = 3000
+
+COUNTRIES = ['United States', 'United Kingdom', 'France', 'Japan', 'Italy', 'Spain', 'Germany',
+             'Brazil', 'India', 'Australia', 'Canada', 'Mexico', 'Thailand', 'Egypt', 'Greece']
+
+
+def write_hotels(path, rows, rng):
+    cities = [(f'{country} City {i}', country) for country in COUNTRIES for i in range(200)]
+    cities += [('New York', 'United States'), ('London', 'United Kingdom'), ('Paris', 'France'),
+               ('Tokyo', 'Japan'), ('Rome', 'Italy'), ('York', 'United Kingdom')]
+    # Zipf-like city sizes: a few big cities hold most of the hotels
+    weights = 1.0 / np.arange(1, len(cities) + 1)
+    picks = rng.choice(len(cities), size=rows, p=weights / weights.sum())
+    df = pd.DataFrame({
+        'hotel_id': np.arange(1, rows + 1),
+        'hotel_name': [f'Hotel {i}' for i in range(rows)],
+        'city': [cities[i][0] for i in picks],
+        'country': [cities[i][1] for i in picks],
+        'star_rating': rng.integers(1, 6, rows),
+        'lat': rng.uniform(-60, 70, rows).round(4),
+        'lon': rng.uniform(-180, 180, rows).round(4),
+        'cleanliness_base': rng.uniform(5, 10, rows).round(1),
+        'comfort_base': rng.uniform(5, 10, rows).round(1),
+        'facilities_base': rng.uniform(5, 10, rows).round(1),
+    })
+    df.to_csv(path, index=False)
+
+
+def baseline_query(df, params):
+    """HotelDataManager.query_hotels before HotelIndex"""
+    filtered_df = df.copy()
+    if params.city:
+        city_filter = params.city.strip().lower()
+        filtered_df = filtered_df[filtered_df['city'].str.contains(city_filter, na=False)]
+    if params.country:
+        country_filter = params.country.strip().lower()
+        filtered_df = filtered_df[filtered_df['country'].str.contains(country_filter, na=False)]
+    filtered_df = filtered_df[
+        (filtered_df['star_rating'] >= params.min_star_rating) &
+        (filtered_df['cleanliness_base'] >= params.min_cleanliness) &
+        (filtered_df['comfort_base'] >= params.min_comfort) &
+        (filtered_df['facilities_base'] >= params.min_facilities)
+    ]
+    if filtered_df.empty:
+        return {"results": [], "total_found": 0, "message": "No hotels found matching your criteria."}
+    if params.sort_by in SORT_COLUMNS:
+        filtered_df = filtered_df.sort_values(params.sort_by, ascending=False)
+    limit = max(1, min(10, params.limit))
+    result_df = filtered_df.head(limit)
+    results = []
+    for _, row in result_df.iterrows():
+        results.append({
+            "hotel_name": row['hotel_name'],
+            "city": row['city'].title(),
+            "country": row['country'].title(),
+            "star_rating": float(row['star_rating']),
+            "cleanliness": float(row['cleanliness_base']),
+            "comfort": float(row['comfort_base']),
+            "facilities": float(row['facilities_base'])
+        })
+    return {
+        "results": results,
+        "total_found": len(filtered_df),
+        "message": f"Found {len(filtered_df)} hotel(s), showing top {len(results)}"
+    }
+
+
+def make_queries(rng, count):
+    cities = ['new york', 'London', 'paris', 'Tokyo', 'york', 'France City 3', 'Japan City 150', 'Atlantis']
+    countries = ['united states', 'Japan', 'France', 'united', 'Narnia']
+    queries = []
+    for _ in range(count):
+        params = HotelQueryParams(sort_by=rng.choice(SORT_COLUMNS + ['name']), limit=rng.randint(1, 10))
+        shape = rng.random()
+        if shape < 0.4:
+            params.city = rng.choice(cities)
+        elif shape < 0.7:
+            params.country = rng.choice(countries)
+        elif shape < 0.8:
+            params.city, params.country = rng.choice(cities), rng.choice(countries)
+        for name in THRESHOLDS:
+            if rng.random() < 0.3:
+                setattr(params, name, 4.0 if name == 'min_star_rating' else rng.choice([7.0, 8.5, 9.5]))
+        queries.append(params)
+    return queries
+
+
+def same_result(expected, actual, sort_by):
+    """Totals and returned scores must match; ties may come back in a different order"""
+    if expected['total_found'] != actual['total_found']:
+        return False
+    key = {'star_rating': 'star_rating', 'cleanliness_base': 'cleanliness',
+           'comfort_base': 'comfort', 'facilities_base': 'facilities'}.get(sort_by)
+    if key is None:
+        return expected['results'] == actual['results']
+    return [r[key] for r in expected['results']] == [r[key] for r in actual['results']]
+
+
+def latencies(query, queries):
+    timings = []
+    for params in queries:
+        start = time.perf_counter()
+        query(params)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, [50, 99]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'hotels.csv')
+        write_hotels(path, args.rows, np.random.default_rng(0))
+        df = read_frame(path)
+    
+    start = time.perf_counter()
+    index = HotelIndex(HotelTable.from_frame(df))
+    build_time = time.perf_counter() - start
+    
+    queries = make_queries(rng, INDEX_QUERIES)
+    checked = queries[:BASELINE_QUERIES]
+    mismatches = sum(
+        not same_result(baseline_query(df, params), index.query(params), params.sort_by) for params in checked
+    )
+    
+    print(f"{len(df)} hotels, index built in {build_time:.2f}s\n")
+    print(f"{'engine':>10} {'queries':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    base_p50, base_p99 = latencies(lambda params: baseline_query(df, params), checked)
+    print(f"{'DataFrame':>10} {len(checked):>8} {base_p50:>9.2f} {base_p99:>9.2f}")
+    fast_p50, fast_p99 = latencies(index.query, queries)
+    print(f"{'HotelIndex':>10} {len(queries):>8} {fast_p50:>9.3f} {fast_p99:>9.3f}")
+    print(f"\np50 speedup: {base_p50 / fast_p50:.0f}x, mismatched results: {mismatches}/{len(checked)}")
+
+
+if __name__ == '__main__':
+    main()
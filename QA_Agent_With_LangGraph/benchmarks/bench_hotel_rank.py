@@ -0,0 +1,154 @@
+"""Weighted multi-score ranking: a pandas composite column plus sort_values vs HotelIndex.
+
+Builds 1M synthetic hotels (by default) with all seven scores and runs
+weighted queries over two or three of them, some filtered by country or
+thresholds, through a full sort of the composite score and through the
+matrix-vector product plus argpartition top-k. Pareto queries are timed
+on their own and checked against a brute-force dominance test.
+
+    python benchmarks/bench_hotel_rank.py
+    python benchmarks/bench_hotel_rank.py --rows 200000
+"""
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hotel_index import HotelIndex, HotelQueryParams, SCORE_NAMES, pareto_front, score_weights
+from hotel_store import HotelTable, SCORE_COLUMNS, SCORE_SCALES
+
+QUERIES = 300
+BASELINE_QUERIES = 30
+PARETO_CHECK_ROWS = 5000
+
+COUNTRIES = ['united states', 'united kingdom', 'france', 'japan', 'italy', 'spain', 'germany',
+             'brazil', 'india', 'australia', 'canada', 'mexico', 'thailand', 'egypt', 'greece']
+WEIGHT_NAMES = ['stars', 'cleanliness', 'comfort', 'facilities', 'location', 'staff', 'value']
+
+
+def make_hotels(rows, rng):
+    country = rng.integers(0, len(COUNTRIES), rows)
+    quality = rng.normal(0, 0.6, rows)
+    df = pd.DataFrame({
+        'hotel_id': np.arange(rows),
+        'hotel_name': [f'Hotel {i}' for i in range(rows)],
+        'city': [f'city {i % 3000}' for i in range(rows)],
+        'country': np.array(COUNTRIES)[country],
+        'lat': rng.uniform(-60, 70, rows),
+        'lon': rng.uniform(-180, 180, rows),
+        'star_rating': rng.integers(1, 6, rows).astype(float),
+    })
+    for col in SCORE_COLUMNS[1:]:
+        # Correlated through quality, like real review scores
+        df[col] = (7.5 + quality + rng.normal(0, 0.7, rows)).clip(1, 10).round(1)
+    return df
+
+
+def make_queries(rng):
+    queries = []
+    for _ in range(QUERIES):
+        names = rng.choice(WEIGHT_NAMES, size=rng.integers(2, 4), replace=False)
+        params = HotelQueryParams(
+            weights={str(name): float(rng.integers(1, 4)) for name in names},
+            limit=int(rng.integers(1, 11))
+        )
+        shape = rng.random()
+        if shape < 0.3:
+            params.country = str(rng.choice(COUNTRIES))
+        elif shape < 0.5:
+            params.min_star_rating = 4.0
+            params.min_cleanliness = 8.0
+        queries.append(params)
+    return queries
+
+
+def baseline_query(df, params):
+    """A composite column, then the full sort_values the single-column sort used"""
+    filtered_df = df
+    if params.country:
+        filtered_df = filtered_df[filtered_df['country'] == params.country]
+    filtered_df = filtered_df[
+        (filtered_df['star_rating'] >= params.min_star_rating) &
+        (filtered_df['cleanliness_base'] >= params.min_cleanliness)
+    ]
+    weights = {}
+    for name, weight in params.weights.items():
+        weights[SCORE_NAMES[name]] = weights.get(SCORE_NAMES[name], 0.0) + weight
+    total = sum(weights.values())
+    score = sum(filtered_df[col] / SCORE_SCALES[col] * (weight / total) for col, weight in weights.items()) * 10
+    ranked = score.sort_values(ascending=False, kind='stable').head(max(1, min(10, params.limit)))
+    return {'total_found': len(filtered_df), 'scores': ranked.tolist()}
+
+
+def same_result(expected, actual):
+    """Same totals and scores; hotels with equal scores may come back in another order"""
+    scores = [result['score'] for result in actual['results']]
+    return (expected['total_found'] == actual['total_found'] and len(scores) == len(expected['scores']) and
+            np.allclose(scores, expected['scores'], atol=0.006))
+
+
+def brute_force_front(points):
+    """Every pair compared: the reference answer for pareto_front"""
+    at_least = (points[:, None, :] >= points[None, :, :]).all(axis=2)
+    better = (points[:, None, :] > points[None, :, :]).any(axis=2)
+    return np.flatnonzero(~(at_least & better).any(axis=0))
+
+
+def latencies(query, queries):
+    timings = []
+    for params in queries:
+        start = time.perf_counter()
+        query(params)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, [50, 99]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    
+    df = make_hotels(args.rows, rng)
+    index = HotelIndex(HotelTable.from_frame(df))
+    queries = make_queries(rng)
+    
+    mismatches = sum(
+        not same_result(baseline_query(df, params), index.query(params)) for params in queries[:BASELINE_QUERIES]
+    )
+    base_p50, base_p99 = latencies(lambda params: baseline_query(df, params), queries[:BASELINE_QUERIES])
+    fast_p50, fast_p99 = latencies(index.query, queries)
+    
+    pareto_queries = [HotelQueryParams(weights=params.weights, pareto=True, country=params.country,
+                                       min_star_rating=params.min_star_rating,
+                                       min_cleanliness=params.min_cleanliness, limit=params.limit)
+                      for params in queries[:BASELINE_QUERIES]]
+    pareto_p50, pareto_p99 = latencies(index.query, pareto_queries)
+    fronts = [index.query(params)['total_found'] for params in pareto_queries]
+    
+    pareto_mismatches = 0
+    sample = rng.choice(args.rows, PARETO_CHECK_ROWS, replace=False)
+    for params in pareto_queries:
+        used = np.flatnonzero(score_weights(params.weights) > 0)
+        points = index.table.scores[sample][:, used]
+        expected = set(sample[brute_force_front(points)].tolist())
+        actual = set(sample[pareto_front(points)].tolist())
+        pareto_mismatches += expected != actual
+    
+    print(f"{args.rows} hotels\n")
+    print(f"{'ranking':>22} {'queries':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    print(f"{'pandas full sort':>22} {BASELINE_QUERIES:>8} {base_p50:>9.2f} {base_p99:>9.2f}")
+    print(f"{'matvec + argpartition':>22} {len(queries):>8} {fast_p50:>9.2f} {fast_p99:>9.2f}")
+    print(f"{'pareto front':>22} {len(pareto_queries):>8} {pareto_p50:>9.2f} {pareto_p99:>9.2f}")
+    print(f"\nmismatched weighted results: {mismatches}/{BASELINE_QUERIES}")
+    print(f"pareto front sizes: median {int(np.median(fronts))}, max {max(fronts)}; "
+          f"mismatched fronts on {PARETO_CHECK_ROWS}-row samples: {pareto_mismatches}/{len(pareto_queries)}")
+
+
+if __name__ == '__main__':
+    main()
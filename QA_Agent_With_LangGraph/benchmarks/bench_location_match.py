@@ -0,0 +1,122 @@
+"""City lookup: Series.str.contains over every row vs the trigram index over distinct names.
+
+Builds 1M hotel rows (by default) over 20k synthetic city names, some with
+diacritics, then looks up each city through a set of misspellings: a
+dropped, added, swapped or substituted letter, a missing or added accent,
+a prefix, and odd casing and punctuation. Reports lookup latency and
+recall: whether the intended city is the first match (top-1) or among
+those returned (any).
+
+    python benchmarks/bench_location_match.py
+    python benchmarks/bench_location_match.py --rows 200000 --cities 5000
+"""
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hotel_store import KeyIndex
+
+SYLLABLES = ['ba', 'ro', 'mi', 'ka', 'te', 'lo', 'sa', 'ne', 'po', 'ri', 'da', 'vi', 'lu', 'mo', 'ta',
+             'ge', 'an', 'el', 'or', 'is', 'ber', 'lin', 'ton', 'burg', 'ville', 'mar', 'sol', 'val']
+PREFIXES = ['san ', 'port ', 'new ', 'st ', 'los ', 'el ']
+ACCENTS = {'a': 'á', 'e': 'é', 'o': 'ö', 'u': 'ü', 'i': 'í', 'n': 'ñ', 'c': 'ç'}
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+MISSPELLINGS = ['drop', 'add', 'swap', 'substitute', 'accent', 'unaccent', 'prefix', 'casing']
+
+
+def make_cities(count, rng):
+    cities = set()
+    while len(cities) < count:
+        name = ''.join(rng.choice(SYLLABLES, size=rng.integers(2, 5)))
+        if rng.random() < 0.15:
+            name = str(rng.choice(PREFIXES)) + name
+        if rng.random() < 0.2:
+            position = int(rng.integers(len(name)))
+            name = name[:position] + ACCENTS.get(name[position], name[position]) + name[position + 1:]
+        cities.add(name)
+    return sorted(cities)
+
+
+def misspell(name, kind, rng):
+    letters = [i for i, ch in enumerate(name) if ch.isalpha()]
+    i = int(rng.choice(letters[1:-1] or letters))
+    if kind == 'drop':
+        return name[:i] + name[i + 1:]
+    if kind == 'add':
+        return name[:i] + str(rng.choice(list(LETTERS))) + name[i:]
+    if kind == 'swap':
+        return name[:i] + name[i + 1:i + 2] + name[i] + name[i + 2:]
+    if kind == 'substitute':
+        return name[:i] + str(rng.choice([ch for ch in LETTERS if ch != name[i]])) + name[i + 1:]
+    if kind == 'accent':
+        plain = [i for i in letters if name[i] in ACCENTS]
+        if plain:
+            i = int(rng.choice(plain))
+            return name[:i] + ACCENTS[name[i]] + name[i + 1:]
+        return name
+    if kind == 'unaccent':
+        plain = {accented: letter for letter, accented in ACCENTS.items()}
+        return ''.join(plain.get(ch, ch) for ch in name)
+    if kind == 'prefix':
+        return name[:max(4, len(name) * 2 // 3)]
+    return name.upper() + '!'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--cities', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=800)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    
+    cities = make_cities(args.cities, rng)
+    column = pd.Series(np.array(cities, dtype=object)[rng.integers(0, len(cities), args.rows)])
+    start = time.perf_counter()
+    index = KeyIndex.from_values(column)
+    build_time = time.perf_counter() - start
+    
+    queries = []
+    for i in range(args.queries):
+        kind = MISSPELLINGS[i % len(MISSPELLINGS)]
+        city = cities[int(rng.integers(len(cities)))]
+        queries.append((kind, city, misspell(city, kind, rng)))
+    
+    print(f"{args.rows} rows, {len(cities)} cities, trigram index built in {build_time * 1000:.0f} ms\n")
+    print(f"{'misspelling':>12} {'queries':>8} {'contains any':>13} {'trigram top-1':>14} {'trigram any':>12}")
+    baseline_times, fast_times = [], []
+    totals = np.zeros(3)
+    for kind in MISSPELLINGS:
+        hits = np.zeros(3)
+        subset = [(city, text) for name, city, text in queries if name == kind]
+        for city, text in subset:
+            start = time.perf_counter()
+            matched = column[column.str.contains(text.strip().lower(), regex=False)]
+            found = city in set(matched.unique())
+            baseline_times.append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            codes, _ = index.resolve(text.strip().lower())
+            index.rows_for(codes)
+            fast_times.append(time.perf_counter() - start)
+            names = [index.keys[code] for code in codes.tolist()]
+            hits += [found, names[:1] == [city], city in names]
+        totals += hits
+        print(f"{kind:>12} {len(subset):>8} {hits[0] / len(subset):>13.0%} {hits[1] / len(subset):>14.0%} "
+              f"{hits[2] / len(subset):>12.0%}")
+    print(f"{'all':>12} {len(queries):>8} {totals[0] / len(queries):>13.0%} {totals[1] / len(queries):>14.0%} "
+          f"{totals[2] / len(queries):>12.0%}\n")
+    
+    for name, timings in [('str.contains', baseline_times), ('trigram', fast_times)]:
+        p50, p99 = np.percentile(timings, [50, 99]) * 1000
+        print(f"{name:>12} lookup p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import time
+from dataclasses import asdict
+from typing import List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from hotel_index import HotelIndex
+from query_parser import parse_hotel_query
+
+class FakeHotelLLM:
+    """Offline stand-in for the chat model, for trying the agent without an API key.
+
+    Turns the user's message into a query_hotels call with the loose rule
+    parser and answers anything else with a fixed reply. latency is slept on
+    every call to mimic a round trip to the API.
+    """
+    
+    def __init__(self, index: HotelIndex, latency: float = 0.0):
+        self.index = index
+        self.latency = latency
+        self.tools = []
+        self.calls = 0
+    
+    def bind_tools(self, tools: List) -> 'FakeHotelLLM':
+        self.tools = [tool.name for tool in tools]
+        return self
+    
+    def invoke(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        
+        last_message = messages[-1]
+        if isinstance(last_message, HumanMessage) and 'query_hotels' in self.tools:
+            params = parse_hotel_query(last_message.content, self.index, strict=False)
+            if params is not None:
+                return AIMessage(content="", tool_calls=[{
+                    "name": "query_hotels",
+                    "args": asdict(params),
+                    "id": f"call_{self.calls}"
+                }])
+        return AIMessage(content="I can search hotels by city, country, star rating and review scores.")
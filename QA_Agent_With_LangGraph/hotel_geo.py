@@ -0,0 +1,94 @@
+import math
+import numpy as np
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0
+# Half the circumference: no two points on Earth are further apart
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+# Grid cells are GRID_DEGREES on a side, about 55 km at the equator
+GRID_DEGREES = 0.5
+GRID_ROWS = int(180 / GRID_DEGREES)
+GRID_COLUMNS = int(360 / GRID_DEGREES)
+
+def haversine_km(lat: np.ndarray, lon: np.ndarray, center_lat: float, center_lon: float) -> np.ndarray:
+    """Great-circle distance in km from (center_lat, center_lon) to every point"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    center_lat, center_lon = math.radians(center_lat), math.radians(center_lon)
+    a = (np.sin((lat - center_lat) / 2) ** 2 +
+         math.cos(center_lat) * np.cos(lat) * np.sin((lon - center_lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def grid_cells(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Cell id of each point; ids run west to east within a band, bands south to north"""
+    band = np.clip(np.floor((lat + 90) / GRID_DEGREES), 0, GRID_ROWS - 1).astype(np.int64)
+    column = np.floor((lon + 180) / GRID_DEGREES).astype(np.int64) % GRID_COLUMNS
+    return band * GRID_COLUMNS + column
+
+class GeoIndex:
+    """Lat/lon grid over the hotel rows for radius and nearest-neighbour search.
+
+    Rows are grouped by grid cell, and the cells are sorted by id, so each
+    latitude band of a search box is one contiguous slice of rows. Exact
+    distances are computed only for the rows in those slices.
+    """
+    
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cells: np.ndarray, starts: np.ndarray, rows: np.ndarray):
+        self.lat = lat
+        self.lon = lon
+        # Cell cells[i] owns rows[starts[i]:starts[i + 1]]
+        self.cells = cells
+        self.starts = starts
+        self.rows = rows
+    
+    @classmethod
+    def from_coordinates(cls, lat: np.ndarray, lon: np.ndarray) -> 'GeoIndex':
+        """Index every row with valid coordinates"""
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90))
+        ids = grid_cells(lat[valid], lon[valid])
+        order = np.argsort(ids, kind='stable')
+        cells, counts = np.unique(ids[order], return_counts=True)
+        starts = np.zeros(len(cells) + 1, dtype=np.int64)
+        np.cumsum(counts, out=starts[1:])
+        return cls(lat, lon, cells, starts, valid[order].astype(np.int32))
+    
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows within radius_km of (lat, lon) and their distances, in no particular order"""
+        lon = (lon + 180) % 360 - 180
+        rows = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(self.lat[rows], self.lon[rows], lat, lon)
+        inside = distances <= radius_km
+        return rows[inside], distances[inside]
+    
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Rows in the grid cells overlapping the circle's bounding box"""
+        if radius_km >= MAX_DISTANCE_KM:
+            return self.rows
+        angle = radius_km / EARTH_RADIUS_KM
+        south = max(0, math.floor((lat - math.degrees(angle) + 90) / GRID_DEGREES))
+        north = min(GRID_ROWS - 1, math.floor((lat + math.degrees(angle) + 90) / GRID_DEGREES))
+        
+        # The circle's longitude span; it covers every longitude when it reaches a pole
+        if abs(lat) + math.degrees(angle) >= 90:
+            spans = [(0, GRID_COLUMNS - 1)]
+        else:
+            half_width = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(lat))))
+            west = math.floor((lon - half_width + 180) / GRID_DEGREES)
+            east = math.floor((lon + half_width + 180) / GRID_DEGREES)
+            if east - west + 1 >= GRID_COLUMNS:
+                spans = [(0, GRID_COLUMNS - 1)]
+            elif west < 0:
+                spans = [(0, east), (west + GRID_COLUMNS, GRID_COLUMNS - 1)]
+            elif east >= GRID_COLUMNS:
+                spans = [(west, GRID_COLUMNS - 1), (0, east - GRID_COLUMNS)]
+            else:
+                spans = [(west, east)]
+        
+        bands = np.arange(south, north + 1, dtype=np.int64) * GRID_COLUMNS
+        first = np.concatenate([bands + west for west, _ in spans])
+        last = np.concatenate([bands + east for _, east in spans])
+        lo = np.searchsorted(self.cells, first, side='left')
+        hi = np.searchsorted(self.cells, last, side='right')
+        slices = [self.rows[self.starts[a]:self.starts[b]] for a, b in zip(lo.tolist(), hi.tolist()) if b > a]
+        if not slices:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate(slices)
@@ -0,0 +1,373 @@
+import math
+import numpy as np
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+
+from hotel_geo import MAX_DISTANCE_KM
+from hotel_store import HotelTable, SCORE_COLUMNS, SORT_COLUMNS
+
+# The HotelQueryParams threshold on each sortable metric
+THRESHOLDS = {
+    'min_star_rating': 'star_rating',
+    'min_cleanliness': 'cleanliness_base',
+    'min_comfort': 'comfort_base',
+    'min_facilities': 'facilities_base'
+}
+# Names accepted in HotelQueryParams.weights: the score columns and their result field names
+SCORE_NAMES = {col: col for col in SCORE_COLUMNS}
+SCORE_NAMES.update({
+    'stars': 'star_rating', 'cleanliness': 'cleanliness_base', 'comfort': 'comfort_base',
+    'facilities': 'facilities_base', 'location': 'location_base', 'staff': 'staff_base',
+    'value': 'value_for_money_base', 'value_for_money': 'value_for_money_base'
+})
+# Result fields for the optional scores, added when a ranking uses them
+OPTIONAL_FIELDS = {'location_base': 'location', 'staff_base': 'staff', 'value_for_money_base': 'value_for_money'}
+
+@dataclass
+class HotelQueryParams:
+    """Parameters for hotel queries"""
+    city: Optional[str] = None
+    country: Optional[str] = None
+    min_star_rating: float = 0.0
+    min_cleanliness: float = 0.0
+    min_comfort: float = 0.0
+    min_facilities: float = 0.0
+    sort_by: str = "star_rating"
+    limit: int = 5
+    # Score name -> weight; when set, hotels are ranked by the weighted average instead of sort_by
+    weights: Optional[Dict[str, float]] = None
+    # Only return hotels no other match beats on every weighted score
+    pareto: bool = False
+    
+    def cache_key(self) -> tuple:
+        """Equal for parameters that always give the same result"""
+        return (
+            self.city.strip().lower() if self.city else None,
+            self.country.strip().lower() if self.country else None,
+            float(self.min_star_rating),
+            float(self.min_cleanliness),
+            float(self.min_comfort),
+            float(self.min_facilities),
+            self.sort_by if self.sort_by in SCORE_COLUMNS else None,
+            max(1, min(10, self.limit)),
+            tuple(sorted((str(name), float(weight)) for name, weight in self.weights.items())) if self.weights else None,
+            bool(self.pareto)
+        )
+
+@dataclass
+class NearbyQueryParams:
+    """Parameters for queries around a point; without radius_km the nearest hotels are returned"""
+    lat: float
+    lon: float
+    radius_km: Optional[float] = None
+    min_star_rating: float = 0.0
+    min_cleanliness: float = 0.0
+    min_comfort: float = 0.0
+    min_facilities: float = 0.0
+    limit: int = 5
+    
+    def cache_key(self) -> tuple:
+        """Equal for parameters that always give the same result"""
+        return (
+            round(float(self.lat), 6),
+            round((float(self.lon) + 180) % 360 - 180, 6),
+            float(self.radius_km) if self.radius_km is not None and self.radius_km > 0 else None,
+            float(self.min_star_rating),
+            float(self.min_cleanliness),
+            float(self.min_comfort),
+            float(self.min_facilities),
+            max(1, min(10, self.limit))
+        )
+
+def score_weights(weights: Dict[str, float]) -> np.ndarray:
+    """Weight per SCORE_COLUMNS entry, summing to 1; ValueError for unknown names or negative weights"""
+    vector = np.zeros(len(SCORE_COLUMNS), dtype=np.float32)
+    for name, weight in weights.items():
+        col = SCORE_NAMES.get(str(name).strip().lower())
+        if col is None:
+            raise ValueError(f"Unknown score '{name}' in weights, expected one of: {', '.join(SCORE_NAMES)}")
+        if weight < 0:
+            raise ValueError(f"Weight for '{name}' must not be negative")
+        vector[SCORE_COLUMNS.index(col)] += weight
+    if vector.sum() <= 0:
+        raise ValueError("weights must give at least one score a positive weight")
+    return vector / vector.sum()
+
+def pareto_front(points: np.ndarray) -> np.ndarray:
+    """Indices of the points no other point matches or beats on every column while beating on one"""
+    # A point's dominators all have a larger sum, so the largest remaining sum is never dominated
+    remaining = np.arange(len(points))
+    totals = points.sum(axis=1, dtype=np.float64)
+    front = []
+    while len(remaining):
+        i = int(np.argmax(totals))
+        best = points[i]
+        front.append(remaining[i])
+        keep = ~((points <= best).all(axis=1) & (points < best).any(axis=1))
+        keep[i] = False
+        remaining, points, totals = remaining[keep], points[keep], totals[keep]
+    return np.array(front, dtype=np.int64)
+
+def top_k(scores: np.ndarray, rows: np.ndarray, limit: int) -> np.ndarray:
+    """Positions of the limit highest scores, best first, ties going to the lower row"""
+    if len(scores) > limit:
+        kth = scores[np.argpartition(-scores, limit - 1)[limit - 1]]
+        # Everything tied with the k-th score competes for the last places
+        best = np.flatnonzero(scores >= kth)
+    else:
+        best = np.arange(len(scores))
+    return best[np.lexsort((rows[best], -scores[best]))][:limit]
+
+class HotelIndex:
+    """Read-only query engine over a HotelTable.
+
+    City and country go through hash indexes, and every sortable metric is
+    pre-sorted, so a top-k query only looks at the rows it can return.
+    Results are built straight from NumPy columns.
+    """
+    
+    def __init__(self, table: HotelTable):
+        self.table = table
+        self.size = table.size
+        self.names = table.names
+        self.city = table.city
+        self.country = table.country
+        self.columns = table.columns
+        self.order = table.order
+        self.rank = table.rank
+        self.geo = table.geo
+        # The last row in descending order holds each column's minimum
+        self.minimum = {
+            col: self.columns[col][order[-1]] if self.size else 0.0 for col, order in self.order.items()
+        }
+    
+    def query(self, params: HotelQueryParams) -> Dict[str, Any]:
+        """Answer a query with the same result schema as HotelDataManager.query_hotels"""
+        if params.weights or params.pareto:
+            result = self._query_ranked(params)
+        else:
+            result = self._query_sorted(params)
+        note = self._location_note(params)
+        if note and "message" in result:
+            result["message"] = f"{note} {result['message']}"
+        return result
+    
+    def _query_sorted(self, params: HotelQueryParams) -> Dict[str, Any]:
+        rows = self._location_rows(params)
+        active = self._active_thresholds(params)
+        sort_by = params.sort_by if params.sort_by in self.order else None
+        limit = max(1, min(10, params.limit))
+        
+        if rows is None:
+            total, top = self._top_of_table(active, sort_by, limit)
+        else:
+            for values, minimum in active:
+                rows = rows[values[rows] >= minimum]
+            total, top = len(rows), self._top_of_rows(rows, sort_by, limit)
+        
+        if total == 0:
+            return {
+                "results": [],
+                "total_found": 0,
+                "message": "No hotels found matching your criteria."
+            }
+        
+        results = self._format(top)
+        self._add_optional_scores(results, top, [sort_by])
+        return {
+            "results": results,
+            "total_found": total,
+            "message": f"Found {total} hotel(s), showing top {len(results)}"
+        }
+    
+    def _query_ranked(self, params: HotelQueryParams) -> Dict[str, Any]:
+        """Rank the matches by a weighted average of scores, optionally keeping only the Pareto front"""
+        if not params.weights:
+            return {"error": "pareto needs weights naming the scores to compare"}
+        try:
+            weights = score_weights(params.weights)
+        except (TypeError, ValueError) as e:
+            return {"error": str(e)}
+        limit = max(1, min(10, params.limit))
+        
+        rows = self._location_rows(params)
+        active = self._active_thresholds(params)
+        if rows is None and not active:
+            rows = np.arange(self.size)
+            # One matrix-vector product scores every hotel
+            scores = self.table.scores @ weights
+        else:
+            if rows is None:
+                mask = np.ones(self.size, dtype=bool)
+                for values, minimum in active:
+                    mask &= values >= minimum
+                rows = np.flatnonzero(mask)
+            else:
+                for values, minimum in active:
+                    rows = rows[values[rows] >= minimum]
+            scores = self.table.scores[rows] @ weights
+        
+        used = np.flatnonzero(weights > 0)
+        if params.pareto and len(rows):
+            front = pareto_front(self.table.scores[rows][:, used])
+            rows, scores = rows[front], scores[front]
+        
+        total = len(rows)
+        if total == 0:
+            return {
+                "results": [],
+                "total_found": 0,
+                "message": "No hotels found matching your criteria."
+            }
+        
+        best = top_k(scores, rows, limit)
+        top = rows[best]
+        results = self._format(top)
+        self._add_optional_scores(results, top, [SCORE_COLUMNS[i] for i in used])
+        for result, score in zip(results, (scores[best] * 10).tolist()):
+            result["score"] = round(score, 2)
+        
+        if params.pareto:
+            names = ", ".join(SCORE_COLUMNS[i] for i in used)
+            message = f"Found {total} hotel(s) on the Pareto front of {names}, showing top {len(results)} by weighted score"
+        else:
+            message = f"Found {total} hotel(s), showing top {len(results)} by weighted score"
+        return {
+            "results": results,
+            "total_found": total,
+            "message": message
+        }
+    
+    def query_nearby(self, params: NearbyQueryParams) -> Dict[str, Any]:
+        """Hotels within params.radius_km of a point, or the nearest ones, closest first"""
+        if not -90 <= params.lat <= 90:
+            return {"error": f"Latitude must be between -90 and 90, got {params.lat}"}
+        active = self._active_thresholds(params)
+        limit = max(1, min(10, params.limit))
+        
+        within_radius = params.radius_km is not None and params.radius_km > 0
+        if within_radius:
+            rows, distances = self._nearby_rows(params.lat, params.lon, params.radius_km, active)
+            message = f"Found {len(rows)} hotel(s) within {params.radius_km:g} km, showing nearest {{shown}}"
+        else:
+            # Widen the search until it holds limit matches; everything inside is then exact
+            radius = 50.0
+            rows, distances = self._nearby_rows(params.lat, params.lon, radius, active)
+            while len(rows) < limit and radius < MAX_DISTANCE_KM:
+                radius *= 4
+                rows, distances = self._nearby_rows(params.lat, params.lon, radius, active)
+            message = "Showing the {shown} nearest hotel(s)"
+        
+        if len(rows) == 0:
+            return {
+                "results": [],
+                "total_found": 0,
+                "message": "No hotels found matching your criteria."
+            }
+        
+        if len(rows) > limit:
+            nearest = np.argpartition(distances, limit - 1)[:limit]
+        else:
+            nearest = np.arange(len(rows))
+        nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+        results = self._format(rows[nearest])
+        for result, distance in zip(results, distances[nearest].tolist()):
+            result["distance_km"] = round(distance, 2)
+        return {
+            "results": results,
+            "total_found": len(rows) if within_radius else len(results),
+            "message": message.format(shown=len(results))
+        }
+    
+    def _active_thresholds(self, params):
+        """(column, minimum) pairs that can reject a row; a minimum at or below the column's lowest value cannot"""
+        return [
+            (self.columns[col], getattr(params, name)) for name, col in THRESHOLDS.items()
+            if getattr(params, name) > self.minimum[col]
+        ]
+    
+    def _nearby_rows(self, lat, lon, radius_km, active):
+        rows, distances = self.geo.within(lat, lon, radius_km)
+        for values, minimum in active:
+            keep = values[rows] >= minimum
+            rows, distances = rows[keep], distances[keep]
+        return rows, distances
+    
+    def _location_rows(self, params: HotelQueryParams) -> Optional[np.ndarray]:
+        """Rows matching the city and country filters, or None when neither is set"""
+        rows = None
+        if params.city:
+            rows = self.city.rows_for(self.city.match(params.city.strip().lower()))
+        if params.country:
+            codes = self.country.match(params.country.strip().lower())
+            if rows is None:
+                rows = self.country.rows_for(codes)
+            else:
+                rows = rows[np.isin(self.country.codes[rows], codes)]
+        return rows
+    
+    def _location_note(self, params: HotelQueryParams) -> str:
+        """Which names a misspelt city or country was taken to mean"""
+        notes = []
+        for text, keys in ((params.city, self.city), (params.country, self.country)):
+            if text:
+                codes, fuzzy = keys.resolve(text.strip().lower())
+                if fuzzy:
+                    notes.append(f"No exact match for '{text.strip()}', showing {', '.join(keys.titles[codes])}.")
+        return " ".join(notes)
+    
+    def _top_of_table(self, active, sort_by, limit):
+        if not active:
+            top = self.order[sort_by][:limit] if sort_by else np.arange(min(limit, self.size))
+            return self.size, top
+        
+        mask = np.ones(self.size, dtype=bool)
+        for values, minimum in active:
+            mask &= values >= minimum
+        total = int(np.count_nonzero(mask))
+        if not sort_by:
+            return total, np.flatnonzero(mask)[:limit]
+        
+        # Walk the pre-sorted order in growing blocks until limit rows pass
+        order = self.order[sort_by]
+        found = []
+        start, block = 0, 1024
+        while start < self.size and len(found) < limit:
+            rows = order[start:start + block]
+            found.extend(rows[mask[rows]][:limit - len(found)].tolist())
+            start += block
+            block *= 4
+        return total, np.array(found, dtype=np.int64)
+    
+    def _top_of_rows(self, rows, sort_by, limit):
+        # Unsorted queries return rows in table order, i.e. ranked by row number
+        rank = self.rank[sort_by][rows] if sort_by else rows
+        if len(rows) > limit:
+            best = np.argpartition(rank, limit - 1)[:limit]
+            return rows[best[np.argsort(rank[best])]]
+        return rows[np.argsort(rank)]
+    
+    def _add_optional_scores(self, results, rows, cols):
+        """Show the optional scores a ranking used, which _format leaves out"""
+        for col in cols:
+            if col in OPTIONAL_FIELDS:
+                for result, value in zip(results, self.columns[col][rows].tolist()):
+                    result[OPTIONAL_FIELDS[col]] = None if math.isnan(value) else value
+    
+    def _format(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        columns = [self.columns[col][rows].tolist() for col in SORT_COLUMNS]
+        cities = self.city.titles[self.city.codes[rows]]
+        countries = self.country.titles[self.country.codes[rows]]
+        return [
+            {
+                "hotel_name": name,
+                "city": city,
+                "country": country,
+                "star_rating": star_rating,
+                "cleanliness": cleanliness,
+                "comfort": comfort,
+                "facilities": facilities
+            }
+            for name, city, country, star_rating, cleanliness, comfort, facilities
+            in zip(self.names.take(rows), cities, countries, *columns)
+        ]
@@ -0,0 +1,345 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import uuid
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Any, Tuple
+
+from hotel_geo import GeoIndex
+from hotel_text import TrigramIndex
+
+# Columns the dataset must provide; besides OPTIONAL_SCORE_COLUMNS nothing else is read from the CSV
+REQUIRED_COLUMNS = [
+    'hotel_id', 'hotel_name', 'city', 'country',
+    'lat', 'lon', 'star_rating', 'cleanliness_base',
+    'comfort_base', 'facilities_base'
+]
+SORT_COLUMNS = ['star_rating', 'cleanliness_base', 'comfort_base', 'facilities_base']
+# Read when present, NaN otherwise; rows missing them are kept
+OPTIONAL_SCORE_COLUMNS = ['location_base', 'staff_base', 'value_for_money_base']
+SCORE_COLUMNS = SORT_COLUMNS + OPTIONAL_SCORE_COLUMNS
+FLOAT_COLUMNS = SCORE_COLUMNS + ['lat', 'lon']
+# Top of each score's range, used to put scores on one scale for weighted ranking
+SCORE_SCALES = {col: 5.0 if col == 'star_rating' else 10.0 for col in SCORE_COLUMNS}
+
+# Snapshot layout: magic, header length, JSON header, then 64-byte aligned arrays
+SNAPSHOT_MAGIC = b'HOTELS01'
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = '.snapshot'
+ALIGNMENT = 64
+
+class MissingColumnsError(ValueError):
+    """The CSV lacks some of REQUIRED_COLUMNS"""
+    
+    def __init__(self, columns: List[str]):
+        super().__init__(f"Missing required columns: {columns}")
+        self.columns = columns
+
+class StringColumn:
+    """UTF-8 strings packed into one byte buffer, decoded only for the rows asked for"""
+    
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+    
+    @classmethod
+    def from_values(cls, values: pd.Series) -> 'StringColumn':
+        encoded = [value.encode('utf-8') for value in values.fillna('').astype(str)]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def take(self, rows: np.ndarray) -> List[str]:
+        offsets = self.offsets
+        return [self.data[offsets[row]:offsets[row + 1]].tobytes().decode('utf-8') for row in rows.tolist()]
+
+class KeyIndex:
+    """Dictionary-encoded text column with a hash index from each value to its rows"""
+    
+    def __init__(self, keys: List[str], codes: np.ndarray, rows: np.ndarray, starts: np.ndarray):
+        self.keys = keys
+        self.codes = codes  # -1 for missing values
+        # rows lists every row with a value, grouped by code; code c owns rows[starts[c]:starts[c + 1]]
+        self.rows = rows
+        self.starts = starts
+        # Display names per code, with '' for missing values at code -1
+        self.titles = np.array([key.title() for key in keys] + [''], dtype=object)
+        self.text = TrigramIndex(keys)
+        # Exact names, also without diacritics or punctuation
+        self.lookup = {key: code for code, key in enumerate(self.text.keys)}
+        self.lookup.update((key, code) for code, key in enumerate(keys))
+        self.resolved = {}
+    
+    @classmethod
+    def from_values(cls, values: pd.Series) -> 'KeyIndex':
+        codes, keys = pd.factorize(values)
+        codes = codes.astype(np.int32)
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        starts = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes[codes >= 0], minlength=len(keys)), out=starts[1:])
+        missing = len(codes) - starts[-1]  # missing values sort first
+        return cls([str(key) for key in keys], codes, order[missing:], starts)
+    
+    def match(self, text: str) -> np.ndarray:
+        """Codes of every key containing text, or of the closest keys when none does"""
+        return self.resolve(text)[0]
+    
+    def resolve(self, text: str) -> Tuple[np.ndarray, bool]:
+        """(codes, fuzzy): keys containing text like Series.str.contains, ignoring case,
+        diacritics and punctuation; failing that the keys most like it (fuzzy is True)
+        """
+        resolved = self.resolved.get(text)
+        if resolved is None:
+            # Each distinct filter goes through the trigram index once, never the rows
+            if len(self.resolved) >= 1024:
+                self.resolved.clear()
+            codes = self.text.contains(text)
+            if len(codes):
+                resolved = codes, False
+            else:
+                closest = self.text.closest(text)
+                resolved = np.array([code for code, _ in closest], dtype=np.int64), bool(closest)
+            self.resolved[text] = resolved
+        return resolved
+    
+    def rows_for(self, codes: np.ndarray) -> np.ndarray:
+        """Rows holding any of codes, grouped by code (each group is in table order)"""
+        starts = self.starts
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int32)
+        if len(codes) == 1:
+            return self.rows[starts[codes[0]]:starts[codes[0] + 1]]
+        return np.concatenate([self.rows[starts[code]:starts[code + 1]] for code in codes])
+
+class HotelTable:
+    """The normalized hotel columns plus the sort orders and grid HotelIndex queries with.
+
+    Built from a DataFrame on the first load and saved as a snapshot file;
+    later loads memory-map that file, so every process shares one copy of
+    the pages and starts without parsing the CSV.
+    """
+    
+    def __init__(self, size: int, columns: Dict[str, np.ndarray], hotel_ids, names: StringColumn,
+                 city: KeyIndex, country: KeyIndex, order: Dict[str, np.ndarray], rank: Dict[str, np.ndarray],
+                 scores: np.ndarray, geo: GeoIndex):
+        self.size = size
+        self.columns = columns
+        self.hotel_ids = hotel_ids
+        self.names = names
+        self.city = city
+        self.country = country
+        # order[col] lists rows best first; rank[col][row] is the row's place in it
+        self.order = order
+        self.rank = rank
+        # One row per hotel, one column per SCORE_COLUMNS entry, scaled to 0-1 (missing scores are 0)
+        self.scores = scores
+        self.geo = geo
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'HotelTable':
+        """Build from a DataFrame normalized by read_frame"""
+        size = len(df)
+        columns = {
+            col: df[col].to_numpy(dtype=np.float64) if col in df else np.full(size, np.nan)
+            for col in FLOAT_COLUMNS
+        }
+        if pd.api.types.is_integer_dtype(df['hotel_id']):
+            hotel_ids = df['hotel_id'].to_numpy(dtype=np.int64)
+        else:
+            hotel_ids = StringColumn.from_values(df['hotel_id'])
+        
+        order, rank = {}, {}
+        for col in SCORE_COLUMNS:
+            # Missing scores sort last
+            order[col] = np.argsort(-columns[col], kind='stable').astype(np.int32)
+            rank[col] = np.empty(size, dtype=np.int32)
+            rank[col][order[col]] = np.arange(size, dtype=np.int32)
+        
+        scores = np.empty((size, len(SCORE_COLUMNS)), dtype=np.float32)
+        for i, col in enumerate(SCORE_COLUMNS):
+            scores[:, i] = np.nan_to_num(columns[col] / SCORE_SCALES[col], nan=0.0)
+        
+        return cls(size, columns, hotel_ids, StringColumn.from_values(df['hotel_name']),
+                   KeyIndex.from_values(df['city']), KeyIndex.from_values(df['country']), order, rank,
+                   scores, GeoIndex.from_coordinates(columns['lat'], columns['lon']))
+    
+    @classmethod
+    def from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'HotelTable':
+        if meta['hotel_id'] == 'int':
+            hotel_ids = arrays['hotel_id']
+        else:
+            hotel_ids = StringColumn(arrays['hotel_id.offsets'], arrays['hotel_id.data'])
+        keys = {
+            field: KeyIndex(meta[f'{field}_keys'], arrays[f'{field}.codes'], arrays[f'{field}.rows'],
+                            arrays[f'{field}.starts'])
+            for field in ('city', 'country')
+        }
+        return cls(
+            meta['rows'],
+            {col: arrays[col] for col in FLOAT_COLUMNS},
+            hotel_ids,
+            StringColumn(arrays['hotel_name.offsets'], arrays['hotel_name.data']),
+            keys['city'],
+            keys['country'],
+            {col: arrays[f'order.{col}'] for col in SCORE_COLUMNS},
+            {col: arrays[f'rank.{col}'] for col in SCORE_COLUMNS},
+            arrays['scores'],
+            GeoIndex(arrays['lat'], arrays['lon'], arrays['geo.cells'], arrays['geo.starts'], arrays['geo.rows'])
+        )
+    
+    def to_arrays(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """The snapshot metadata and arrays for this table"""
+        arrays = dict(self.columns)
+        if isinstance(self.hotel_ids, StringColumn):
+            arrays['hotel_id.offsets'] = self.hotel_ids.offsets
+            arrays['hotel_id.data'] = self.hotel_ids.data
+        else:
+            arrays['hotel_id'] = self.hotel_ids
+        arrays['hotel_name.offsets'] = self.names.offsets
+        arrays['hotel_name.data'] = self.names.data
+        for field, index in (('city', self.city), ('country', self.country)):
+            arrays[f'{field}.codes'] = index.codes
+            arrays[f'{field}.rows'] = index.rows
+            arrays[f'{field}.starts'] = index.starts
+        for col in SCORE_COLUMNS:
+            arrays[f'order.{col}'] = self.order[col]
+            arrays[f'rank.{col}'] = self.rank[col]
+        arrays['scores'] = self.scores
+        arrays['geo.cells'] = self.geo.cells
+        arrays['geo.starts'] = self.geo.starts
+        arrays['geo.rows'] = self.geo.rows
+        meta = {
+            'rows': self.size,
+            'hotel_id': 'str' if isinstance(self.hotel_ids, StringColumn) else 'int',
+            'city_keys': self.city.keys,
+            'country_keys': self.country.keys
+        }
+        return meta, arrays
+
+def read_frame(file_path: str) -> pd.DataFrame:
+    """Parse and normalize the hotel CSV (the slow path a snapshot saves)"""
+    header = pd.read_csv(file_path, nrows=0).columns
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing_cols:
+        raise MissingColumnsError(missing_cols)
+    
+    optional_cols = [col for col in OPTIONAL_SCORE_COLUMNS if col in header]
+    df = pd.read_csv(file_path, usecols=REQUIRED_COLUMNS + optional_cols)
+    for col in OPTIONAL_SCORE_COLUMNS:
+        if col not in header:
+            df[col] = np.nan
+    
+    # Normalize data
+    df['city'] = df['city'].str.strip().str.lower()
+    df['country'] = df['country'].str.strip().str.lower()
+    
+    # Ensure numeric columns are properly typed
+    for col in FLOAT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # Remove rows with missing critical data
+    return df.dropna(subset=SORT_COLUMNS)
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def write_snapshot(table: HotelTable, path: str, source: Dict[str, Any]):
+    """Write table to path atomically; source identifies the CSV it was built from"""
+    meta, arrays = table.to_arrays()
+    meta.update(version=SNAPSHOT_VERSION, source=source, columns=REQUIRED_COLUMNS)
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        specs[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    header = json.dumps({'meta': meta, 'arrays': specs}).encode('utf-8')
+    data_start = _aligned(len(SNAPSHOT_MAGIC) + 8 + len(header))
+    
+    # Concurrent builders each write their own file; the last rename wins
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + specs[name]['offset'])
+                f.write(np.ascontiguousarray(array).data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def open_snapshot(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Memory-map a snapshot; the arrays are read-only views of the file"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a hotel snapshot")
+    start = len(SNAPSHOT_MAGIC)
+    (header_length,) = struct.unpack('<Q', mapped[start:start + 8])
+    header = json.loads(mapped[start + 8:start + 8 + header_length])
+    data_start = _aligned(start + 8 + header_length)
+    
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        count = int(np.prod(spec['shape']))
+        if count == 0:
+            arrays[name] = np.empty(spec['shape'], dtype=spec['dtype'])
+        else:
+            arrays[name] = np.frombuffer(
+                mapped, dtype=spec['dtype'], count=count, offset=data_start + spec['offset']
+            ).reshape(spec['shape'])
+    return header['meta'], arrays
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_table(file_path: str, snapshot_path: Optional[str] = None) -> HotelTable:
+    """The hotel table, memory-mapped from its snapshot.
+
+    The snapshot is reused while the CSV keeps its size and mtime, or when
+    its content hash is unchanged (e.g. after a checkout touched it). It is
+    rebuilt from the CSV otherwise.
+    """
+    snapshot_path = snapshot_path or file_path + SNAPSHOT_SUFFIX
+    stat = os.stat(file_path)
+    source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    meta = arrays = None
+    try:
+        meta, arrays = open_snapshot(snapshot_path)
+        if meta.get('version') != SNAPSHOT_VERSION or meta.get('columns') != REQUIRED_COLUMNS:
+            meta = None
+    except (OSError, ValueError, KeyError):
+        meta = None
+    
+    if meta is not None:
+        cached = meta['source']
+        if cached['size'] == source['size'] and cached['mtime_ns'] == source['mtime_ns']:
+            return HotelTable.from_arrays(meta, arrays)
+    
+    source['sha256'] = file_digest(file_path)
+    if meta is not None and meta['source']['sha256'] == source['sha256']:
+        table = HotelTable.from_arrays(meta, arrays)
+    else:
+        table = HotelTable.from_frame(read_frame(file_path))
+    
+    try:
+        write_snapshot(table, snapshot_path, source)
+    except OSError:
+        # A read-only directory still gets a working, unshared in-memory table
+        return table
+    return HotelTable.from_arrays(*open_snapshot(snapshot_path))
@@ -0,0 +1,112 @@
+import re
+import unicodedata
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Tuple
+
+NON_WORD = re.compile(r'[^\w]+')
+# Names sharing the most trigrams with a misspelling are re-ranked by edit distance
+FUZZY_CANDIDATES = 50
+# Beyond this many edits (per 4 letters, at least 1) a name is only kept on trigram similarity:
+# it must share this much of its trigrams (Dice coefficient) and be within FUZZY_SPREAD of the best
+FUZZY_EDITS_PER_LETTERS = 4
+FUZZY_MIN_SIMILARITY = 0.45
+FUZZY_SPREAD = 0.1
+FUZZY_LIMIT = 5
+
+def fold(text: str) -> str:
+    """Casefolded text without diacritics or punctuation: 'São  Paulo!' -> 'sao paulo'"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(NON_WORD.sub(' ', text.casefold()).split())
+
+def edit_distance(a: str, b: str) -> int:
+    """Insertions, deletions, substitutions and swaps of adjacent letters turning a into b"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+def trigrams(text: str) -> set:
+    """Trigrams of folded text, padded so that the first letters and the end of the word count"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Trigram postings over the distinct city or country names.
+
+    Substring lookups intersect the postings of the query's trigrams, and
+    misspellings are ranked by how many trigrams they share with each name,
+    so neither scans every name.
+    """
+    
+    def __init__(self, keys: List[str]):
+        self.keys = [fold(key) for key in keys]
+        postings: Dict[str, List[int]] = {}
+        self.sizes = np.empty(len(self.keys), dtype=np.int32)
+        for code, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.sizes[code] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(code)
+        self.postings = {gram: np.array(codes, dtype=np.int64) for gram, codes in postings.items()}
+    
+    def contains(self, text: str) -> np.ndarray:
+        """Codes of every name containing folded text: the exact name, then prefixes, then shortest first"""
+        text = fold(text)
+        if len(text) < 3:
+            found = [code for code, key in enumerate(self.keys) if text in key]
+        else:
+            found = [code for code in self._candidates(text).tolist() if text in self.keys[code]]
+        keys = self.keys
+        found.sort(key=lambda code: (keys[code] != text, not keys[code].startswith(text), len(keys[code]), code))
+        return np.array(found, dtype=np.int64)
+    
+    def _candidates(self, text: str) -> np.ndarray:
+        # Every name containing text contains all of its (unpadded) trigrams
+        lists = []
+        for i in range(len(text) - 2):
+            codes = self.postings.get(text[i:i + 3])
+            if codes is None:
+                return np.empty(0, dtype=np.int64)
+            lists.append(codes)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for codes in lists[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = candidates[np.isin(candidates, codes, assume_unique=True)]
+        return candidates
+    
+    def closest(self, text: str) -> List[Tuple[int, float]]:
+        """(code, similarity) of the names most like text, fewest edits first"""
+        text = fold(text)
+        grams = trigrams(text)
+        shared = Counter()
+        for gram in grams:
+            codes = self.postings.get(gram)
+            if codes is not None:
+                shared.update(codes.tolist())
+        if not shared:
+            return []
+        
+        codes = np.fromiter(shared.keys(), dtype=np.int64, count=len(shared))
+        counts = np.fromiter(shared.values(), dtype=np.float64, count=len(shared))
+        similarity = 2 * counts / (len(grams) + self.sizes[codes])
+        if len(codes) > FUZZY_CANDIDATES:
+            top = np.argpartition(-similarity, FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]
+            codes, similarity = codes[top], similarity[top]
+        
+        edits = np.array([edit_distance(text, self.keys[code]) for code in codes.tolist()])
+        if edits.min() <= max(1, len(text) // FUZZY_EDITS_PER_LETTERS):
+            keep = edits == edits.min()
+        else:
+            keep = similarity >= max(FUZZY_MIN_SIMILARITY, similarity.max() - FUZZY_SPREAD)
+        codes, similarity, edits = codes[keep], similarity[keep], edits[keep]
+        order = np.lexsort((codes, -similarity, edits))[:FUZZY_LIMIT]
+        return list(zip(codes[order].tolist(), similarity[order].tolist()))
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+import re
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+
+PUNCTUATION = re.compile(r'[^\w\s.]|\.(?!\d)')
+WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """Lowercase text with punctuation dropped (decimal points kept) and whitespace collapsed"""
+    return WHITESPACE.sub(' ', PUNCTUATION.sub(' ', text.lower())).strip()
+
+class QueryCache:
+    """Bounded TTL cache of tool results and answers, cleared when the dataset reloads"""
+    
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Bumped by clear() so results computed against an older dataset are not stored
+        self.generation = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        with self.lock:
+            if self.max_size <= 0 or (generation is not None and generation != self.generation):
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
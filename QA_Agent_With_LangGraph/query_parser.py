@@ -0,0 +1,132 @@
+import re
+from typing import Optional
+
+from hotel_index import HotelIndex, HotelQueryParams
+from query_cache import normalize_text
+
+NUMBER = r'(\d+(?:\.\d+)?)'
+METRIC = r'(star ratings?|stars?|ratings?|cleanliness|clean|comfort|facilities|amenities)'
+# Scores that can be ranked on but have no threshold parameter
+SCORE = r'(star ratings?|stars?|ratings?|cleanliness|clean|comfort|facilities|amenities|location|staff|value for money|value)'
+AT_LEAST = r'(?:at least|min(?:imum)?(?: of)?|over|above|more than|of at least)'
+
+METRICS = {
+    'star rating': 'star_rating', 'star ratings': 'star_rating', 'star': 'star_rating',
+    'stars': 'star_rating', 'rating': 'star_rating', 'ratings': 'star_rating',
+    'cleanliness': 'cleanliness_base', 'clean': 'cleanliness_base',
+    'comfort': 'comfort_base',
+    'facilities': 'facilities_base', 'amenities': 'facilities_base',
+    'location': 'location_base', 'staff': 'staff_base',
+    'value': 'value_for_money_base', 'value for money': 'value_for_money_base'
+}
+MINIMUMS = {
+    'star_rating': 'min_star_rating',
+    'cleanliness_base': 'min_cleanliness',
+    'comfort_base': 'min_comfort',
+    'facilities_base': 'min_facilities'
+}
+# Highest value each metric can take, to reject thresholds that are not scores
+SCALES = {'star_rating': 5.0, 'cleanliness_base': 10.0, 'comfort_base': 10.0, 'facilities_base': 10.0}
+
+LIMIT_RULES = [
+    re.compile(r'\btop (\d+)\b'),
+    re.compile(r'^(?:show me |find me |find |list |give me )?(\d+) (?=(?:\w+ )?hotels?\b)')
+]
+SORT_RULES = [
+    re.compile(r'\b(?:sorted by|ordered by|ranked by|by) ' + SCORE + r'\b'),
+    re.compile(r'\bbest ' + SCORE + r'(?= hotels?\b)')
+]
+# "best on cleanliness and value": hotels no other beats on all of them
+# (normalize_text has already dropped the commas of "cleanliness, comfort and value")
+PARETO_RULE = re.compile(r'\bbest (?:on|for) (' + SCORE + r'(?:(?: and)? ' + SCORE + r')+)\b')
+SCORE_WORDS = re.compile(SCORE)
+STAR_RULES = [
+    re.compile(r'\b' + AT_LEAST + ' ' + NUMBER + r' stars?\b'),
+    re.compile(r'\b' + NUMBER + r' stars? (?:or more|and (?:up|above))\b')
+]
+THRESHOLD_RULE = re.compile(r'\b' + METRIC + r'(?: score)? ' + AT_LEAST + ' ' + NUMBER + r'\b')
+PLACE_RULE = re.compile(r'\bin ([a-z][\w\' -]*)')
+
+# Words that may be left over once every rule has matched
+FILLER = {
+    'hotel', 'hotels', 'show', 'me', 'find', 'list', 'give', 'the', 'best', 'top', 'a', 'an',
+    'please', 'what', 'are', 'which', 'with', 'in', 'that', 'have', 'having', 'rated', 'highest'
+}
+
+def parse_hotel_query(text: str, index: HotelIndex, strict: bool = True) -> Optional[HotelQueryParams]:
+    """HotelQueryParams for a plain hotel search, or None when the text needs the LLM.
+
+    Handles the phrasings of the example queries: "top N", "N hotels",
+    "by <metric>", "best <metric> hotels", "best on <metric> and <metric>",
+    "at least K stars", "<metric> above X" and "in <city or country>". The place must be a
+    city or country in the dataset. In strict mode any other word makes
+    the parse fail, so only queries that are fully understood skip the LLM.
+    """
+    text = normalize_text(text)
+    if 'hotel' not in text:
+        return None
+    params = HotelQueryParams()
+    
+    for rule in LIMIT_RULES:
+        match = rule.search(text)
+        if match:
+            params.limit = int(match.group(1))
+            text = _remove(text, match)
+            break
+    
+    match = PARETO_RULE.search(text)
+    if match:
+        params.weights = {METRICS[word]: 1.0 for word in SCORE_WORDS.findall(match.group(1))}
+        params.pareto = True
+        text = _remove(text, match)
+    
+    for rule in SORT_RULES:
+        match = rule.search(text)
+        if match:
+            params.sort_by = METRICS[match.group(1)]
+            text = _remove(text, match)
+            break
+    
+    for rule in STAR_RULES:
+        match = rule.search(text)
+        if match:
+            params.min_star_rating = float(match.group(1))
+            text = _remove(text, match)
+            break
+    
+    while True:
+        match = THRESHOLD_RULE.search(text)
+        if not match:
+            break
+        column = METRICS[match.group(1)]
+        setattr(params, MINIMUMS[column], float(match.group(2)))
+        text = _remove(text, match)
+    
+    if any(getattr(params, MINIMUMS[column]) > scale for column, scale in SCALES.items()):
+        return None
+    
+    match = PLACE_RULE.search(text)
+    if match:
+        # The place runs until the first filler word ("in japan with ...")
+        words = []
+        for word in match.group(1).split():
+            if word in FILLER:
+                break
+            words.append(word)
+        place = ' '.join(words)
+        if place in index.city.lookup:
+            params.city = place
+        elif place in index.country.lookup:
+            params.country = place
+        elif strict:
+            return None
+        else:
+            params.city = place
+        text = text[:match.start()] + ' ' + text[match.start(1) + len(place):]
+    
+    if strict and any(word not in FILLER for word in text.split()):
+        return None
+    return params
+
+def _remove(text: str, match: re.Match) -> str:
+    return text[:match.start()] + ' ' + text[match.end():]